@@ -0,0 +1,77 @@
+"""
+Reminder email rendering throughput.
+
+    python benchmarks/bench_reminder_render.py --count 20000
+    python benchmarks/bench_reminder_render.py --json render.json
+
+Renders --count synthetic reminders (subject, text and HTML bodies and the
+Google Calendar link) through the cached Jinja templates and reports
+messages rendered per second, with and without building the MIME message.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from voicenudge.reminders.render import render_reminders  # noqa: E402
+
+
+def make_pairs(count):
+    now = datetime.now(timezone.utc)
+    pairs = []
+    for i in range(count):
+        task = SimpleNamespace(
+            title=f"Task {i}: call the bank about the card",
+            text=f"call the bank about the card before the {i % 28 + 1}th",
+            due_at=now + timedelta(minutes=i),
+        )
+        user = SimpleNamespace(name=f"User {i % 500}", email=f"user{i % 500}@example.com")
+        pairs.append((task, user))
+    return pairs
+
+
+def bench(pairs, build_mime):
+    if build_mime:
+        from flask_mail import Message
+
+    t0 = time.perf_counter()
+    for to, subject, body, html in render_reminders(pairs):
+        if build_mime:
+            msg = Message(subject=subject, sender="noreply@example.com", recipients=[to], body=body, html=html)
+            msg.as_bytes()
+    elapsed = time.perf_counter() - t0
+    return {"messages": len(pairs), "seconds": round(elapsed, 3), "messages_per_s": round(len(pairs) / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000, help="reminders to render")
+    parser.add_argument("--skip-mime", action="store_true", help="don't build flask_mail messages")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    pairs = make_pairs(args.count)
+    bench(pairs[:100], build_mime=False)  # warm-up: compiles and caches the templates
+
+    results = {"render": bench(pairs, build_mime=False)}
+    if not args.skip_mime:
+        results["render_and_mime"] = bench(pairs, build_mime=True)
+
+    for stage, row in results.items():
+        print(f"{stage:<18}{row['messages_per_s']:>12} msg/s  ({row['messages']} in {row['seconds']}s)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
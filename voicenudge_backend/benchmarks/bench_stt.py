@@ -0,0 +1,123 @@
+"""
+Compare STT backends on real-time factor (RTF) and word error rate (WER).
+
+    python benchmarks/bench_stt.py --backends openai-whisper faster-whisper
+    python benchmarks/bench_stt.py --refs samples/transcripts.json --json stt.json
+
+RTF = processing time / audio duration (lower is faster; <1 is faster than
+real time). WER is measured against --refs ({"file.wav": "reference text"});
+without references the first backend's output is used as the reference.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import wave
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from voicenudge.nlp.utils import clean_text  # noqa: E402
+from voicenudge.speech.backends import available_backends, get_backend  # noqa: E402
+
+
+def wav_duration(path):
+    with wave.open(path, "rb") as w:
+        return w.getnframes() / float(w.getframerate())
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance / reference length."""
+    ref = clean_text(reference).split()
+    hyp = clean_text(hypothesis).split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def bench_backend(name, files):
+    backend = get_backend(name)
+
+    t0 = time.perf_counter()
+    backend.load()
+    load_s = time.perf_counter() - t0
+
+    # Warm-up so one-off graph/kernel setup doesn't skew the first file
+    backend.transcribe(files[0], translate=False)
+
+    rows = []
+    for path in files:
+        t0 = time.perf_counter()
+        text = backend.transcribe(path, translate=False)
+        elapsed = time.perf_counter() - t0
+        duration = wav_duration(path)
+        rows.append({
+            "file": os.path.basename(path),
+            "audio_s": round(duration, 2),
+            "elapsed_s": round(elapsed, 3),
+            "rtf": round(elapsed / duration, 3),
+            "text": text.strip(),
+        })
+    return {"backend": name, "load_s": round(load_s, 2), "files": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["openai-whisper", "faster-whisper"],
+                        help=f"any of: {', '.join(available_backends())}")
+    parser.add_argument("--samples", default=os.path.join(ROOT_DIR, "samples", "*.wav"))
+    parser.add_argument("--refs", help="JSON file mapping wav filename → reference transcript")
+    parser.add_argument("--json", help="write full results to this file")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(args.samples))
+    if not files:
+        sys.exit(f"No audio files match {args.samples}")
+
+    refs = None
+    if args.refs:
+        with open(args.refs) as f:
+            refs = json.load(f)
+
+    results = []
+    for name in args.backends:
+        print(f"🔹 Benchmarking {name} on {len(files)} file(s)...")
+        try:
+            results.append(bench_backend(name, files))
+        except Exception as e:
+            print(f"⚠️ Skipping {name}: {e}")
+
+    if not results:
+        sys.exit("No backend could be benchmarked")
+
+    if refs is None:
+        refs = {row["file"]: row["text"] for row in results[0]["files"]}
+        print(f"ℹ️ No --refs given; WER is relative to {results[0]['backend']}")
+
+    print(f"\n{'backend':<16}{'load_s':>8}{'mean RTF':>10}{'WER':>8}")
+    for result in results:
+        scored = [r for r in result["files"] if r["file"] in refs]
+        for row in scored:
+            row["wer"] = round(word_error_rate(refs[row["file"]], row["text"]), 3)
+        result["mean_rtf"] = round(sum(r["rtf"] for r in result["files"]) / len(result["files"]), 3)
+        result["wer"] = round(sum(r["wer"] for r in scored) / len(scored), 3) if scored else None
+        print(f"{result['backend']:<16}{result['load_s']:>8}{result['mean_rtf']:>10}{str(result['wer']):>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Voice-auth throughput and accuracy benchmark.
+
+    python benchmarks/bench_voice_auth.py
+    python benchmarks/bench_voice_auth.py --samples samples --durations 5 15 30 --json voice.json
+
+Measures, at each audio duration:
+  - embedding extraction: clips/s and audio-seconds/s, single and batched,
+    plus the same normalised per torch thread ("per core")
+  - cosine scoring against a stored float32 embedding
+  - the full POST /api/auth/login voice path (decode → embed → cache → score),
+    for durations at or above the 15 s minimum the route accepts; any
+    non-200 response aborts the run
+
+and over every pair of labeled recordings: genuine/impostor score
+distributions, FAR/FRR across thresholds, the EER, and FAR/FRR at the
+login thresholds the app uses.
+
+Speaker labels: a file in a subdirectory belongs to that directory's
+speaker; otherwise the speaker is the filename up to the first "_"
+(Nikitha_1.wav → Nikitha). --labels {"file.wav": "speaker"} overrides both.
+"""
+import argparse
+import glob
+import io
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Thresholds from /api/auth/login: accept ≥ 0.75, security question ≥ 0.55
+ACCEPT_THRESHOLD = 0.75
+FALLBACK_THRESHOLD = 0.55
+
+
+def load_labeled_samples(root, labels=None):
+    """Return [(path, speaker)] for every audio file under `root`."""
+    paths = sorted(
+        p for p in glob.glob(os.path.join(root, "**", "*"), recursive=True)
+        if p.lower().endswith((".wav", ".webm", ".ogg", ".mp3", ".m4a", ".flac"))
+    )
+    samples = []
+    for path in paths:
+        name = os.path.basename(path)
+        parent = os.path.relpath(os.path.dirname(path), root)
+        if labels and name in labels:
+            speaker = labels[name]
+        elif parent != ".":
+            speaker = parent.split(os.sep)[0]
+        else:
+            speaker = os.path.splitext(name)[0].split("_")[0]
+        samples.append((path, speaker))
+    return samples
+
+
+def timed(fn, repeat):
+    """Run fn `repeat` times; return per-call latencies in seconds."""
+    latencies = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def summarize(latencies):
+    arr = np.asarray(latencies)
+    return {
+        "mean_ms": round(float(arr.mean()) * 1000, 3),
+        "p50_ms": round(float(np.percentile(arr, 50)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(arr, 95)) * 1000, 3),
+    }
+
+
+# ---------------------- 🔹 Throughput ----------------------
+def bench_embedding(auth, audio, repeat, batch_size, threads):
+    duration = len(audio) / 16000
+    single = timed(lambda: auth.get_embeddings([audio]), repeat)
+    batched = timed(lambda: auth.get_embeddings([audio] * batch_size, batch_size=batch_size), max(1, repeat // 2))
+
+    single_rate = 1 / float(np.mean(single))
+    batch_rate = batch_size / float(np.mean(batched))
+    return {
+        "single": {**summarize(single), "clips_per_s": round(single_rate, 2),
+                   "clips_per_s_per_core": round(single_rate / threads, 2),
+                   "audio_s_per_s": round(single_rate * duration, 2)},
+        "batch": {"batch_size": batch_size, **summarize(batched),
+                  "clips_per_s": round(batch_rate, 2),
+                  "clips_per_s_per_core": round(batch_rate / threads, 2),
+                  "audio_s_per_s": round(batch_rate * duration, 2)},
+    }
+
+
+def bench_scoring(auth, dim=192, repeat=10000):
+    rng = np.random.default_rng(0)
+    stored = rng.standard_normal(dim).astype("<f4").tobytes()  # as read from the DB
+    probe = rng.standard_normal(dim).astype(np.float32)
+    latencies = timed(lambda: auth.compare_embeddings(probe, stored), repeat)
+    return {**summarize(latencies), "scores_per_s": round(1 / float(np.mean(latencies)), 1)}
+
+
+def bench_login(app, auth, enroll_audio, audio, repeat):
+    """POST /api/auth/login with a voice sample through the real route."""
+    from voicenudge.extensions import db
+    from voicenudge.models import User
+    from voicenudge.speech.audio import encode_wav
+
+    with app.app_context():
+        user = User.query.filter_by(email="bench@voicenudge.local").first()
+        if user is None:
+            user = User(name="Bench", email="bench@voicenudge.local")
+            user.set_password("bench")
+            user.set_voice_embedding(auth.get_embeddings([enroll_audio])[0])
+            db.session.add(user)
+        user.voice_locked = False
+        db.session.commit()
+
+    wav = encode_wav(audio)
+    client = app.test_client()
+    statuses = []
+
+    def login():
+        resp = client.post("/api/auth/login", data={
+            "email": "bench@voicenudge.local",
+            "password": "bench",
+            "voice": (io.BytesIO(wav), "probe.wav"),
+        }, content_type="multipart/form-data")
+        statuses.append(resp.status_code)
+
+    latencies = timed(login, repeat)
+    codes = sorted(set(statuses))
+    if codes != [200]:
+        # Anything else timed an error path, not a login
+        raise RuntimeError(f"Voice login returned HTTP {codes} for {len(audio) / 16000:.1f}s audio")
+    return {**summarize(latencies), "status_codes": codes}
+
+
+# ---------------------- 🔹 Accuracy ----------------------
+def error_rates(genuine, impostor, thresholds):
+    """FAR = impostor scores accepted; FRR = genuine scores rejected."""
+    genuine = np.asarray(genuine)
+    impostor = np.asarray(impostor)
+    far = np.array([(impostor >= t).mean() if impostor.size else np.nan for t in thresholds])
+    frr = np.array([(genuine < t).mean() if genuine.size else np.nan for t in thresholds])
+    return far, frr
+
+
+def bench_accuracy(auth, samples, step=0.01):
+    from voicenudge.speech.audio import decode_audio
+
+    audios = [decode_audio(path) for path, _ in samples]
+    embeddings = auth.get_embeddings(audios)
+
+    pairs = []
+    genuine, impostor = [], []
+    for (i, (path_a, spk_a)), (j, (path_b, spk_b)) in itertools.combinations(enumerate(samples), 2):
+        score = auth.compare_embeddings(embeddings[i], embeddings[j])
+        same = spk_a == spk_b
+        (genuine if same else impostor).append(score)
+        pairs.append({"a": os.path.basename(path_a), "b": os.path.basename(path_b),
+                      "same_speaker": same, "score": round(score, 4)})
+
+    result = {
+        "speakers": sorted({spk for _, spk in samples}),
+        "files": len(samples),
+        "genuine_pairs": len(genuine),
+        "impostor_pairs": len(impostor),
+        "pairs": pairs,
+    }
+    if not genuine or not impostor:
+        result["note"] = "EER needs both same-speaker and different-speaker pairs"
+        return result
+
+    thresholds = np.round(np.arange(-1.0, 1.0 + step, step), 4)
+    far, frr = error_rates(genuine, impostor, thresholds)
+    k = int(np.argmin(np.abs(far - frr)))
+
+    def at(threshold):
+        f, r = error_rates(genuine, impostor, [threshold])
+        return {"threshold": threshold, "far": round(float(f[0]), 4), "frr": round(float(r[0]), 4)}
+
+    result.update({
+        "eer": round(float((far[k] + frr[k]) / 2), 4),
+        "eer_threshold": float(thresholds[k]),
+        "at_accept_threshold": at(ACCEPT_THRESHOLD),
+        "at_fallback_threshold": at(FALLBACK_THRESHOLD),
+        "curve": [{"threshold": float(t), "far": round(float(f), 4), "frr": round(float(r), 4)}
+                  for t, f, r in zip(thresholds, far, frr)],
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", default=os.path.join(ROOT_DIR, "samples"),
+                        help="directory of labeled recordings")
+    parser.add_argument("--labels", help="JSON file mapping filename → speaker")
+    parser.add_argument("--durations", nargs="+", type=float, default=[5, 10, 15, 30],
+                        help="audio lengths (s) for the throughput runs")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--threads", type=int, help="torch intra-op threads (default: torch's choice)")
+    parser.add_argument("--skip-login", action="store_true", help="don't exercise the HTTP login path")
+    parser.add_argument("--json", help="write full results to this file")
+    args = parser.parse_args()
+
+    os.chdir(ROOT_DIR)  # VoiceAuth loads pretrained_models/ relative to cwd
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+    import torch
+    from voicenudge import create_app
+    from voicenudge.auth.routes import get_voice_auth
+    from voicenudge.auth.voice_auth import MIN_SAMPLE_SECONDS, VoiceAuth
+    from voicenudge.extensions import db
+    from voicenudge.speech.audio import decode_audio
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    threads = torch.get_num_threads()
+
+    labels = None
+    if args.labels:
+        with open(args.labels) as f:
+            labels = json.load(f)
+    samples = load_labeled_samples(args.samples, labels)
+    if not samples:
+        sys.exit(f"No audio files found under {args.samples}")
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+
+    t0 = time.perf_counter()
+    auth = get_voice_auth()  # the same instance the login route uses
+    load_s = time.perf_counter() - t0
+
+    # One source clip, tiled/cropped to every benchmark duration
+    source = max((decode_audio(path) for path, _ in samples), key=len)
+    auth.get_embeddings([source[:16000]])  # warm-up
+
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "model_version": VoiceAuth.model_version,
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "cpu_count": os.cpu_count(),
+        "torch_threads": threads,
+        "model_load_s": round(load_s, 2),
+        "scoring": bench_scoring(auth),
+        "durations": [],
+    }
+
+    print(f"🔹 Benchmarking {len(args.durations)} duration(s) on {threads} thread(s)...")
+    print(f"\n{'audio_s':>8}{'embed p50 ms':>14}{'clips/s':>9}{'batch clips/s':>15}{'login p50 ms':>14}")
+    for seconds in args.durations:
+        audio = np.resize(source, int(seconds * 16000)).astype(np.float32)
+        row = {"audio_s": seconds, "embedding": bench_embedding(auth, audio, args.repeat, args.batch_size, threads)}
+        if not args.skip_login and seconds < MIN_SAMPLE_SECONDS:
+            # The route rejects it before embedding: there's no login to time
+            row["login"] = {"skipped": f"below the {MIN_SAMPLE_SECONDS}s minimum sample length"}
+        elif not args.skip_login:
+            row["login"] = bench_login(app, auth, source, audio, max(1, args.repeat // 2))
+        results["durations"].append(row)
+
+        login_ms = row.get("login", {}).get("p50_ms", "-")
+        print(f"{seconds:>8}{row['embedding']['single']['p50_ms']:>14}"
+              f"{row['embedding']['single']['clips_per_s']:>9}"
+              f"{row['embedding']['batch']['clips_per_s']:>15}{login_ms:>14}")
+    print(f"\nCosine scoring: {results['scoring']['scores_per_s']} scores/s")
+
+    print(f"\n🔹 Scoring {len(samples)} labeled file(s)...")
+    accuracy = bench_accuracy(auth, samples)
+    results["accuracy"] = accuracy
+    if "eer" in accuracy:
+        print(f"EER {accuracy['eer']:.2%} at threshold {accuracy['eer_threshold']}")
+        for key in ("at_accept_threshold", "at_fallback_threshold"):
+            point = accuracy[key]
+            print(f"  @ {point['threshold']}: FAR {point['far']:.2%}  FRR {point['frr']:.2%}")
+    else:
+        print(f"ℹ️ {accuracy['note']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# gunicorn.conf.py — picked up automatically by `gunicorn wsgi:app`
+import os
+
+# PRELOAD_MODELS=true → import wsgi (which then loads every model) in the
+# master process before forking, so workers share model pages copy-on-write.
+preload_app = os.getenv("PRELOAD_MODELS", "false").lower() == "true"
+
+# Threaded workers: a voice upload waiting on the STT pool blocks only its
+# thread, so health checks and text endpoints keep being served, and
+# concurrent uploads in one process reach the pool together and can be
+# micro-batched (sync workers hand it one request at a time: batches of 1).
+# Each worker process has its own STT pool, i.e. WEB_CONCURRENCY ×
+# STT_POOL_WORKERS Whisper copies per host: scale with threads, not processes.
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+if preload_app:
+    # Tells create_app() it's running in the master, which must not start
+    # the reminder dispatcher thread or open DB connections before forking
+    os.environ["VOICENUDGE_PRELOADING"] = "true"
+
+
+def post_fork(server, worker):
+    """Per-worker setup for a preloaded app (runs in the child after fork)."""
+    if not preload_app:
+        return  # the worker imports wsgi itself and create_app() does this
+    os.environ.pop("VOICENUDGE_PRELOADING", None)
+
+    from voicenudge import start_reminders
+    from voicenudge.extensions import db
+
+    app = worker.app.wsgi()  # the app the master preloaded
+    with app.app_context():
+        # Drop pooled connections inherited from the master without closing
+        # them (they're the master's sockets); this worker opens its own
+        db.engine.dispose(close=False)
+    start_reminders(app)
@@ -0,0 +1,41 @@
+"""add ingest_jobs for async voice ingest
+
+Revision ID: 4b7e2c91d0a3
+Revises: 1d1bcd4fad17
+Create Date: 2026-10-16 10:12:03.114205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e2c91d0a3'
+down_revision = '1d1bcd4fad17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ingest_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('stage', sa.String(length=20), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ingest_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ingest_jobs_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ingest_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ingest_jobs_user_id'))
+
+    op.drop_table('ingest_jobs')
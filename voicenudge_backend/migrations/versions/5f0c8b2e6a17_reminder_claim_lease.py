@@ -0,0 +1,28 @@
+"""add reminders.claimed_by / claimed_at delivery lease
+
+Revision ID: 5f0c8b2e6a17
+Revises: b71d3e9a4c52
+Create Date: 2026-10-16 22:02:31.640027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f0c8b2e6a17'
+down_revision = 'b71d3e9a4c52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reminders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claimed_by', sa.String(length=128), nullable=True))
+        batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('reminders', schema=None) as batch_op:
+        batch_op.drop_column('claimed_at')
+        batch_op.drop_column('claimed_by')
@@ -0,0 +1,23 @@
+"""index task_history(user_id, completed_at) for paginated history
+
+Revision ID: 7a2e6c0d9b45
+Revises: c4d9e7a1f382
+Create Date: 2026-10-16 23:48:52.113760
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2e6c0d9b45'
+down_revision = 'c4d9e7a1f382'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_task_history_user_completed', 'task_history', ['user_id', 'completed_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_task_history_user_completed', table_name='task_history')
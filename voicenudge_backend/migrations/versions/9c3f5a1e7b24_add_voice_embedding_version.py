@@ -0,0 +1,32 @@
+"""add users.voice_embedding_version
+
+Revision ID: 9c3f5a1e7b24
+Revises: 4b7e2c91d0a3
+Create Date: 2026-10-16 11:40:27.502118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3f5a1e7b24'
+down_revision = '4b7e2c91d0a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('voice_embedding_version', sa.Integer(), nullable=True))
+
+    # Existing enrollments start at version 1
+    op.execute(
+        "UPDATE users SET voice_embedding_version = "
+        "CASE WHEN voice_embedding IS NULL THEN 0 ELSE 1 END"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('voice_embedding_version')
@@ -0,0 +1,34 @@
+"""partial index on reminders(remind_at) WHERE sent = false
+
+Revision ID: b71d3e9a4c52
+Revises: e2a8d4c6f913
+Create Date: 2026-10-16 21:20:44.905316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71d3e9a4c52'
+down_revision = 'e2a8d4c6f913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_reminders_unsent_remind_at',
+        'reminders',
+        ['remind_at'],
+        unique=False,
+        postgresql_where=sa.text('sent = false'),
+        sqlite_where=sa.text('sent = 0'),
+    )
+    # The full index is superseded: every remind_at lookup filters on sent = false
+    op.execute('DROP INDEX IF EXISTS ix_reminders_remind_at')
+
+
+def downgrade():
+    op.create_index('ix_reminders_remind_at', 'reminders', ['remind_at'], unique=False)
+    op.drop_index('ix_reminders_unsent_remind_at', table_name='reminders')
@@ -0,0 +1,25 @@
+"""composite indexes for keyset-paginated task listing
+
+Revision ID: c4d9e7a1f382
+Revises: 5f0c8b2e6a17
+Create Date: 2026-10-16 23:10:08.271954
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d9e7a1f382'
+down_revision = '5f0c8b2e6a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_tasks_user_status_due', 'tasks', ['user_id', 'status', 'due_at', 'id'], unique=False)
+    op.create_index('ix_tasks_user_due', 'tasks', ['user_id', 'due_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tasks_user_due', table_name='tasks')
+    op.drop_index('ix_tasks_user_status_due', table_name='tasks')
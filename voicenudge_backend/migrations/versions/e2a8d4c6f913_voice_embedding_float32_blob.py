@@ -0,0 +1,75 @@
+"""store users.voice_embedding as raw float32 bytes
+
+Revision ID: e2a8d4c6f913
+Revises: 9c3f5a1e7b24
+Create Date: 2026-10-16 14:05:12.318842
+
+"""
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a8d4c6f913'
+down_revision = '9c3f5a1e7b24'
+branch_labels = None
+depends_on = None
+
+# Model that produced every embedding enrolled before this migration
+LEGACY_MODEL = 'ecapa_voxceleb_offline'
+
+users = sa.table(
+    'users',
+    sa.column('id', sa.Integer),
+    sa.column('voice_embedding', sa.PickleType),
+    sa.column('voice_embedding_blob', sa.LargeBinary),
+    sa.column('voice_embedding_dim', sa.Integer),
+    sa.column('voice_embedding_model', sa.String),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('voice_embedding_blob', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('voice_embedding_dim', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('voice_embedding_model', sa.String(length=64), nullable=True))
+
+    # Pickled Python lists → little-endian float32 bytes
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(users.c.id, users.c.voice_embedding).where(users.c.voice_embedding.isnot(None))
+    ).fetchall()
+    for user_id, embedding in rows:
+        vector = np.asarray(embedding, dtype='<f4').reshape(-1)
+        conn.execute(
+            users.update().where(users.c.id == user_id).values(
+                voice_embedding_blob=vector.tobytes(),
+                voice_embedding_dim=int(vector.size),
+                voice_embedding_model=LEGACY_MODEL,
+            )
+        )
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('voice_embedding')
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('voice_embedding', sa.PickleType(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(users.c.id, users.c.voice_embedding_blob).where(users.c.voice_embedding_blob.isnot(None))
+    ).fetchall()
+    for user_id, blob in rows:
+        conn.execute(
+            users.update().where(users.c.id == user_id).values(
+                voice_embedding=np.frombuffer(blob, dtype='<f4').tolist()
+            )
+        )
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('voice_embedding_model')
+        batch_op.drop_column('voice_embedding_dim')
+        batch_op.drop_column('voice_embedding_blob')
@@ -136,6 +136,9 @@ except ImportError:
 os.environ.setdefault("FLASK_ENV", "testing")
 os.environ.setdefault("FLASK_DEBUG", "0")
 
+# Reminders are dispatched explicitly in tests, never by a background thread
+os.environ["REMINDER_DISPATCH_ENABLED"] = "false"
+
 # Use local SQLite DB for tests instead of Docker Postgres
 os.environ["DATABASE_URL"] = "sqlite:///test_voicenudge.db"
 os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ["DATABASE_URL"]
@@ -330,11 +333,17 @@ try:
     # 9.1 Patch the function in nlp_utils (for tests that import it directly)
     nlp_utils.parse_task = _simple_parse_task  # type: ignore[attr-defined]
 
+    def _simple_parse_tasks(texts, batch_size=64):
+        return [_simple_parse_task(t) for t in texts]
+
+    nlp_utils.parse_tasks = _simple_parse_tasks  # type: ignore[attr-defined]
+
     # 9.2 ALSO patch the symbol used inside voicenudge.tasks.routes
     try:
         from voicenudge.tasks import routes as tasks_routes
 
         tasks_routes.parse_task = _simple_parse_task  # type: ignore[attr-defined]
+        tasks_routes.parse_tasks = _simple_parse_tasks  # type: ignore[attr-defined]
     except Exception as e:
         print(f"[conftest] Could not patch voicenudge.tasks.routes.parse_task: {e}")
 
@@ -418,6 +427,15 @@ def auth_client(client, db, user):
 # =========================================================
 # 11. CLEAN TASKS / HISTORY BETWEEN TESTS
 # =========================================================
+@pytest.fixture(autouse=True)
+def _clear_prediction_caches():
+    """Cached predictions would hide the dummy models tests monkeypatch in."""
+    from voicenudge.ml.prediction_cache import prediction_cache, title_cache
+
+    prediction_cache.clear()
+    title_cache.clear()
+
+
 @pytest.fixture(autouse=True)
 def _clean_db_between_tests(db):
     """
@@ -1,5 +1,7 @@
 # tests/test_auth.py
 import json
+
+import pytest
 from voicenudge.models import User
 
 
@@ -105,3 +107,225 @@ def test_verify_security_fail(client, db):
     )
     assert resp.status_code == 401
     assert "Incorrect security answer" in resp.get_json()["error"]
+
+
+# ---------------------------
+# Voice embedding cache
+# ---------------------------
+
+def test_embedding_cache_hits_and_version_invalidation():
+    from voicenudge.auth.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(capacity=2)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return [0.1, 0.2, 0.3]
+
+    v1 = cache.get(7, 1, loader)
+    assert v1.dtype.name == "float32"
+    assert cache.get(7, 1, loader) is v1
+    assert len(loads) == 1
+
+    # Re-enrollment bumps the version → miss
+    cache.get(7, 2, loader)
+    assert len(loads) == 2
+
+    cache.invalidate(7)
+    cache.get(7, 2, loader)
+    assert len(loads) == 3
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+    assert stats["hit_rate"] == 0.25
+
+
+def test_embedding_cache_lru_eviction():
+    from voicenudge.auth.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(capacity=2)
+    cache.get(1, 1, lambda: [1.0])
+    cache.get(2, 1, lambda: [2.0])
+    cache.get(1, 1, lambda: [9.0])   # touch user 1
+    cache.get(3, 1, lambda: [3.0])   # evicts user 2
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get(1, 1, lambda: [9.0])[0] == 1.0
+    assert cache.get(2, 1, lambda: [5.0])[0] == 5.0
+
+
+def test_shared_embedding_table_roundtrip():
+    import uuid
+    import numpy as np
+    from voicenudge.auth.embedding_cache import SharedEmbeddingTable
+
+    name = f"vn_test_{uuid.uuid4().hex[:8]}"
+    writer = SharedEmbeddingTable(name, slots=16, max_dim=8)
+    reader = SharedEmbeddingTable(name, slots=16, max_dim=8)  # e.g. another worker
+    try:
+        writer.put(5, 3, np.array([1.0, 2.0, 3.0], dtype=np.float32))
+        assert reader.get(5, 3).tolist() == [1.0, 2.0, 3.0]
+        assert reader.get(5, 2) is None          # stale version
+        assert reader.get(21, 3) is None         # same slot, other user
+
+        writer.invalidate(5)
+        assert reader.get(5, 3) is None
+    finally:
+        reader.close()
+        writer._shm.unlink()
+        writer.close()
+
+
+def test_shared_embedding_table_keeps_existing_layout():
+    import uuid
+    import numpy as np
+    from multiprocessing import shared_memory
+    from voicenudge.auth.embedding_cache import SharedEmbeddingTable
+
+    name = f"vn_test_{uuid.uuid4().hex[:8]}"
+    old = SharedEmbeddingTable(name, slots=4, max_dim=8)
+    # Restarted with more slots configured: attaches with the segment's own layout
+    new = SharedEmbeddingTable(name, slots=4096, max_dim=8)
+    try:
+        assert (new.slots, new.max_dim) == (4, 8)
+        new.put(4095, 1, np.array([1.0], dtype=np.float32))
+        assert old.get(4095, 1).tolist() == [1.0]
+
+        junk = shared_memory.SharedMemory(name=name + "_junk", create=True, size=64)
+        try:
+            with pytest.raises(ValueError):
+                SharedEmbeddingTable(name + "_junk", slots=4, max_dim=8)
+        finally:
+            junk.close()
+            junk.unlink()
+    finally:
+        new.close()
+        old._shm.unlink()
+        old.close()
+
+
+def test_set_voice_embedding_bumps_version(db):
+    import numpy as np
+
+    u = User(name="Voice", email="voice@example.com")
+    u.set_password("pw")
+    assert not u.has_voice_embedding
+
+    u.set_voice_embedding(np.array([0.5, 0.5], dtype=np.float32))
+    u.set_voice_embedding(np.array([0.6, 0.4], dtype=np.float32))
+    assert u.has_voice_embedding
+    assert u.voice_embedding_version == 2
+
+
+def test_voice_embedding_stored_as_float32_bytes(db):
+    import numpy as np
+
+    u = User(name="Blob", email="blob@example.com")
+    u.set_password("pw")
+    u.set_voice_embedding(np.arange(192, dtype=np.float64), model_version="ecapa-test")
+    db.session.add(u)
+    db.session.commit()
+
+    db.session.expire_all()
+    u = User.query.filter_by(email="blob@example.com").first()
+    assert len(u.voice_embedding_blob) == 192 * 4
+    assert u.voice_embedding_dim == 192
+    assert u.voice_embedding_model == "ecapa-test"
+    assert u.voice_embedding.dtype == np.dtype("<f4")
+    assert np.array_equal(u.voice_embedding, np.arange(192, dtype=np.float32))
+
+
+def test_compare_embeddings_accepts_stored_bytes():
+    import numpy as np
+    from voicenudge.auth.voice_auth import VoiceAuth
+
+    va = object.__new__(VoiceAuth)
+    blob = np.array([1.0, 0.0, 0.0], dtype="<f4").tobytes()
+    assert abs(va.compare_embeddings(blob, [[1.0, 0.0, 0.0]]) - 1.0) < 1e-6
+    assert abs(va.compare_embeddings(memoryview(blob), [0.0, 1.0, 0.0])) < 1e-6
+
+
+def test_embedding_cache_reads_bytes_zero_copy():
+    import numpy as np
+    from voicenudge.auth.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(capacity=2)
+    blob = np.array([0.25, 0.75], dtype="<f4").tobytes()
+    vector = cache.get(1, 1, lambda: blob)
+    assert vector.dtype == np.dtype("<f4")
+    assert vector.tolist() == [0.25, 0.75]
+
+
+def test_embedding_metrics_endpoint(auth_client):
+    resp = auth_client.get("/api/metrics/embeddings")
+    assert resp.status_code == 200
+    assert "hit_rate" in resp.get_json()
+
+
+def test_metrics_require_login_unless_public(app, client, monkeypatch):
+    for path in ("stt", "models", "embeddings", "predictions", "reminders", "mail"):
+        assert client.get(f"/api/metrics/{path}").status_code == 401
+
+    monkeypatch.setitem(app.config, "METRICS_PUBLIC", True)
+    assert client.get("/api/metrics/models").status_code == 200
+
+
+def _reembed_setup(app, db, tmp_path, monkeypatch):
+    import numpy as np
+    from voicenudge.auth import routes as auth_routes
+    from voicenudge.auth.enrollment import save_enrollment_audio
+
+    monkeypatch.setitem(app.config, "VOICE_ENROLLMENT_DIR", str(tmp_path))
+
+    class FakeAuth:
+        calls = 0
+
+        def get_embeddings(self, audios, batch_size=16):
+            FakeAuth.calls += 1
+            return [np.full(4, len(a), dtype=np.float32) for a in audios]
+
+    monkeypatch.setattr(auth_routes, "get_voice_auth", lambda: FakeAuth())
+
+    # Users persist across tests: start from "nobody enrolled"
+    User.query.filter(User.email.like("%@reembed.test")).delete(synchronize_session=False)
+    User.query.update({User.voice_embedding_version: 0}, synchronize_session=False)
+    db.session.commit()
+
+    users = []
+    for i, seconds in enumerate([1, 2, 0]):
+        u = User(name=f"R{i}", email=f"r{i}@reembed.test")
+        u.set_password("pw")
+        u.set_voice_embedding(np.zeros(4, dtype=np.float32), model_version="old")
+        db.session.add(u)
+        db.session.commit()
+        if seconds:
+            save_enrollment_audio(u.id, np.zeros(16000 * seconds, dtype=np.float32))
+        users.append(u)
+    return users, FakeAuth
+
+
+def test_reembed_users_from_stored_audio(app, db, tmp_path, monkeypatch):
+    from voicenudge.auth.enrollment import reembed_users
+
+    users, fake = _reembed_setup(app, db, tmp_path, monkeypatch)
+    stats = reembed_users("new", batch_size=8, chunk_size=1)
+
+    assert stats == {"pending": 3, "done": 2, "failed": 0, "missing_audio": 1}
+    assert fake.calls == 2  # one call per chunk
+    db.session.expire_all()
+    assert users[0].voice_embedding_model == "new"
+    assert users[0].voice_embedding.tolist() == [16000.0] * 4
+    assert users[1].voice_embedding_version == 2
+    assert users[2].voice_embedding_model == "old"  # no audio → untouched
+
+    # Resume: users already on the target model are skipped
+    assert reembed_users("new")["pending"] == 1
+
+
+def test_reembed_cli_command(app, db, tmp_path, monkeypatch):
+    _reembed_setup(app, db, tmp_path, monkeypatch)
+
+    result = app.test_cli_runner().invoke(args=["voice", "reembed", "--model-version", "new"])
+    assert result.exit_code == 0, result.output
+    assert User.query.filter_by(voice_embedding_model="new").count() == 2
@@ -110,3 +110,70 @@ def test_clear_history_deletes_only_archived(auth_client, db, user):
     remaining_task = Task.query.filter_by(user_id=user.id).first()
     assert remaining_task is not None
     assert remaining_task.status == "completed"
+
+
+def _seed_history(db, user, count):
+    db.session.add(Task(user_id=user.id, text="done", title="done task", category="Work", status="completed"))
+    db.session.add_all([
+        TaskHistory(user_id=user.id, text=f"old {i}", title=f"old {i}", category="Personal")
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def test_list_history_streams_ndjson_and_json(auth_client, db, user):
+    import json
+
+    _seed_history(db, user, 3)
+
+    resp = auth_client.get("/api/history/?stream=ndjson")
+    assert resp.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert len(lines) == 4
+    assert {line["source"] for line in lines} == {"tasks", "history"}
+
+    # Chunked array decodes to the same entries as the non-streaming response
+    streamed = json.loads(auth_client.get("/api/history/?stream=json").get_data(as_text=True))
+    assert streamed == auth_client.get("/api/history/").get_json()
+
+
+def test_export_history_csv(auth_client, db, user):
+    _seed_history(db, user, 2)
+
+    resp = auth_client.get("/api/history/export?format=csv")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/csv"
+    assert "attachment" in resp.headers["Content-Disposition"]
+    rows = resp.get_data(as_text=True).splitlines()
+    assert rows[0] == "id,title,due_at,category,priority,status,completed_at,source"
+    assert len(rows) == 1 + 3
+
+    assert auth_client.get("/api/history/export?format=xml").status_code == 400
+
+
+def test_list_history_pages_newest_first(auth_client, db, user):
+    from datetime import datetime, timedelta
+
+    base = datetime(2026, 5, 1, 12, 0)
+    db.session.add(Task(user_id=user.id, text="t", title="task", status="completed", created_at=base))
+    db.session.add_all([
+        TaskHistory(user_id=user.id, text=f"h{i}", title=f"h{i}", category="Work" if i % 2 else "Home",
+                    completed_at=base + timedelta(days=i - 2))
+        for i in range(5)
+    ])
+    db.session.commit()
+
+    titles, cursor = [], None
+    while True:
+        page = auth_client.get("/api/history/?limit=2" + (f"&cursor={cursor}" if cursor else "")).get_json()
+        titles += [h["title"] for h in page["history"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    # h2 and the completed task share a timestamp: ties break on source, then id
+    assert titles == ["h4", "h3", "task", "h2", "h1", "h0"]
+
+    page = auth_client.get("/api/history/?limit=10&category=Work&from=2026-05-01").get_json()
+    assert [h["title"] for h in page["history"]] == ["h3"]
+
+    assert auth_client.get("/api/history/?from=yesterday").status_code == 400
@@ -0,0 +1,129 @@
+# tests/test_mailer.py
+import socketserver
+import threading
+import time
+
+import pytest
+from flask_mail import Mail, Message
+
+from voicenudge.reminders.mailer import FAILED, SENT, MailPool
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: records messages, can reject MAIL FROM."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost debugging SMTP")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            verb = line[:4].upper()
+            if not line or verb == "QUIT":
+                self.reply("221 bye")
+                return
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                with server.lock:
+                    code = server.reject.pop(0) if server.reject else None
+                self.reply(f"{code} rejected" if code else "250 OK")
+            elif verb == "DATA":
+                self.reply("354 end with .")
+                data = []
+                while (chunk := self.rfile.readline()) != b".\r\n":
+                    data.append(chunk)
+                with server.lock:
+                    server.messages.append(b"".join(data))
+                self.reply("250 queued")
+            else:  # RCPT, RSET, NOOP
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.messages = []
+    server.reject = []  # SMTP codes to answer the next MAIL FROM commands with
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pool(app, smtp_server, monkeypatch):
+    state = Mail().init_mail({
+        "MAIL_SERVER": "127.0.0.1",
+        "MAIL_PORT": smtp_server.server_address[1],
+        "MAIL_USE_TLS": False,
+        "MAIL_MAX_EMAILS": 100,
+    })
+    monkeypatch.setitem(app.extensions, "mail", state)
+
+    pool = MailPool()
+    pool.app = app
+    pool.workers = 2
+    pool.retry_base = 0.05
+    pool.timeout = 10
+    yield pool
+    pool.shutdown()
+
+
+def _message(i):
+    return Message(subject=f"reminder {i}", sender="noreply@example.com",
+                   recipients=[f"user{i}@example.com"], body="hi")
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.02)
+    return predicate()
+
+
+def test_burst_reuses_persistent_connections(pool, smtp_server):
+    results = pool.send_many([_message(i) for i in range(25)])
+
+    assert results == [True] * 25
+    assert len(smtp_server.messages) == 25
+    assert smtp_server.connections <= pool.workers  # no handshake per message
+    assert pool.stats()["sent"] == 25
+
+
+def test_transient_failure_is_retried_with_backoff(pool, smtp_server):
+    smtp_server.reject = [451, 451]
+
+    future = pool.submit(_message(0))
+
+    assert future.result(timeout=5) == SENT  # resolves only once the retries settle
+    assert len(smtp_server.messages) == 1
+    assert pool.stats()["retried"] == 2
+
+
+def test_permanent_failure_is_not_retried(pool, smtp_server):
+    smtp_server.reject = [550]
+
+    assert pool.submit(_message(0)).result(timeout=5) == FAILED
+    assert pool.submit(_message(1)).result(timeout=5) == SENT
+    assert pool.stats()["retried"] == 0
+    assert len(smtp_server.messages) == 1
+
+
+def test_send_many_withdraws_messages_still_retrying_at_deadline(pool, smtp_server):
+    smtp_server.reject = [451] * 3
+    pool.retry_base = 0.3
+
+    results = pool.send_many([_message(0)], timeout=0.1)
+
+    assert results == [False]  # not sent: the caller retries it later
+    assert pool.stats()["withdrawn"] == 1
+    time.sleep(1)  # past the retry delay: the pool must not send it behind the caller's back
+    assert smtp_server.messages == []
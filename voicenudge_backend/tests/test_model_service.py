@@ -35,3 +35,203 @@ def test_predict_priority_with_dummy_model(monkeypatch):
     monkeypatch.setattr(model_service, "priority_model", DummyModel())
     result = model_service.predict_priority("Urgent call customer")
     assert result == "High"
+
+
+def test_batch_predictions_call_model_once(monkeypatch):
+    calls = []
+
+    class DummyModel:
+        def predict(self, X):
+            calls.append(list(X))
+            return ["Work"] * len(X)
+
+    monkeypatch.setattr(model_service, "category_model", DummyModel())
+    monkeypatch.setattr(model_service, "priority_model", None)
+    texts = ["Write report", "Email boss", "Book flights"]
+
+    assert model_service.predict_categories(texts) == ["Work"] * 3
+    assert calls == [texts]
+    assert model_service.predict_priorities(texts) == ["Medium"] * 3
+
+
+def test_predict_all_vectorizes_once_for_both_heads(monkeypatch):
+    import numpy as np
+
+    from voicenudge.ml.multihead import MultiHeadModel
+
+    transforms = []
+
+    class Vectorizer:
+        def transform(self, texts):
+            transforms.append(list(texts))
+            return np.zeros((len(texts), 2))
+
+    class Head:
+        def __init__(self, classes, best):
+            self.classes_ = np.array(classes)
+            self.best = best
+
+        def predict_proba(self, X):
+            probs = np.full((X.shape[0], len(self.classes_)), 0.1)
+            probs[:, self.best] = 1 - 0.1 * (len(self.classes_) - 1)
+            return probs
+
+    model = MultiHeadModel(Vectorizer(), {
+        "category": Head(["Finance", "Work"], best=1),
+        "priority": Head(["High", "Low", "Medium"], best=0),
+    })
+    monkeypatch.setattr(model_service, "multihead_model", model)
+
+    rows = model_service.predict_all(["Write report", "Pay rent"])
+
+    assert transforms == [["Write report", "Pay rent"]]
+    assert rows[0] == {"category": "Work", "category_confidence": 0.9,
+                       "priority": "High", "priority_confidence": 0.8}
+    assert len(rows) == 2
+
+
+def test_predict_all_falls_back_without_models(monkeypatch):
+    for name in ("multihead_model", "category_model", "priority_model"):
+        monkeypatch.setattr(model_service, name, None)
+
+    assert model_service.predict_all(["Anything"]) == [
+        {"category": "Personal", "category_confidence": None,
+         "priority": "Medium", "priority_confidence": None}
+    ]
+
+
+def test_predict_loads_model_lazily_once(monkeypatch):
+    """Models load on first prediction, not at import, and only once."""
+    loads = []
+
+    class DummyModel:
+        def predict(self, X):
+            return ["Work"]
+
+    def fake_load(path):
+        loads.append(path)
+        return DummyModel()
+
+    monkeypatch.setattr(model_service, "_load", fake_load)
+    monkeypatch.setattr(model_service, "category_model", model_service._NOT_LOADED)
+    monkeypatch.setattr(
+        model_service,
+        "_category",
+        model_service.lazy_model(
+            "category-model", lambda: model_service._load(model_service.CATEGORY_MODEL_PATH)
+        ),
+    )
+
+    assert loads == []
+    assert model_service.predict_category("Write report") == "Work"
+    assert model_service.predict_category("Email boss") == "Work"
+    assert loads == [model_service.CATEGORY_MODEL_PATH]
+
+
+def test_lazy_model_is_thread_safe():
+    import threading
+    import time
+    from voicenudge.model_loader import LazyModel
+
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    lazy = LazyModel("slow", slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(lazy.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert lazy.load_seconds is not None
+
+
+def test_model_metrics_endpoint(auth_client):
+    resp = auth_client.get("/api/metrics/models")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert "category-model" in data
+    assert set(data["category-model"]) == {"loaded", "load_seconds"}
+
+
+def test_predictions_are_cached_by_normalized_text(monkeypatch):
+    calls = []
+
+    class DummyModel:
+        def predict(self, X):
+            calls.append(list(X))
+            return ["Finance"] * len(X)
+
+    monkeypatch.setattr(model_service, "category_model", DummyModel())
+    before = model_service.prediction_cache.stats()
+
+    assert model_service.predict_category("Pay rent") == "Finance"
+    assert model_service.predict_categories(["  pay   RENT ", "Pay rent", "Pay gas"]) == ["Finance"] * 3
+
+    assert calls == [["Pay rent"], ["Pay gas"]]  # repeats and duplicates hit the cache
+    stats = model_service.prediction_cache.stats()
+    assert stats["hits"] - before["hits"] == 2
+    assert stats["misses"] - before["misses"] == 2  # "pay rent" once, "pay gas" once
+
+
+def test_changed_model_file_invalidates_cache(monkeypatch, tmp_path):
+    import os
+
+    path = tmp_path / "category.joblib"
+    path.write_bytes(b"v1")
+    labels = iter(["Work", "Study"])
+
+    class DummyModel:
+        def __init__(self):
+            self.label = next(labels)
+
+        def predict(self, X):
+            return [self.label] * len(X)
+
+    monkeypatch.setattr(model_service, "CATEGORY_MODEL_PATH", str(path))
+    monkeypatch.setattr(model_service, "_load", lambda p: DummyModel() if p == str(path) else None)
+    monkeypatch.setattr(model_service, "category_model", model_service._NOT_LOADED)
+    monkeypatch.setattr(
+        model_service, "_category",
+        model_service.lazy_model("category-model", lambda: model_service._load(model_service.CATEGORY_MODEL_PATH)),
+    )
+
+    assert model_service.predict_category("Revise notes") == "Work"
+    assert model_service.predict_category("Revise notes") == "Work"
+    invalidations = model_service.prediction_cache.stats()["invalidations"]
+
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))  # "retrained"
+    assert model_service.predict_category("Revise notes") == "Study"
+    assert model_service.prediction_cache.stats()["invalidations"] == invalidations + 1
+
+
+def test_prediction_cache_lru_and_ttl():
+    from voicenudge.ml.prediction_cache import PredictionCache
+
+    cache = PredictionCache("test", capacity=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    cache.ttl_seconds = 0
+    cache.put("d", 4)  # expires immediately
+    assert cache.get("d") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_prediction_metrics_endpoint(auth_client):
+    resp = auth_client.get("/api/metrics/predictions")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert set(data) == {"predictions", "titles"}
+    assert "hit_rate" in data["predictions"]
@@ -0,0 +1,335 @@
+# tests/test_reminders.py
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from voicenudge.models import Reminder, Task, TaskHistory
+
+
+def _reminder(db, user, delta):
+    now = datetime.now(timezone.utc)
+    t = Task(user_id=user.id, text="Pay bills", title="pay bills", due_at=now + delta)
+    db.session.add(t)
+    db.session.commit()
+    r = Reminder(user_id=user.id, task_id=t.id, remind_at=now + delta, sent=False)
+    db.session.add(r)
+    db.session.commit()
+    return r
+
+
+def _capture_emails(monkeypatch):
+    sent = []
+
+    def fake_send_emails(app_, emails):
+        emails = list(emails)
+        sent.extend((to, subject) for to, subject, _body, _html in emails)
+        return [True] * len(emails)
+
+    monkeypatch.setattr("voicenudge.reminders.scheduler.send_emails", fake_send_emails)
+    return sent
+
+
+def test_dispatcher_sends_only_due_reminders(app, db, user, monkeypatch):
+    from voicenudge.reminders.dispatcher import ReminderDispatcher
+
+    sent = _capture_emails(monkeypatch)
+    due = _reminder(db, user, timedelta(minutes=-1))
+    later = _reminder(db, user, timedelta(hours=1))
+
+    dispatcher = ReminderDispatcher(capacity=10)
+    dispatcher.app = app
+    wait = dispatcher.run_pending()
+
+    assert sent == [(user.email, "[VoiceNudge] Reminder: pay bills")]
+    assert db.session.get(Reminder, due.id).sent
+    assert not db.session.get(Reminder, later.id).sent
+    assert TaskHistory.query.count() == 1
+    # Sleeps until the next reminder, not a fixed poll interval
+    assert 3500 < wait <= 3600
+
+
+def test_dispatcher_refills_past_heap_capacity(app, db, user, monkeypatch):
+    from voicenudge.reminders.dispatcher import ReminderDispatcher
+
+    sent = _capture_emails(monkeypatch)
+    for minutes in (-3, -2, -1):
+        _reminder(db, user, timedelta(minutes=minutes))
+
+    dispatcher = ReminderDispatcher(capacity=2)
+    dispatcher.app = app
+    dispatcher.run_pending()  # first two, then refill picks up the third
+    assert dispatcher.stats()["queued"] == 1
+    dispatcher.run_pending()
+
+    assert len(sent) == 3
+    assert Reminder.query.filter_by(sent=False).count() == 0
+
+
+def test_dispatcher_backs_off_until_failed_leases_expire(app, db, user, monkeypatch):
+    from voicenudge.reminders.dispatcher import ReminderDispatcher
+
+    attempts = []
+
+    def failing_send_emails(app_, emails):
+        emails = list(emails)
+        attempts.extend(to for to, _subject, _body, _html in emails)
+        return [False] * len(emails)
+
+    monkeypatch.setattr("voicenudge.reminders.scheduler.send_emails", failing_send_emails)
+    for minutes in (-3, -2, -1):
+        _reminder(db, user, timedelta(minutes=minutes))
+
+    dispatcher = ReminderDispatcher(capacity=2, resync_seconds=3600, lease_seconds=300)
+    dispatcher.app = app
+    waits = [dispatcher.run_pending() for _ in range(6)]
+
+    # Every reminder is tried once; the leased failures aren't reloaded and spun on
+    assert len(attempts) == 3
+    assert all(wait is None or wait > 0 for wait in waits[2:])
+    stats = dispatcher.stats()
+    assert stats["failed"] == 3 and stats["refills"] == 2
+    # ...and the next resync is when their leases expire, not the hourly one
+    assert 250 < stats["next_resync_in_s"] <= 301
+
+    Reminder.query.update({Reminder.claimed_at: datetime.utcnow() - timedelta(minutes=10)})
+    db.session.commit()
+    dispatcher._next_resync = 0.0  # the lease expiry has come
+    dispatcher.run_pending()
+    assert len(attempts) == 5  # retried (capacity 2 per pass)
+
+
+def test_dispatcher_wakes_on_notify(app, db, user, monkeypatch):
+    from voicenudge.reminders.dispatcher import ReminderDispatcher
+
+    sent = _capture_emails(monkeypatch)
+    dispatcher = ReminderDispatcher(capacity=10, resync_seconds=3600)
+    dispatcher.start(app)
+    try:
+        time.sleep(0.2)  # initial load finds nothing; thread now sleeps for an hour
+        r = _reminder(db, user, timedelta(milliseconds=300))
+        dispatcher.notify(r)
+
+        deadline = time.time() + 5
+        while not sent and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        dispatcher.stop()
+
+    assert len(sent) == 1
+    assert dispatcher.stats()["last_lag_ms"] < 1000
+
+
+def test_notify_without_local_dispatcher_publishes_to_worker(app, db, user, monkeypatch):
+    from voicenudge.reminders.dispatcher import NOTIFY_CHANNEL, ReminderDispatcher
+
+    reminders = [_reminder(db, user, timedelta(minutes=m)) for m in (10, 20)]
+    published = []
+    monkeypatch.setattr(db.engine.dialect, "name", "postgresql")
+    monkeypatch.setattr(db.session, "execute", lambda stmt, params: published.append(params))
+
+    dispatcher = ReminderDispatcher()  # not running here: REMINDER_WEB_DISPATCH=false
+    dispatcher.notify_many(reminders)
+
+    assert [p["channel"] for p in published] == [NOTIFY_CHANNEL] * 2
+    rid, ts = published[0]["payload"].split(":")
+    assert int(rid) == reminders[0].id
+    assert abs(float(ts) - reminders[0].remind_at.replace(tzinfo=timezone.utc).timestamp()) < 1
+    assert dispatcher.stats()["published"] == 2
+
+
+def test_worker_without_listen_notify_resyncs_every_minute(app, db):
+    from voicenudge.reminders.dispatcher import ReminderDispatcher
+
+    dispatcher = ReminderDispatcher(resync_seconds=300)
+    dispatcher.start(app, listen=True)  # SQLite: no LISTEN/NOTIFY
+    try:
+        assert dispatcher.resync_seconds == 60
+    finally:
+        dispatcher.stop()
+
+
+def test_preloading_master_defers_dispatcher_to_post_fork(monkeypatch):
+    import runpy
+    import types
+    from sqlalchemy.engine import Engine
+    from voicenudge import create_app
+    from voicenudge.reminders import scheduler
+
+    started, disposed = [], []
+    monkeypatch.setattr(scheduler, "init_scheduler", lambda app_: started.append(app_))
+    monkeypatch.setattr(Engine, "dispose", lambda self, close=True: disposed.append(close))
+    monkeypatch.setenv("PRELOAD_MODELS", "true")
+    monkeypatch.delenv("VOICENUDGE_PRELOADING", raising=False)
+
+    conf = runpy.run_path(os.path.join(os.path.dirname(__file__), "..", "gunicorn.conf.py"))
+    assert conf["preload_app"]
+    app = create_app()  # as in the master: no dispatcher yet
+    assert started == []
+
+    worker = types.SimpleNamespace(app=types.SimpleNamespace(wsgi=lambda: app))
+    conf["post_fork"](None, worker)
+    assert started == [app]
+    assert disposed == [False]  # inherited connections dropped, not closed
+
+
+def test_reminder_metrics_endpoint(auth_client):
+    resp = auth_client.get("/api/metrics/reminders")
+    assert resp.status_code == 200
+    assert "queued" in resp.get_json()
+
+
+def test_iter_due_reminders_pages_with_joined_rows(app, db, user):
+    from sqlalchemy import event
+
+    from voicenudge.reminders.scheduler import iter_due_reminders
+
+    for minutes in (-5, -4, -3, -2, -1):
+        _reminder(db, user, timedelta(minutes=minutes))
+    _reminder(db, user, timedelta(hours=1))
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        chunks = []
+        for chunk in iter_due_reminders(datetime.now(timezone.utc), chunk_size=2):
+            # Task and user arrive with the reminder: no extra query per row
+            chunks.append([(r.task.title, r.user.email) for r in chunk])
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert len(statements) == 2 * len(chunks)  # one claim UPDATE + one joined SELECT each
+
+
+def test_check_reminders_drains_backlog(app, db, user, monkeypatch):
+    from voicenudge.reminders.scheduler import check_reminders
+
+    sent = _capture_emails(monkeypatch)
+    monkeypatch.setitem(app.config, "REMINDER_FETCH_CHUNK", 2)
+    for minutes in (-3, -2, -1):
+        _reminder(db, user, timedelta(minutes=minutes))
+
+    check_reminders(app)
+
+    assert len(sent) == 3
+    assert Reminder.query.filter_by(sent=False).count() == 0
+
+
+def test_workers_claim_disjoint_batches(app, db, user, monkeypatch):
+    from voicenudge.reminders import scheduler
+
+    for minutes in (-4, -3, -2, -1):
+        _reminder(db, user, timedelta(minutes=minutes))
+    now = datetime.now(timezone.utc)
+
+    monkeypatch.setattr(scheduler, "worker_id", lambda: "web-1:100")
+    first = [r.id for r in scheduler.claim_due_reminders(now, limit=3)]
+    monkeypatch.setattr(scheduler, "worker_id", lambda: "web-2:200")
+    second = [r.id for r in scheduler.claim_due_reminders(now, limit=3)]
+
+    assert len(first) == 3 and len(second) == 1
+    assert not set(first) & set(second)
+    assert {r.claimed_by for r in Reminder.query.all()} == {"web-1:100", "web-2:200"}
+
+
+def test_expired_lease_is_reclaimed(app, db, user):
+    from voicenudge.reminders.scheduler import claim_due_reminders
+
+    r = _reminder(db, user, timedelta(minutes=-1))
+    now = datetime.now(timezone.utc)
+
+    assert [c.id for c in claim_due_reminders(now, limit=10)] == [r.id]
+    assert claim_due_reminders(now, limit=10) == []  # still leased
+
+    r.claimed_at = datetime.utcnow() - timedelta(minutes=10)
+    db.session.commit()
+    assert [c.id for c in claim_due_reminders(now, limit=10, lease_seconds=300)] == [r.id]
+
+
+def test_worker_app_skips_speech_and_ml_stack():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "from voicenudge.reminders.worker import create_worker_app\n"
+        "import voicenudge.reminders.dispatcher\n"
+        "create_worker_app()\n"
+        "heavy = {'whisper', 'torch', 'spacy', 'speechbrain', 'sklearn', 'dateparser'}\n"
+        "print(sorted(heavy & set(sys.modules)))\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_render_reminder_bodies():
+    from types import SimpleNamespace
+
+    from voicenudge.reminders.render import render_reminder
+
+    due = datetime(2026, 3, 1, 9, 0, tzinfo=timezone.utc)
+    task = SimpleNamespace(title="Pay <rent>", text="pay rent", due_at=due)
+    user = SimpleNamespace(name="Asha", email="asha@example.com")
+
+    to, subject, body, html = render_reminder(task, user)
+
+    assert (to, subject) == ("asha@example.com", "[VoiceNudge] Reminder: Pay <rent>")
+    assert body.startswith("Hi Asha,\n\nThis is your reminder for:\n- Pay <rent>\n")
+    assert "Add to your Google Calendar:\nhttps://www.google.com/calendar/render?action=TEMPLATE&text=Pay+%3Crent%3E" in body
+    assert body.endswith("\n\n— VoiceNudge")
+    assert "Pay &lt;rent&gt;" in html  # HTML body is autoescaped
+
+    task.due_at = None
+    _, _, body, html = render_reminder(task, user)
+    assert html is None
+    assert "Google Calendar" not in body
+
+
+def test_digest_collapses_user_reminders_into_one_email(app, db, user, monkeypatch):
+    from sqlalchemy import event
+
+    from voicenudge.reminders.scheduler import check_reminders
+
+    sent = _capture_emails(monkeypatch)
+    monkeypatch.setitem(app.config, "REMINDER_DIGEST_ENABLED", True)
+    monkeypatch.setitem(app.config, "REMINDER_DIGEST_WINDOW_SECONDS", 900)
+    due = [_reminder(db, user, timedelta(minutes=m)) for m in (-2, -1, 10)]
+    later = _reminder(db, user, timedelta(hours=2))
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        check_reminders(app)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    # Only the two joined loads (due chunk + digest window): no per-row lazy loads
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 2
+    assert sent == [(user.email, "[VoiceNudge] 3 reminders coming up")]
+    assert all(db.session.get(Reminder, r.id).sent for r in due)
+    assert not db.session.get(Reminder, later.id).sent
+    assert TaskHistory.query.count() == 3
+
+
+def test_digest_caps_and_releases_rows_past_max_items(app, db, user, monkeypatch):
+    from voicenudge.reminders.scheduler import check_reminders
+
+    sent = _capture_emails(monkeypatch)
+    monkeypatch.setitem(app.config, "REMINDER_DIGEST_ENABLED", True)
+    monkeypatch.setitem(app.config, "REMINDER_DIGEST_WINDOW_SECONDS", 900)
+    monkeypatch.setitem(app.config, "REMINDER_DIGEST_MAX_ITEMS", 3)
+    _reminder(db, user, timedelta(minutes=-1))
+    upcoming = [_reminder(db, user, timedelta(minutes=m)) for m in (1, 2, 3, 4)]
+
+    check_reminders(app)
+
+    assert sent == [(user.email, "[VoiceNudge] 3 reminders coming up")]
+    rows = [db.session.get(Reminder, r.id) for r in upcoming]
+    assert [r.sent for r in rows] == [True, True, False, False]
+    # Left for the next run straight away, not parked under this worker's lease
+    assert [r.claimed_by for r in rows[2:]] == [None, None]
@@ -78,6 +78,199 @@ def test_transcribe_audio_translate_false(monkeypatch, tmp_path):
     assert calls["task"] == "transcribe"
 
 
+def _load_dual_stub(monkeypatch, language):
+    """
+    Reload whisper_stt against a stub model and record which stages run.
+    """
+    import numpy as np
+    import whisper
+
+    class FakeModel:
+        def transcribe(self, path, task):
+            raise AssertionError("transcribe_dual must not call model.transcribe")
+
+    monkeypatch.setattr(whisper, "load_model", lambda size: FakeModel())
+
+    import importlib
+    from voicenudge.speech import whisper_stt
+    importlib.reload(whisper_stt)
+
+    calls = {"encode": 0, "decode": []}
+
+    def fake_encode(audios):
+        calls["encode"] += 1
+        return np.arange(len(audios))
+
+    def fake_decode(features, task):
+        calls["decode"].append((task, list(features)))
+        if task == "transcribe":
+            return [(f"native {i}", language) for i in features]
+        return [(f"english {i}", language) for i in features]
+
+    monkeypatch.setattr(whisper_stt, "decode_audio", lambda path: np.zeros(16000, dtype=np.float32))
+    monkeypatch.setattr(whisper_stt, "_encode", fake_encode)
+    monkeypatch.setattr(whisper_stt, "_decode", fake_decode)
+    return whisper_stt, calls
+
+
+def test_transcribe_dual_encodes_once(monkeypatch):
+    """
+    Non-English audio → one encoder run, two decodes (transcribe + translate).
+    """
+    whisper_stt, calls = _load_dual_stub(monkeypatch, language="hi")
+
+    native, english = whisper_stt.transcribe_dual("clip.wav")
+
+    assert (native, english) == ("native 0", "english 0")
+    assert calls["encode"] == 1
+    assert [task for task, _ in calls["decode"]] == ["transcribe", "translate"]
+
+
+def test_transcribe_dual_skips_translate_for_english(monkeypatch):
+    whisper_stt, calls = _load_dual_stub(monkeypatch, language="en")
+
+    native, english = whisper_stt.transcribe_dual("clip.wav")
+
+    assert native == english == "native 0"
+    assert [task for task, _ in calls["decode"]] == ["transcribe"]
+
+
+def test_transcribe_dual_batch_shares_encoder_pass(monkeypatch):
+    """
+    A batch of clips → one encoder run for the whole batch.
+    """
+    import numpy as np
+
+    whisper_stt, calls = _load_dual_stub(monkeypatch, language="ta")
+
+    clips = [np.zeros(16000, dtype=np.float32) for _ in range(3)]
+    results = whisper_stt.transcribe_dual_batch(clips)
+
+    assert results == [(f"native {i}", f"english {i}") for i in range(3)]
+    assert calls["encode"] == 1
+    assert calls["decode"] == [("transcribe", [0, 1, 2]), ("translate", [0, 1, 2])]
+
+
+# -----------------------------------------
+# In-process audio decoding
+# -----------------------------------------
+
+def _wav_bytes(samples, rate, channels=1, width=2):
+    import io
+    import wave
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(width)
+        w.setframerate(rate)
+        w.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+def test_decode_audio_downmixes_and_resamples_wav():
+    import io
+    import numpy as np
+    from voicenudge.speech.audio import SAMPLE_RATE, decode_audio
+
+    # 1s of 48 kHz stereo 16-bit: left = half scale, right = silence
+    stereo = np.zeros((48000, 2), dtype="<i2")
+    stereo[:, 0] = 16384
+    audio = decode_audio(io.BytesIO(_wav_bytes(stereo, 48000, channels=2)))
+
+    assert audio.dtype == np.float32
+    assert audio.shape == (SAMPLE_RATE,)
+    assert abs(float(np.median(audio)) - 0.25) < 1e-3
+
+
+def test_decode_audio_24bit_wav_sign_extends():
+    import numpy as np
+    from voicenudge.speech.audio import decode_audio
+
+    # -1.0 and +0.5 as packed little-endian 24-bit samples
+    packed = np.frombuffer(b"\x00\x00\x80" + b"\x00\x00\x40", dtype=np.uint8)
+    audio = decode_audio(_wav_bytes(packed, 16000, width=3))
+    assert audio.tolist() == [-1.0, 0.5]
+
+
+def test_decode_audio_compressed_in_process():
+    import io
+    import numpy as np
+    av = pytest.importorskip("av")
+    from voicenudge.speech.audio import SAMPLE_RATE, decode_audio
+
+    # Encode 1s of 48 kHz tone as Ogg/Opus in memory, like a browser recording
+    buf = io.BytesIO()
+    with av.open(buf, "w", format="ogg") as out:
+        stream = out.add_stream("libopus", rate=48000, layout="mono")
+        tone = (0.3 * np.sin(np.arange(48000) * 2 * np.pi * 440 / 48000)).astype(np.float32)
+        frame = av.AudioFrame.from_ndarray(tone[None, :], format="flt", layout="mono")
+        frame.sample_rate = 48000
+        for packet in stream.encode(frame):
+            out.mux(packet)
+        for packet in stream.encode(None):
+            out.mux(packet)
+
+    audio = decode_audio(buf.getvalue())
+    assert audio.dtype == np.float32
+    assert abs(len(audio) - SAMPLE_RATE) < SAMPLE_RATE * 0.05
+    assert 0.1 < float(np.abs(audio).max()) < 0.5
+
+
+def test_decode_audio_rejects_garbage():
+    from voicenudge.speech.audio import AudioDecodeError, decode_audio
+
+    with pytest.raises(AudioDecodeError):
+        decode_audio(b"RIFF fake wav")
+
+
+def test_voiceauth_embeds_decoded_samples_without_files():
+    import numpy as np
+    from voicenudge.auth import voice_auth as va_module
+
+    seen = {}
+
+    class FakeEncoder:
+        def encode_batch(self, signal, wav_lens=None):
+            seen["shape"] = tuple(signal.shape)
+            return signal[:, :3]
+
+    va = object.__new__(va_module.VoiceAuth)
+    va.model = FakeEncoder()
+
+    audio = np.full(16000 * 15, 0.1, dtype=np.float32)
+    emb = va.get_embedding(audio)
+    assert seen["shape"] == (1, 16000 * 15)
+    assert emb.shape == (3,)
+
+    with pytest.raises(ValueError):
+        va.get_embedding(audio[:16000])
+
+
+def test_voiceauth_batch_buckets_by_length_and_passes_wav_lens():
+    import numpy as np
+    from voicenudge.auth import voice_auth as va_module
+
+    batches = []
+
+    class FakeEncoder:
+        def encode_batch(self, wavs, wav_lens):
+            batches.append((tuple(wavs.shape), [round(float(x), 2) for x in wav_lens]))
+            # "embedding" = true clip length, recovered from the relative lengths
+            return (wav_lens * wavs.shape[1]).reshape(-1, 1, 1)
+
+    va = object.__new__(va_module.VoiceAuth)
+    va.model = FakeEncoder()
+
+    lengths = [400, 100, 300, 200]
+    audios = [np.ones(n, dtype=np.float32) for n in lengths]
+    embs = va.get_embeddings(audios, batch_size=2)
+
+    # Shortest clips share a batch, so padding stays small
+    assert batches == [((2, 200), [0.5, 1.0]), ((2, 400), [0.75, 1.0])]
+    assert [round(float(e[0])) for e in embs] == lengths
+
+
 # -----------------------------------------
 # VoiceAuth.compare_embeddings (no model)
 # -----------------------------------------
@@ -111,3 +304,151 @@ def test_voiceauth_compare_embeddings_orthogonal_vectors():
 
     score = va.compare_embeddings(emb1, emb2)
     assert abs(score) < 1e-5
+
+
+# -----------------------------------------
+# STT worker pool: micro-batching
+# -----------------------------------------
+
+def test_stt_pool_collects_short_clips_into_one_batch():
+    import queue
+    import numpy as np
+    from voicenudge.speech.stt_pool import _collect_batch
+
+    short = np.zeros(16000, dtype=np.float32)
+    jobs = queue.Queue()
+    for i in range(1, 5):
+        jobs.put((i, short, 0.0))
+
+    batch, leftover, stop = _collect_batch(jobs, (0, short, 0.0), max_batch=3, window=0.05)
+
+    assert [job_id for job_id, _, _ in batch] == [0, 1, 2]
+    assert leftover is None and stop is False
+    assert jobs.qsize() == 2
+
+
+def test_stt_pool_long_clip_is_not_batched():
+    import queue
+    import numpy as np
+    from voicenudge.speech.stt_pool import _collect_batch
+
+    short = np.zeros(16000, dtype=np.float32)
+    long_clip = np.zeros(16000 * 45, dtype=np.float32)
+    jobs = queue.Queue()
+    jobs.put((1, long_clip, 0.0))
+
+    batch, leftover, stop = _collect_batch(jobs, (0, short, 0.0), max_batch=8, window=0.05)
+
+    assert [job_id for job_id, _, _ in batch] == [0]
+    assert leftover[0] == 1
+
+
+def test_stt_pool_fails_jobs_of_dead_worker(monkeypatch):
+    from concurrent.futures import Future
+    from types import SimpleNamespace
+
+    from voicenudge.speech.stt_pool import STTPool
+
+    pool = STTPool()
+    pool._procs = [SimpleNamespace(pid=101, name="stt-worker-0", exitcode=-9, is_alive=lambda: False)]
+    monkeypatch.setattr(pool, "_spawn", lambda name: SimpleNamespace(
+        pid=202, name=name, exitcode=None, is_alive=lambda: True))
+    orphan, queued = Future(), Future()
+    pool._futures.update({1: orphan, 2: queued})
+
+    pool._reap_workers({101: [1]})
+
+    with pytest.raises(RuntimeError, match="died"):
+        orphan.result(timeout=0)
+    assert not queued.done()  # still waiting in the queue for the replacement
+    assert pool._procs[0].pid == 202
+    stats = pool.stats()
+    assert stats["worker_restarts"] == 1 and stats["orphaned"] == 1
+    assert stats["in_flight"] == 1
+
+
+def test_stt_metrics_endpoint(auth_client):
+    resp = auth_client.get("/api/metrics/stt")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    for key in ("queue_depth", "in_flight", "last_batch_size", "avg_batch_size", "avg_stage_ms"):
+        assert key in data
+
+
+# -----------------------------------------
+# STT backend registry
+# -----------------------------------------
+
+def test_register_and_select_backend(monkeypatch):
+    from voicenudge.speech import backends
+
+    @backends.register_backend("echo-test")
+    class EchoBackend(backends.STTBackend):
+        def transcribe(self, audio, translate=True):
+            return f"{'en' if translate else 'native'}:{audio}"
+
+    monkeypatch.setenv("WHISPER_BACKEND", "echo-test")
+    backend = backends.get_backend()
+
+    assert isinstance(backend, EchoBackend)
+    assert backends.get_backend("echo-test") is backend  # shared instance
+    # Default dual/batch implementations fall back to transcribe()
+    assert backend.transcribe_dual_batch(["a.wav"]) == [("native:a.wav", "en:a.wav")]
+    assert "echo-test" in backends.available_backends()
+
+
+def test_unknown_backend_raises():
+    from voicenudge.speech import backends
+
+    with pytest.raises(ValueError):
+        backends.get_backend("no-such-engine")
+
+
+def test_google_translation_is_plain_text_with_one_client(monkeypatch):
+    import sys
+    import types
+
+    created, calls = [], []
+
+    class FakeTranslateClient:
+        def __init__(self):
+            created.append(self)
+
+        def translate(self, text, target_language, format_="html"):
+            calls.append(format_)
+            return {"translatedText": "Don't forget"}
+
+    google = types.ModuleType("google")
+    cloud = types.ModuleType("google.cloud")
+    cloud.speech = types.ModuleType("google.cloud.speech")
+    cloud.translate_v2 = types.SimpleNamespace(Client=FakeTranslateClient)
+    google.cloud = cloud
+    for name, module in {"google": google, "google.cloud": cloud,
+                         "google.cloud.speech": cloud.speech,
+                         "google.cloud.translate_v2": cloud.translate_v2}.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.delitem(sys.modules, "voicenudge.speech.google_stt", raising=False)
+    from voicenudge.speech import google_stt
+
+    monkeypatch.setenv("SPEECH_LANGUAGE_CODE", "hi-IN")
+    backend = google_stt.GoogleSTTBackend()
+    assert backend._to_english("मत भूलना") == "Don't forget"
+    backend._to_english("फिर से")
+
+    assert calls == ["text", "text"]  # not HTML-escaped
+    assert len(created) == 1
+
+
+def test_gunicorn_serves_uploads_from_threads(monkeypatch):
+    import os
+    import runpy
+
+    monkeypatch.delenv("PRELOAD_MODELS", raising=False)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setenv("GUNICORN_THREADS", "16")
+    conf = runpy.run_path(os.path.join(os.path.dirname(__file__), "..", "gunicorn.conf.py"))
+
+    # Sync workers would hand each process's STT pool one request at a time
+    assert conf["worker_class"] == "gthread"
+    assert conf["threads"] == 16
+    assert conf["workers"] == 1
@@ -123,3 +123,237 @@ def test_set_due_missing_field(auth_client, db, user):
     resp = auth_client.patch(f"/tasks/{t.id}/set_due", json={})
     assert resp.status_code == 400
     assert "error" in resp.get_json()
+
+
+def _voice_upload():
+    import io
+    import wave
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x00\x00" * 16000)
+    buf.seek(0)
+    return {"file": (buf, "note.wav")}
+
+
+def test_voice_ingest_creates_task(auth_client, db, user, monkeypatch):
+    from voicenudge.tasks import routes as tasks_routes
+
+    monkeypatch.setattr(
+        tasks_routes, "_transcribe", lambda audio: ("kal doodh lena", "Buy milk tomorrow")
+    )
+
+    resp = auth_client.post("/api/tasks/voice_ingest", data=_voice_upload())
+    assert resp.status_code == 201
+    data = resp.get_json()
+    assert data["transcribed_text"] == "Buy milk tomorrow"
+    assert data["original_text"] == "kal doodh lena"
+    assert Task.query.get(data["id"]).user_id == user.id
+
+
+def test_voice_ingest_rejects_undecodable_upload(auth_client, db, user):
+    import io
+
+    resp = auth_client.post(
+        "/api/tasks/voice_ingest", data={"file": (io.BytesIO(b"not audio"), "note.webm")}
+    )
+    assert resp.status_code == 400
+    assert "error" in resp.get_json()
+
+
+def test_voice_ingest_async_job(auth_client, db, user, monkeypatch):
+    import time
+    from voicenudge.tasks import routes as tasks_routes
+
+    monkeypatch.setattr(
+        tasks_routes, "_transcribe", lambda audio: ("Call mom", "Call mom")
+    )
+
+    resp = auth_client.post("/api/tasks/voice_ingest?async=1", data=_voice_upload())
+    assert resp.status_code == 202
+    job_id = resp.get_json()["job_id"]
+
+    # Poll until the background thread finishes
+    for _ in range(100):
+        job = auth_client.get(f"/api/tasks/jobs/{job_id}").get_json()
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.05)
+
+    assert job["status"] == "completed", job["error"]
+    assert job["stage"] == "done"
+    assert job["result"]["transcribed_text"] == "Call mom"
+    assert Task.query.get(job["result"]["id"]) is not None
+
+    # Finished job → event stream ends with a single `done` event
+    events = auth_client.get(f"/api/tasks/jobs/{job_id}/events")
+    assert events.mimetype == "text/event-stream"
+    body = events.get_data(as_text=True)
+    assert body.startswith("event: done")
+
+
+def test_get_job_unknown_id(auth_client):
+    resp = auth_client.get("/api/tasks/jobs/doesnotexist")
+    assert resp.status_code == 404
+
+
+def _job(db, user, status, age):
+    import uuid
+    from voicenudge.models import IngestJob
+
+    job = IngestJob(id=uuid.uuid4().hex, user_id=user.id, status=status, stage="transcribing")
+    db.session.add(job)
+    db.session.commit()
+    # Direct UPDATE: setting updated_at through the ORM would trip its onupdate
+    IngestJob.query.filter_by(id=job.id).update(
+        {"updated_at": datetime.utcnow() - age}, synchronize_session=False)
+    db.session.commit()
+    return job.id
+
+
+def test_orphaned_job_is_marked_failed(auth_client, app, db, user, monkeypatch):
+    monkeypatch.setitem(app.config, "INGEST_JOB_STALE_SECONDS", 60)
+    fresh = _job(db, user, "running", timedelta(seconds=5))
+    orphan = _job(db, user, "running", timedelta(minutes=5))
+
+    assert auth_client.get(f"/api/tasks/jobs/{fresh}").get_json()["status"] == "running"
+    job = auth_client.get(f"/api/tasks/jobs/{orphan}").get_json()
+    assert job["status"] == "failed"
+    assert "interrupted" in job["error"]
+
+    body = auth_client.get(f"/api/tasks/jobs/{orphan}/events").get_data(as_text=True)
+    assert body.startswith("event: done")
+
+
+def test_job_events_stream_is_bounded_with_keepalives(auth_client, app, db, user, monkeypatch):
+    import time
+
+    monkeypatch.setitem(app.config, "INGEST_SSE_POLL_SECONDS", 0.02)
+    monkeypatch.setitem(app.config, "INGEST_SSE_KEEPALIVE_SECONDS", 0.1)
+    monkeypatch.setitem(app.config, "INGEST_SSE_MAX_SECONDS", 0.5)
+    job_id = _job(db, user, "running", timedelta(seconds=0))
+
+    started = time.monotonic()
+    body = auth_client.get(f"/api/tasks/jobs/{job_id}/events").get_data(as_text=True)
+
+    assert time.monotonic() - started < 5  # ended on its own, job still running
+    assert body.startswith("event: progress")
+    assert ": keep-alive" in body
+
+
+def test_batch_complete_archives_tasks_in_one_request(auth_client, db, user):
+    tasks = [Task(user_id=user.id, text=f"task {i}", title=f"task {i}", priority="Low") for i in range(3)]
+    db.session.add_all(tasks)
+    db.session.commit()
+    db.session.add(Reminder(user_id=user.id, task_id=tasks[0].id, remind_at=datetime.utcnow(), sent=False))
+    db.session.commit()
+    ids = [t.id for t in tasks]
+
+    resp = auth_client.patch("/api/tasks/complete", json={"task_ids": ids + [999999]})
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert sorted(body["completed"]) == sorted(ids)
+    assert body["not_found"] == [999999]
+
+    assert Task.query.filter(Task.id.in_(ids)).count() == 0
+    assert Reminder.query.filter(Reminder.task_id.in_(ids)).count() == 0
+    history = TaskHistory.query.filter_by(user_id=user.id).all()
+    assert sorted(h.task_id for h in history) == sorted(ids)
+    assert all(h.completed_at is not None for h in history)
+
+
+def test_batch_complete_rejects_bad_payload(auth_client):
+    resp = auth_client.patch("/api/tasks/complete", json={"task_ids": "1,2"})
+    assert resp.status_code == 400
+
+
+def test_ingest_batch_predicts_once_and_bulk_inserts(auth_client, db, user, monkeypatch):
+    from voicenudge.ml import model_service
+
+    calls = []
+
+    class DummyModel:
+        def __init__(self, label):
+            self.label = label
+
+        def predict(self, X):
+            calls.append(list(X))
+            return [self.label] * len(X)
+
+    monkeypatch.setattr(model_service, "category_model", DummyModel("Work"))
+    monkeypatch.setattr(model_service, "priority_model", DummyModel("High"))
+    monkeypatch.setattr(model_service, "multihead_model", None)  # legacy two-pipeline path
+    texts = ["Buy milk tomorrow at 6pm", "Just think about life", "Call mom tomorrow"]
+
+    resp = auth_client.post("/api/tasks/ingest_batch", json={"texts": texts})
+    assert resp.status_code == 201
+    data = resp.get_json()
+
+    assert len(calls) == 2 and all(c == texts for c in calls)  # one predict per model
+    assert [d["category"] for d in data] == ["Work"] * 3
+    assert [d["priority"] for d in data] == ["High"] * 3
+    assert "note" in data[1]
+    assert Task.query.filter_by(user_id=user.id).count() == 3
+    reminded = {r.task_id for r in Reminder.query.filter_by(user_id=user.id)}
+    assert reminded == {data[0]["id"], data[2]["id"]}
+
+
+def test_ingest_batch_db_error_rolls_back(auth_client, db, user, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    def fail_commit():
+        raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(db.session, "commit", fail_commit)
+    resp = auth_client.post("/api/tasks/ingest_batch", json={"texts": ["Buy milk tomorrow"]})
+
+    assert resp.status_code == 500
+    assert resp.get_json() == {"error": "Could not save tasks"}  # no internals leaked
+    monkeypatch.undo()
+    assert Task.query.filter_by(user_id=user.id).count() == 0
+
+
+def test_ingest_batch_rejects_bad_payload(auth_client):
+    for body in ({}, {"texts": []}, {"texts": "buy milk"}, {"texts": ["ok", ""]}):
+        resp = auth_client.post("/api/tasks/ingest_batch", json=body)
+        assert resp.status_code == 400
+    assert Task.query.count() == 0
+
+
+def test_list_tasks_keyset_pages(auth_client, db, user):
+    base = datetime(2026, 1, 1, 9, 0)
+    dated = [Task(user_id=user.id, text=f"t{i}", title=f"t{i}", due_at=base + timedelta(hours=i)) for i in (2, 0, 1)]
+    undated = [Task(user_id=user.id, text=f"u{i}", title=f"u{i}") for i in range(2)]
+    db.session.add_all(dated + undated)
+    db.session.commit()
+
+    titles, cursor = [], None
+    while True:
+        url = "/api/tasks/?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        page = auth_client.get(url).get_json()
+        assert len(page["tasks"]) <= 2
+        titles += [t["title"] for t in page["tasks"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    # Ordered by due_at, undated tasks last (by id)
+    assert titles == ["t0", "t1", "t2", "u0", "u1"]
+
+
+def test_list_tasks_filters_and_projection(auth_client, db, user):
+    db.session.add_all([
+        Task(user_id=user.id, text="long text " * 50, title="work", category="Work", status="pending"),
+        Task(user_id=user.id, text="x", title="home", category="Personal", status="pending"),
+    ])
+    db.session.commit()
+
+    page = auth_client.get("/api/tasks/?limit=10&category=Work&fields=title").get_json()
+    assert page["tasks"] == [{"id": page["tasks"][0]["id"], "due_at": "None", "title": "work"}]
+    assert page["next_cursor"] is None
+
+    assert auth_client.get("/api/tasks/?limit=10&fields=password").status_code == 400
+    assert auth_client.get("/api/tasks/?cursor=not-a-cursor").status_code == 400
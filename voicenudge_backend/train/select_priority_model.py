@@ -0,0 +1,140 @@
+"""
+Pick the priority classifier by accuracy under a latency and size budget.
+
+    python train/select_priority_model.py
+    python train/select_priority_model.py --max-latency-ms 0.5 --max-bytes 500000
+
+Every candidate is trained on the same TF-IDF matrix (fitted once, as in
+the multi-head model) and scored on a held-out split for accuracy, macro
+F1, single-text latency (vectorize + predict, as one ingest request does),
+batch predictions per second and pickled size. The most accurate candidate
+within both budgets wins; the report is written as JSON.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import time
+
+import joblib
+import sklearn
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+from sklearn.naive_bayes import ComplementNB
+from sklearn.pipeline import Pipeline
+from sklearn.svm import LinearSVC
+from prepare_dataset import load_dataset
+
+REPORT_PATH = os.path.join("models", "priority_model_report.json")
+
+# name → factory for an unfitted classifier head
+CANDIDATES = {
+    "linear_svm": lambda: LinearSVC(),
+    "logistic_regression": lambda: LogisticRegression(max_iter=1000),
+    "complement_nb": lambda: ComplementNB(),
+    "small_gbdt": lambda: GradientBoostingClassifier(n_estimators=50, max_depth=3, random_state=42),
+    # Previous default, kept as the baseline in the report
+    "random_forest_200": lambda: RandomForestClassifier(n_estimators=200, random_state=42),
+}
+
+LATENCY_SAMPLES = 200
+
+
+def _nbytes(obj):
+    buffer = io.BytesIO()
+    joblib.dump(obj, buffer)
+    return buffer.tell()
+
+
+def benchmark_candidate(name, vectorizer, X_train_vec, y_train, X_test, y_test):
+    clf = CANDIDATES[name]()
+    t0 = time.perf_counter()
+    clf.fit(X_train_vec, y_train)
+    fit_s = time.perf_counter() - t0
+
+    # Batch throughput: one vectorize + predict over the whole test split
+    t0 = time.perf_counter()
+    y_pred = clf.predict(vectorizer.transform(X_test))
+    batch_s = time.perf_counter() - t0
+
+    # Per-request latency: one text at a time, median of LATENCY_SAMPLES
+    timings = []
+    for text in X_test[:LATENCY_SAMPLES]:
+        t0 = time.perf_counter()
+        clf.predict(vectorizer.transform([text]))
+        timings.append(time.perf_counter() - t0)
+
+    return {
+        "name": name,
+        "accuracy": round(accuracy_score(y_test, y_pred), 4),
+        "macro_f1": round(f1_score(y_test, y_pred, average="macro"), 4),
+        "fit_s": round(fit_s, 3),
+        "latency_ms": round(statistics.median(timings) * 1000, 3),
+        "predictions_per_s": round(len(X_test) / batch_s),
+        # As shipped in priority_rf.joblib (vectorizer included) and as a multi-head head
+        "model_bytes": _nbytes(Pipeline([("tfidf", vectorizer), ("clf", clf)])),
+        "head_bytes": _nbytes(clf),
+    }
+
+
+def select_priority_model(max_latency_ms=2.0, max_bytes=2_000_000, candidates=None, report_path=REPORT_PATH):
+    """Benchmark the candidates, write the report and return it ({"chosen": name, ...})."""
+    X, _y_cat, y_pri = load_dataset()
+    X_train, X_test, y_train, y_test = train_test_split(X, y_pri, test_size=0.2, random_state=42)
+
+    vectorizer = TfidfVectorizer()
+    X_train_vec = vectorizer.fit_transform(X_train)
+
+    results = []
+    for name in candidates or CANDIDATES:
+        print(f"🔹 Benchmarking priority candidate {name}...")
+        result = benchmark_candidate(name, vectorizer, X_train_vec, y_train, X_test, y_test)
+        result["within_budget"] = result["latency_ms"] <= max_latency_ms and result["model_bytes"] <= max_bytes
+        results.append(result)
+
+    eligible = [r for r in results if r["within_budget"]]
+    if not eligible:
+        print("⚠️ No candidate fits the budget; choosing the most accurate overall")
+        eligible = results
+    # Most accurate; ties go to the smaller model
+    chosen = max(eligible, key=lambda r: (r["accuracy"], -r["model_bytes"]))["name"]
+
+    print(f"\n{'candidate':<22}{'accuracy':>9}{'macro_f1':>9}{'latency_ms':>11}{'pred/s':>10}{'bytes':>11}  budget")
+    for r in results:
+        mark = "✅" if r["within_budget"] else "❌"
+        print(f"{r['name']:<22}{r['accuracy']:>9}{r['macro_f1']:>9}{r['latency_ms']:>11}"
+              f"{r['predictions_per_s']:>10}{r['model_bytes']:>11}  {mark}")
+    print(f"\n🏆 Selected priority model: {chosen}")
+
+    report = {
+        "chosen": chosen,
+        "budget": {"max_latency_ms": max_latency_ms, "max_bytes": max_bytes},
+        "sklearn_version": sklearn.__version__,
+        "train_size": len(X_train),
+        "test_size": len(X_test),
+        "candidates": results,
+    }
+    if report_path:
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written to {report_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-latency-ms", type=float, default=2.0, help="median single-text predict budget")
+    parser.add_argument("--max-bytes", type=int, default=2_000_000, help="pickled pipeline size budget")
+    parser.add_argument("--candidates", nargs="+", choices=list(CANDIDATES), help="subset to benchmark")
+    parser.add_argument("--report", default=REPORT_PATH, help="where to write the JSON report")
+    args = parser.parse_args()
+    select_priority_model(args.max_latency_ms, args.max_bytes, args.candidates, args.report)
+
+
+if __name__ == "__main__":
+    main()
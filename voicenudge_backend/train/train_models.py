@@ -1,19 +1,28 @@
+import argparse
 import os
+import sys
 import joblib
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.svm import LinearSVC
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 from prepare_dataset import load_dataset
+from select_priority_model import CANDIDATES, select_priority_model
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from voicenudge.ml.multihead import MultiHeadModel  # noqa: E402
 
 # Paths
 MODELS_DIR = "models"
 CATEGORY_MODEL_PATH = os.path.join(MODELS_DIR, "category_svm.joblib")
 PRIORITY_MODEL_PATH = os.path.join(MODELS_DIR, "priority_rf.joblib")
+MULTIHEAD_MODEL_PATH = os.path.join(MODELS_DIR, "task_multihead.joblib")
 
-def train_and_save_models():
+def train_and_save_models(priority_head="linear_svm"):
     # Load data
     X, y_cat, y_pri = load_dataset()
 
@@ -46,12 +55,12 @@ def train_and_save_models():
     print(f"✅ Category model saved to {CATEGORY_MODEL_PATH}")
 
     # -------------------------
-    # Priority Model (RandomForest)
+    # Priority Model (picked by select_priority_model)
     # -------------------------
-    print("🔹 Training priority model (RandomForest)...")
+    print(f"🔹 Training priority model ({priority_head})...")
     priority_model = Pipeline([
         ("tfidf", TfidfVectorizer()),
-        ("clf", RandomForestClassifier(n_estimators=200, random_state=42))
+        ("clf", CANDIDATES[priority_head]())
     ])
     priority_model.fit(X_train_pri, y_train_pri)
 
@@ -64,5 +73,51 @@ def train_and_save_models():
     joblib.dump(priority_model, PRIORITY_MODEL_PATH)
     print(f"✅ Priority model saved to {PRIORITY_MODEL_PATH}")
 
+
+def train_multihead_model(priority_head="linear_svm"):
+    """
+    One TfidfVectorizer shared by the category and priority heads: the text
+    is vectorized once at inference and both classifiers read the same
+    sparse matrix (see voicenudge.ml.multihead).
+    """
+    X, y_cat, y_pri = load_dataset()
+
+    # One split for both heads (same rows, two label columns)
+    X_train, X_test, y_train_cat, y_test_cat, y_train_pri, y_test_pri = train_test_split(
+        X, y_cat, y_pri, test_size=0.2, random_state=42
+    )
+
+    print(f"🔹 Training multi-head model (shared TF-IDF → SVM + {priority_head})...")
+    model = MultiHeadModel(
+        TfidfVectorizer(),
+        {
+            "category": LinearSVC(),
+            "priority": CANDIDATES[priority_head](),
+        },
+    )
+    model.fit(X_train, {"category": y_train_cat, "priority": y_train_pri})
+
+    # Evaluate
+    X_test_vec = model.transform(X_test)
+    print("📊 Category Head Report:")
+    print(classification_report(y_test_cat, model.heads["category"].predict(X_test_vec)))
+    print("📊 Priority Head Report:")
+    print(classification_report(y_test_pri, model.heads["priority"].predict(X_test_vec)))
+
+    # Save model
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    joblib.dump(model, MULTIHEAD_MODEL_PATH)
+    print(f"✅ Multi-head model saved to {MULTIHEAD_MODEL_PATH}")
+
+
 if __name__ == "__main__":
-    train_and_save_models()
+    parser = argparse.ArgumentParser(description="Train the category and priority models.")
+    parser.add_argument("--priority-model", choices=list(CANDIDATES),
+                        help="skip model selection and train this priority classifier")
+    parser.add_argument("--max-latency-ms", type=float, default=2.0)
+    parser.add_argument("--max-bytes", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    priority_head = args.priority_model or select_priority_model(args.max_latency_ms, args.max_bytes)["chosen"]
+    train_and_save_models(priority_head)
+    train_multihead_model(priority_head)
@@ -2,13 +2,21 @@
 from flask import Flask
 import os
 from voicenudge.extensions import db, migrate, jwt, mail
-from voicenudge.auth.routes import auth_bp
-from voicenudge.tasks.routes import tasks_bp
-from voicenudge.history.routes import history_bp
-from voicenudge.reminders.scheduler import init_scheduler
 from flask_cors import CORS
 
 def create_app():
+    # Imported here so `python -m voicenudge.reminders.worker` can import the
+    # package without pulling in the speech/ML stack behind these blueprints
+    from voicenudge.auth.routes import auth_bp
+    from voicenudge.tasks.routes import tasks_bp
+    from voicenudge.history.routes import history_bp
+    from voicenudge.metrics.routes import metrics_bp
+    from voicenudge.reminders.mailer import mail_pool
+    from voicenudge.speech.stt_pool import stt_pool
+    from voicenudge.auth.embedding_cache import embedding_cache
+    from voicenudge.ml.prediction_cache import prediction_cache, title_cache
+    from voicenudge.auth.enrollment import voice_cli
+
     app = Flask(__name__)
     CORS(app, resources={r"/api/*": {"origins": ["http://localhost:5173"]}}, supports_credentials=True)
     app.config.from_object("voicenudge.config.Config")
@@ -18,19 +26,46 @@ def create_app():
     migrate.init_app(app, db)
     jwt.init_app(app)
     mail.init_app(app)
+    mail_pool.init_app(app)
+    stt_pool.init_app(app)
+    embedding_cache.init_app(app)
+    prediction_cache.init_app(app)
+    title_cache.init_app(app)
 
     # Blueprints
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(tasks_bp, url_prefix="/api/tasks")
     app.register_blueprint(history_bp, url_prefix="/api/history")
+    app.register_blueprint(metrics_bp, url_prefix="/api/metrics")
+
+    # CLI: `flask voice reembed`
+    app.cli.add_command(voice_cli)
 
-    # Start the scheduler only in the active process (avoids double start)
-    if not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
-        with app.app_context():
-            init_scheduler(app)
+    # A gunicorn master preloading the app (see gunicorn.conf.py) must not
+    # start the dispatcher: its thread and DB connections wouldn't survive
+    # the fork. The post_fork hook starts it in each worker instead.
+    if os.environ.get("VOICENUDGE_PRELOADING") == "true":
+        print("ℹ️ Preloading in the gunicorn master: reminder dispatcher starts after fork")
+    elif not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        # Only in the active process (avoids double start)
+        start_reminders(app)
 
     # (Optional in dev) auto-create tables
     # with app.app_context():
     #     db.create_all()
 
     return app
+
+
+def start_reminders(app):
+    """
+    Start this process's reminder dispatcher, unless reminders run in the
+    standalone worker (REMINDER_WEB_DISPATCH=false).
+    """
+    from voicenudge.reminders.scheduler import init_scheduler
+
+    if not app.config.get("REMINDER_WEB_DISPATCH", True):
+        print("ℹ️ Reminders are sent by the standalone worker (python -m voicenudge.reminders.worker)")
+        return
+    with app.app_context():
+        init_scheduler(app)
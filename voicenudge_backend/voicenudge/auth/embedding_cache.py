@@ -0,0 +1,211 @@
+"""
+In-memory cache of users' voice embeddings.
+
+Login compares against the stored enrollment vector; caching the decoded
+float32 array keyed by (user_id, embedding version) skips the DB column
+load and deserialization on repeat logins. Writing a new embedding bumps
+the version, so stale entries can never be served, and `invalidate()`
+frees them eagerly.
+
+Optionally, a fixed-size shared-memory table lets all gunicorn workers on
+a host share entries (VOICE_EMBEDDING_SHM_NAME).
+"""
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# Shared segment layout: magic, slots, max_dim, then the slots
+_TABLE_HEADER = struct.Struct("<8sii")
+_MAGIC = b"VNEMBv1\0"
+# Shared slot layout: user_id, version (int64), dim (int32), crc32 (uint32), data
+_HEADER = struct.Struct("<qqiI")
+
+
+class SharedEmbeddingTable:
+    """
+    Direct-mapped table of embeddings in a named shared-memory segment.
+    Lock-free: each slot carries a CRC over ids + data, so a reader that
+    races a writer sees a mismatch and treats it as a miss.
+    """
+
+    def __init__(self, name, slots=4096, max_dim=256):
+        from multiprocessing import shared_memory
+
+        try:
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=True, size=_TABLE_HEADER.size + slots * (_HEADER.size + 4 * max_dim))
+            _TABLE_HEADER.pack_into(self._shm.buf, 0, _MAGIC, slots, max_dim)
+        except FileExistsError:
+            # The segment outlives restarts, so it may predate a config change:
+            # its own header, not the config, says how it's laid out
+            self._shm = shared_memory.SharedMemory(name=name)
+            layout = self._read_layout(name)
+            if layout != (slots, max_dim):
+                print(f"⚠️ Shared embedding table {name!r} keeps its layout of {layout[0]} slots × "
+                      f"{layout[1]} dims (configured {slots} × {max_dim}); unlink it to resize")
+            slots, max_dim = layout
+        self._untrack()
+        self.slots = slots
+        self.max_dim = max_dim
+        self.slot_size = _HEADER.size + 4 * max_dim
+        self._buf = self._shm.buf
+
+    def _read_layout(self, name):
+        deadline = time.monotonic() + 1.0  # the creating worker may not have written it yet
+        while True:
+            magic, slots, max_dim = _TABLE_HEADER.unpack_from(self._shm.buf, 0)
+            if magic == _MAGIC or time.monotonic() >= deadline:
+                break
+            time.sleep(0.01)
+        if (magic != _MAGIC or slots <= 0 or max_dim <= 0
+                or _TABLE_HEADER.size + slots * (_HEADER.size + 4 * max_dim) > self._shm.size):
+            self._untrack()  # not ours to unlink
+            self._shm.close()
+            raise ValueError(f"shared memory segment {name!r} has an unknown layout; unlink it or pick another name")
+        return slots, max_dim
+
+    def _untrack(self):
+        # The segment outlives any single worker; stop Python's resource
+        # tracker from unlinking it when the first worker exits.
+        try:
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        except Exception:
+            pass
+
+    def _offset(self, user_id):
+        return _TABLE_HEADER.size + (user_id % self.slots) * self.slot_size
+
+    @staticmethod
+    def _crc(user_id, version, dim, data):
+        return zlib.crc32(data, zlib.crc32(struct.pack("<qqi", user_id, version, dim)))
+
+    def get(self, user_id, version):
+        offset = self._offset(user_id)
+        uid, ver, dim, crc = _HEADER.unpack_from(self._buf, offset)
+        if uid != user_id or ver != version or not 0 < dim <= self.max_dim:
+            return None
+        start = offset + _HEADER.size
+        data = bytes(self._buf[start:start + 4 * dim])
+        if self._crc(uid, ver, dim, data) != crc:
+            return None  # torn by a concurrent write
+        return np.frombuffer(data, dtype="<f4")
+
+    def put(self, user_id, version, vector):
+        data = np.ascontiguousarray(vector, dtype="<f4").tobytes()
+        dim = len(data) // 4
+        if dim > self.max_dim:
+            return
+        offset = self._offset(user_id)
+        start = offset + _HEADER.size
+        self._buf[start:start + len(data)] = data
+        _HEADER.pack_into(self._buf, offset, user_id, version, dim,
+                          self._crc(user_id, version, dim, data))
+
+    def invalidate(self, user_id):
+        offset = self._offset(user_id)
+        if _HEADER.unpack_from(self._buf, offset)[0] == user_id:
+            _HEADER.pack_into(self._buf, offset, 0, 0, 0, 0)
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+
+
+class EmbeddingCache:
+    """Bounded LRU of float32 embeddings keyed by (user_id, version)."""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.shared = None
+        self._shm_config = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def init_app(self, app):
+        self.capacity = app.config.get("VOICE_EMBEDDING_CACHE_SIZE", 1024)
+        name = app.config.get("VOICE_EMBEDDING_SHM_NAME")
+        if name:
+            self._shm_config = (name, app.config.get("VOICE_EMBEDDING_SHM_SLOTS", 4096))
+
+    def _shared_table(self):
+        # Attached on first use, i.e. after gunicorn has forked the worker
+        if self.shared is None and self._shm_config:
+            try:
+                self.shared = SharedEmbeddingTable(*self._shm_config)
+            except Exception as e:
+                print(f"⚠️ Shared embedding cache disabled: {e}")
+                self._shm_config = None
+        return self.shared
+
+    def _put(self, key, vector):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, user_id, version, loader):
+        """
+        Return the cached vector, calling `loader()` on a miss. The loader may
+        return raw little-endian float32 bytes (read zero-copy) or an array-like.
+        """
+        key = (user_id, version)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return vector
+
+        shared = self._shared_table()
+        vector = shared.get(user_id, version) if shared else None
+        if vector is not None:
+            self._stats["shared_hits"] += 1
+        else:
+            self._stats["misses"] += 1
+            raw = loader()
+            if isinstance(raw, (bytes, bytearray, memoryview)):
+                vector = np.frombuffer(raw, dtype="<f4")
+            else:
+                vector = np.array(raw, dtype=np.float32).reshape(-1)
+            if shared:
+                shared.put(user_id, version, vector)
+
+        vector.setflags(write=False)  # shared between requests
+        with self._lock:
+            self._put(key, vector)
+        return vector
+
+    def invalidate(self, user_id):
+        """Drop every cached version for a user (call after writing a new embedding)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+            self._stats["invalidations"] += 1
+        shared = self._shared_table()
+        if shared:
+            shared.invalidate(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self._stats["hits"] + self._stats["shared_hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "shared_memory": self._shm_config is not None,
+            "hit_rate": round((self._stats["hits"] + self._stats["shared_hits"]) / lookups, 4) if lookups else None,
+        }
+
+
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,164 @@
+"""
+Stored enrollment audio and bulk re-embedding.
+
+Each user's enrollment recording is kept as a 16 kHz 16-bit WAV
+(VOICE_ENROLLMENT_DIR/<user_id>.wav) so embeddings can be recomputed when
+the ECAPA checkpoint changes:
+
+    VOICE_MODEL_VERSION=ecapa_v2 flask voice reembed --workers 4
+
+Users whose stored embedding already carries the target model version are
+skipped and results are committed chunk by chunk, so an interrupted run
+resumes where it stopped.
+"""
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import click
+import numpy as np
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import or_
+
+from voicenudge.extensions import db
+from voicenudge.models import User
+from voicenudge.speech.audio import AudioDecodeError, decode_audio, encode_wav
+
+voice_cli = AppGroup("voice", help="Voice enrollment maintenance.")
+
+
+def enrollment_path(user_id, root=None):
+    root = root or current_app.config["VOICE_ENROLLMENT_DIR"]
+    return os.path.join(root, f"{user_id}.wav")
+
+
+def save_enrollment_audio(user_id, audio):
+    """Keep a user's decoded enrollment sample; no-op if storage is disabled."""
+    root = current_app.config.get("VOICE_ENROLLMENT_DIR")
+    if not root:
+        return None
+    os.makedirs(root, exist_ok=True)
+    path = enrollment_path(user_id, root)
+    partial = f"{path}.part"
+    with open(partial, "wb") as f:
+        f.write(encode_wav(audio))
+    os.replace(partial, path)  # never leave a half-written sample behind
+    return path
+
+
+# ---------------------- 🔹 Worker side ----------------------
+_worker_auth = None
+
+
+def _init_worker(torch_threads):
+    """Process-pool initializer: one ECAPA model per worker process."""
+    global _worker_auth
+    import torch
+    from voicenudge.auth.voice_auth import VoiceAuth
+
+    torch.set_num_threads(torch_threads)  # N workers × all cores would oversubscribe
+    _worker_auth = VoiceAuth()
+
+
+def _embed_chunk(items, batch_size, auth=None):
+    """[(user_id, wav_path)] → [(user_id, float32 bytes | None, error | None)]"""
+    auth = auth or _worker_auth
+    results, user_ids, audios = [], [], []
+    for user_id, path in items:
+        try:
+            audios.append(decode_audio(path))
+            user_ids.append(user_id)
+        except (OSError, AudioDecodeError) as e:
+            results.append((user_id, None, str(e)))
+
+    if audios:
+        for user_id, emb in zip(user_ids, auth.get_embeddings(audios, batch_size=batch_size)):
+            results.append((user_id, np.asarray(emb, dtype="<f4").tobytes(), None))
+    return results
+
+
+# ---------------------- 🔹 Driver ----------------------
+def reembed_users(model_version, workers=0, batch_size=16, chunk_size=64, force=False):
+    """
+    Recompute every enrolled user's embedding from stored audio.
+    workers=0 runs in-process with the app's model. Returns counters.
+    """
+    query = User.query.filter(User.voice_embedding_version > 0)
+    if not force:
+        query = query.filter(or_(
+            User.voice_embedding_model.is_(None), User.voice_embedding_model != model_version
+        ))
+    user_ids = [uid for (uid,) in query.with_entities(User.id).order_by(User.id)]
+
+    items = []
+    stats = {"pending": len(user_ids), "done": 0, "failed": 0, "missing_audio": 0}
+    for uid in user_ids:
+        path = enrollment_path(uid)
+        if os.path.exists(path):
+            items.append((uid, path))
+        else:
+            stats["missing_audio"] += 1
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if stats["missing_audio"]:
+        print(f"⚠️ {stats['missing_audio']} user(s) have no stored enrollment audio; skipping")
+
+    started = time.perf_counter()
+
+    def save(results):
+        for uid, blob, error in results:
+            if blob is None:
+                stats["failed"] += 1
+                print(f"⚠️ User {uid}: {error}")
+                continue
+            db.session.get(User, uid).set_voice_embedding(
+                np.frombuffer(blob, dtype="<f4"), model_version=model_version
+            )
+            stats["done"] += 1
+        db.session.commit()  # each chunk is durable → safe to interrupt and resume
+        finished = stats["done"] + stats["failed"]
+        rate = finished / max(time.perf_counter() - started, 1e-9)
+        print(f"🔁 {finished}/{len(items)} re-embedded ({rate:.1f} users/s)")
+
+    if workers > 0:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads,),
+        ) as pool:
+            futures = {pool.submit(_embed_chunk, chunk, batch_size): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    save(future.result())
+                except Exception as e:
+                    db.session.rollback()
+                    stats["failed"] += len(futures[future])
+                    print(f"⚠️ Chunk of {len(futures[future])} user(s) failed: {e}")
+    else:
+        from voicenudge.auth.routes import get_voice_auth
+
+        auth = get_voice_auth()
+        for chunk in chunks:
+            save(_embed_chunk(chunk, batch_size, auth=auth))
+
+    return stats
+
+
+@voice_cli.command("reembed")
+@click.option("--workers", default=0, show_default=True, help="Worker processes (0 = in-process).")
+@click.option("--batch-size", default=16, show_default=True, help="Clips per encode_batch call.")
+@click.option("--chunk-size", default=64, show_default=True, help="Users per worker task / commit.")
+@click.option("--model-version", default=None, help="Defaults to VOICE_MODEL_VERSION.")
+@click.option("--force", is_flag=True, help="Also re-embed users already on the target model.")
+def reembed_command(workers, batch_size, chunk_size, model_version, force):
+    """Recompute voice embeddings from stored enrollment audio."""
+    from voicenudge.auth.voice_auth import VoiceAuth
+
+    model_version = model_version or VoiceAuth.model_version
+    print(f"🔄 Re-embedding enrolled users for model {model_version}...")
+    stats = reembed_users(model_version, workers=workers, batch_size=batch_size,
+                          chunk_size=chunk_size, force=force)
+    print(f"✅ Done: {stats}")
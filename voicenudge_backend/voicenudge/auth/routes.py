@@ -6,12 +6,20 @@ from flask_jwt_extended import (
 from datetime import timedelta
 from ..extensions import db
 from ..models import User
+from ..model_loader import lazy_model
 from .voice_auth import VoiceAuth
-import numpy as np
-import os
+from .embedding_cache import embedding_cache
+from .enrollment import save_enrollment_audio
+from ..speech.audio import AudioDecodeError, decode_audio
 
 auth_bp = Blueprint("auth", __name__)
-voice_auth = VoiceAuth()
+
+# SpeechBrain ECAPA model, loaded on the first voice request
+_voice_auth = lazy_model("speechbrain-ecapa", VoiceAuth)
+
+
+def get_voice_auth():
+    return _voice_auth.get()
 
 
 # --------------------------- REGISTER ---------------------------
@@ -37,24 +45,50 @@ def register():
     user.security_question = question
     user.set_security_answer(answer)
 
-    # ✅ Save voice embedding (Docker-safe)
+    # ✅ Save voice embedding (decoded in memory, no temp files)
+    audio = None
     if "voice" in request.files:
-        file = request.files["voice"]
-        save_dir = os.path.join(os.getcwd(), "temp_voices")
-        os.makedirs(save_dir, exist_ok=True)
-        path = os.path.join(save_dir, file.filename)
-        file.save(path)
-        print(f"🎵 Saved registration voice to: {path}")
-
-        embedding = voice_auth.get_embedding(path)
+        try:
+            audio = decode_audio(request.files["voice"].stream)
+        except AudioDecodeError as e:
+            return jsonify({"error": f"Could not decode voice sample: {str(e)}"}), 400
+
+        embedding = get_voice_auth().get_embedding(audio)
         if embedding is not None:
-            user.voice_embedding = embedding.tolist()
+            user.set_voice_embedding(embedding, model_version=VoiceAuth.model_version)
 
     db.session.add(user)
     db.session.commit()
+    if audio is not None:
+        save_enrollment_audio(user.id, audio)  # kept for re-embedding on model upgrades
     return jsonify({"message": "User registered successfully ✅"}), 201
 
 
+# --------------------------- VOICE RE-ENROLL ---------------------------
+@auth_bp.post("/voice/enroll")
+@jwt_required()
+def enroll_voice():
+    """Replace the logged-in user's voice sample."""
+    uid = int(get_jwt_identity())
+    user = User.query.get_or_404(uid)
+
+    if "voice" not in request.files:
+        return jsonify({"error": "Voice sample required"}), 400
+
+    try:
+        audio = decode_audio(request.files["voice"].stream)
+        embedding = get_voice_auth().get_embedding(audio)
+    except Exception as e:
+        return jsonify({"error": f"Voice processing failed: {str(e)}"}), 400
+
+    user.set_voice_embedding(embedding, model_version=VoiceAuth.model_version)
+    user.voice_locked = False
+    db.session.commit()
+    embedding_cache.invalidate(user.id)
+    save_enrollment_audio(user.id, audio)
+    return jsonify({"message": "Voice sample updated ✅"})
+
+
 # --------------------------- LOGIN ---------------------------
 @auth_bp.post("/login")
 def login():
@@ -68,7 +102,7 @@ def login():
         return jsonify({"error": "Invalid credentials"}), 401
 
     # 🟢 Case 1: User has no voice sample (first time)
-    if not user.voice_embedding:
+    if not user.has_voice_embedding:
         token = create_access_token(identity=str(user.id), expires_delta=timedelta(days=3))
         resp = jsonify({"message": "Login successful ✅ (no voice sample yet)"})
         set_access_cookies(resp, token)
@@ -81,19 +115,18 @@ def login():
             "security_question": user.security_question
         }), 206
 
-    file = request.files["voice"]
-
-    # ✅ Docker-safe voice save
-    save_dir = os.path.join(os.getcwd(), "temp_voices")
-    os.makedirs(save_dir, exist_ok=True)
-    path = os.path.join(save_dir, file.filename)
-    file.save(path)
-    print(f"🎤 Saved login voice sample to: {path}")
+    try:
+        audio = decode_audio(request.files["voice"].stream)
+    except AudioDecodeError as e:
+        return jsonify({"error": f"Could not decode voice sample: {str(e)}"}), 400
 
     try:
-        test_embedding = voice_auth.get_embedding(path)
-        stored_embedding = np.array(user.voice_embedding, dtype=np.float32)
-        score = voice_auth.compare_embeddings(test_embedding, stored_embedding)
+        test_embedding = get_voice_auth().get_embedding(audio)
+        # Deferred float32 bytes are only fetched on a cache miss
+        stored_embedding = embedding_cache.get(
+            user.id, user.voice_embedding_version, lambda: user.voice_embedding_blob
+        )
+        score = get_voice_auth().compare_embeddings(test_embedding, stored_embedding)
     except Exception as e:
         return jsonify({"error": f"Voice processing failed: {str(e)}"}), 500
 
@@ -1,24 +1,28 @@
 import os
-import torch
 import numpy as np
-import tempfile
-import torchaudio
-import soundfile as sf
 from scipy.spatial.distance import cosine
-import subprocess
 
-# ----------------------------------------------
-# ✅ Import SpeechBrain (no network required)
-# ----------------------------------------------
-try:
-    from speechbrain.inference import EncoderClassifier
-except ImportError:
-    from speechbrain.pretrained import EncoderClassifier
+from voicenudge.speech.audio import decode_audio, duration_seconds
+
+# Shortest recording get_embedding accepts (login and enrollment)
+MIN_SAMPLE_SECONDS = 15
+
+
+def _import_encoder_classifier():
+    """Import SpeechBrain (and torch) only when the model is actually built."""
+    try:
+        from speechbrain.inference import EncoderClassifier
+    except ImportError:
+        from speechbrain.pretrained import EncoderClassifier
+    return EncoderClassifier
 
 
 class VoiceAuth:
     """Handles voice embedding extraction and similarity comparison."""
 
+    # Recorded with each stored embedding; bump when the checkpoint changes
+    model_version = os.getenv("VOICE_MODEL_VERSION", "ecapa_voxceleb_offline")
+
     def __init__(self):
         print("🔄 Loading SpeechBrain voice model (Offline Local Mode)...")
 
@@ -34,6 +38,7 @@ class VoiceAuth:
                 "https://huggingface.co/speechbrain/spkrec-ecapa-voxceleb"
             )
 
+        EncoderClassifier = _import_encoder_classifier()
         self.model = EncoderClassifier.from_hparams(
             source=model_dir,
             savedir=model_dir,
@@ -42,70 +47,72 @@ class VoiceAuth:
         print("✅ Model loaded successfully (Offline Local Mode).")
 
     # ---------------------- 🔹 Extract Embedding ----------------------
-    def get_embedding(self, wav_path):
-        """Safely extract embedding (handles mic recordings + enforces 15s duration)."""
-        import time
-
-        # ✅ Always copy to /tmp — guaranteed writable inside Docker
-        tmp_path = f"/tmp/{os.path.basename(wav_path)}"
-        os.makedirs("/tmp", exist_ok=True)
-        os.system(f"cp {wav_path} {tmp_path}")
-        fixed_wav = tmp_path
-
-        # 🕒 ensure file write is complete
-        for _ in range(3):
-            if os.path.exists(fixed_wav) and os.path.getsize(fixed_wav) > 1000:
-                break
-            time.sleep(0.5)
-
-        # 🔄 Auto-convert mic recordings → WAV using ffmpeg
-        if not fixed_wav.lower().endswith(".wav"):
-            tmp_wav = tempfile.mktemp(suffix=".wav", dir="/tmp")
-            try:
-                subprocess.run(
-                    ["ffmpeg", "-y", "-i", fixed_wav, "-ac", "1", "-ar", "16000", tmp_wav],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    check=True,
+    def get_embedding(self, audio):
+        """
+        Extract an embedding from 16 kHz mono float32 samples (as returned by
+        `decode_audio`), or from anything `decode_audio` accepts. Enforces a
+        MIN_SAMPLE_SECONDS minimum duration.
+        """
+        if not isinstance(audio, np.ndarray):
+            audio = decode_audio(audio)
+
+        duration = duration_seconds(audio)
+        if duration < MIN_SAMPLE_SECONDS:
+            raise ValueError(f"Voice sample too short — please record at least {MIN_SAMPLE_SECONDS} seconds")
+
+        emb = self.get_embeddings([audio])[0]
+        print(f"✅ Successfully extracted embedding ({duration:.2f}s audio).")
+        return emb
+
+    # ---------------------- 🔹 Batch embeddings ----------------------
+    def get_embeddings(self, audios, batch_size=16):
+        """
+        Embed many recordings with one `encode_batch` call per batch.
+        Clips are sorted by length so each batch is padded as little as
+        possible; `wav_lens` tells the encoder where every clip really ends.
+        Returns embeddings in input order (no duration check).
+        """
+        import torch
+
+        audios = [a if isinstance(a, np.ndarray) else decode_audio(a) for a in audios]
+        order = sorted(range(len(audios)), key=lambda i: audios[i].shape[-1])
+        embeddings = [None] * len(audios)
+
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            longest = max(max(audios[i].shape[-1] for i in bucket), 1)
+            wavs = torch.zeros(len(bucket), longest)
+            for row, i in enumerate(bucket):
+                wavs[row, :audios[i].shape[-1]] = torch.from_numpy(
+                    np.ascontiguousarray(audios[i], dtype=np.float32)
                 )
-                fixed_wav = tmp_wav
-                print(f"🎧 Converted mic recording → {fixed_wav}")
-            except Exception as e:
-                raise RuntimeError(f"FFmpeg failed to convert file: {e}")
-
-        # ✅ Load using torchaudio (safe retry)
-        try:
-            signal, sr = torchaudio.load(fixed_wav)
-        except Exception as e:
-            print(f"⚠️ torchaudio load failed ({e}), retrying with ffmpeg decode...")
-            tmp_fixed = tempfile.mktemp(suffix=".wav", dir="/tmp")
-            subprocess.run(
-                ["ffmpeg", "-y", "-i", fixed_wav, "-ac", "1", "-ar", "16000", tmp_fixed],
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
-            )
-            signal, sr = torchaudio.load(tmp_fixed)
+            wav_lens = torch.tensor([audios[i].shape[-1] / longest for i in bucket])
 
-        duration = signal.shape[1] / sr
-        if duration < 15:
-            raise ValueError("Voice sample too short — please record at least 15 seconds")
-
-        emb = self.model.encode_batch(signal)
-        print(f"✅ Successfully extracted embedding ({duration:.2f}s audio).")
-        return emb.squeeze().detach().cpu().numpy()
+            with torch.no_grad():
+                emb = self.model.encode_batch(wavs, wav_lens)
+            emb = emb.detach().cpu().numpy().reshape(len(bucket), -1)
+            for row, i in enumerate(bucket):
+                embeddings[i] = emb[row]
+        return embeddings
 
     # ---------------------- 🔹 Compare two voice files ----------------------
     def compare_voices(self, file1, file2):
-        """Compare two audio files (paths) and return similarity score."""
+        """Compare two recordings (paths, bytes or decoded arrays) and return similarity score."""
         emb1 = self.get_embedding(file1)
         emb2 = self.get_embedding(file2)
         return self.compare_embeddings(emb1, emb2)
 
     # ---------------------- 🔹 Compare embeddings directly ----------------------
+    @staticmethod
+    def _as_vector(emb):
+        # Stored embeddings arrive as raw float32 bytes → view them, no copy
+        if isinstance(emb, (bytes, bytearray, memoryview)):
+            return np.frombuffer(emb, dtype="<f4")
+        return np.squeeze(np.asarray(emb, dtype=np.float32))
+
     def compare_embeddings(self, emb1, emb2):
-        """Compare two embeddings (arrays) using cosine similarity."""
-        emb1 = np.squeeze(np.array(emb1, dtype=np.float32))
-        emb2 = np.squeeze(np.array(emb2, dtype=np.float32))
-        return float(1 - cosine(emb1, emb2))
+        """Compare two embeddings (arrays or float32 buffers) using cosine similarity."""
+        return float(1 - cosine(self._as_vector(emb1), self._as_vector(emb2)))
 
 
 # ----------------------------------------------
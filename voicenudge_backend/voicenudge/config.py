@@ -22,9 +22,81 @@ class Config:
     MAIL_USERNAME = os.getenv("MAIL_USERNAME")
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER", os.getenv("MAIL_USERNAME"))
+
+    # SMTP pool: one persistent connection per sender thread, recycled after
+    # MAIL_MAX_EMAILS messages; transient failures retried with backoff
+    MAIL_POOL_WORKERS = int(os.getenv("MAIL_POOL_WORKERS", "4"))
+    MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "20"))
+    MAIL_MAX_EMAILS = int(os.getenv("MAIL_MAX_EMAILS", "100"))
+    MAIL_POOL_IDLE_SECONDS = int(os.getenv("MAIL_POOL_IDLE_SECONDS", "30"))
+    MAIL_RETRY_ATTEMPTS = int(os.getenv("MAIL_RETRY_ATTEMPTS", "5"))
+    MAIL_RETRY_BASE_SECONDS = float(os.getenv("MAIL_RETRY_BASE_SECONDS", "5"))
+    MAIL_RETRY_MAX_SECONDS = float(os.getenv("MAIL_RETRY_MAX_SECONDS", "300"))
+    # Longest send_many waits (incl. retries) before withdrawing unsent emails
+    MAIL_SEND_TIMEOUT_SECONDS = int(os.getenv("MAIL_SEND_TIMEOUT_SECONDS", "60"))
     
 
     # Google Speech-to-Text
     GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
     SPEECH_LANGUAGE_CODE = os.getenv("SPEECH_LANGUAGE_CODE", "en-US")
-    
+
+    # Models load lazily on first use; PRELOAD_MODELS=true (or
+    # `python wsgi.py --preload-models`) loads them at startup instead.
+    # Warm-up runs one dummy inference per model; avoid it with gunicorn
+    # preload, as torch thread pools started before fork can hang workers.
+    PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "false").lower() == "true"
+    WARMUP_MODELS = os.getenv("WARMUP_MODELS", "false").lower() == "true"
+
+    # /api/metrics/* require a login unless this is true (private scrapers only)
+    METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() == "true"
+
+    # Per-worker cache of classifier predictions and spaCy titles, keyed by
+    # normalized text + model version (changing a joblib file invalidates it)
+    PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))  # 0 → disabled
+    PREDICTION_CACHE_TTL_SECONDS = int(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+
+    # Speech-to-text engine: openai-whisper | faster-whisper | google
+    WHISPER_BACKEND = os.getenv("WHISPER_BACKEND", "openai-whisper")
+    WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")
+
+    # Whisper worker pool (0 workers → transcribe inline in the request thread)
+    STT_POOL_WORKERS = int(os.getenv("STT_POOL_WORKERS", "0"))
+    STT_QUEUE_SIZE = int(os.getenv("STT_QUEUE_SIZE", "32"))
+    STT_MAX_BATCH = int(os.getenv("STT_MAX_BATCH", "8"))
+    STT_BATCH_WINDOW_MS = int(os.getenv("STT_BATCH_WINDOW_MS", "10"))
+    STT_TIMEOUT_SECONDS = int(os.getenv("STT_TIMEOUT_SECONDS", "60"))
+
+    # Async voice ingest (?async=1): background threads per web worker
+    INGEST_JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "4"))
+    INGEST_SSE_POLL_SECONDS = float(os.getenv("INGEST_SSE_POLL_SECONDS", "0.5"))
+    # An event stream ends after this long (EventSource reconnects) and sends a
+    # keep-alive comment when idle, so it can't hold a sync worker forever
+    INGEST_SSE_MAX_SECONDS = int(os.getenv("INGEST_SSE_MAX_SECONDS", "120"))
+    INGEST_SSE_KEEPALIVE_SECONDS = int(os.getenv("INGEST_SSE_KEEPALIVE_SECONDS", "15"))
+    # A queued/running job with no progress for this long lost its worker (restart): mark it failed
+    INGEST_JOB_STALE_SECONDS = int(os.getenv("INGEST_JOB_STALE_SECONDS", "600"))
+
+    # Voice embedding cache (per worker LRU; optional host-wide shared memory)
+    VOICE_EMBEDDING_CACHE_SIZE = int(os.getenv("VOICE_EMBEDDING_CACHE_SIZE", "1024"))
+    VOICE_EMBEDDING_SHM_NAME = os.getenv("VOICE_EMBEDDING_SHM_NAME")  # unset → disabled
+    VOICE_EMBEDDING_SHM_SLOTS = int(os.getenv("VOICE_EMBEDDING_SHM_SLOTS", "4096"))
+
+    # Reminder dispatcher: heap of the next N reminders, woken on create/reschedule
+    REMINDER_DISPATCH_ENABLED = os.getenv("REMINDER_DISPATCH_ENABLED", "true").lower() == "true"
+    # false → web workers don't dispatch; run `python -m voicenudge.reminders.worker` instead
+    REMINDER_WEB_DISPATCH = os.getenv("REMINDER_WEB_DISPATCH", "true").lower() == "true"
+    REMINDER_HEAP_SIZE = int(os.getenv("REMINDER_HEAP_SIZE", "256"))
+    REMINDER_RESYNC_SECONDS = int(os.getenv("REMINDER_RESYNC_SECONDS", "300"))
+    # Standalone worker without Postgres LISTEN/NOTIFY: resync this often (max pickup delay)
+    REMINDER_WORKER_RESYNC_SECONDS = int(os.getenv("REMINDER_WORKER_RESYNC_SECONDS", "60"))
+    REMINDER_FETCH_CHUNK = int(os.getenv("REMINDER_FETCH_CHUNK", "500"))  # rows per joined page in a full scan
+    # Workers lease due reminders with SKIP LOCKED; a lease older than this
+    # (worker died mid-send, or the send failed) can be claimed again
+    REMINDER_LEASE_SECONDS = int(os.getenv("REMINDER_LEASE_SECONDS", "300"))
+    # Digest: one email per user for everything due within the window
+    REMINDER_DIGEST_ENABLED = os.getenv("REMINDER_DIGEST_ENABLED", "false").lower() == "true"
+    REMINDER_DIGEST_WINDOW_SECONDS = int(os.getenv("REMINDER_DIGEST_WINDOW_SECONDS", "900"))
+    REMINDER_DIGEST_MAX_ITEMS = int(os.getenv("REMINDER_DIGEST_MAX_ITEMS", "50"))
+
+    # Enrollment recordings kept for `flask voice reembed` (empty → don't store)
+    VOICE_ENROLLMENT_DIR = os.getenv("VOICE_ENROLLMENT_DIR", os.path.join(os.getcwd(), "voice_enrollments"))
@@ -0,0 +1,60 @@
+"""
+Bulk TaskHistory writes.
+
+`record_history` snapshots many tasks in one executemany INSERT instead of
+one ORM add per row; `archive_tasks` completes tasks with a single
+INSERT ... SELECT from `tasks` followed by set-based deletes, so moving N
+tasks to history costs a fixed number of statements.
+"""
+from datetime import datetime
+
+from sqlalchemy import delete, insert, literal, select
+
+from voicenudge.extensions import db
+from voicenudge.models import Reminder, Task, TaskHistory
+
+# Task columns copied into a history snapshot
+SNAPSHOT_COLUMNS = ("text", "title", "due_at", "category", "priority")
+
+
+def history_row(task, user_id=None):
+    """TaskHistory values for a snapshot of `task`."""
+    row = {column: getattr(task, column, None) for column in SNAPSHOT_COLUMNS}
+    row["user_id"] = user_id if user_id is not None else task.user_id
+    row["task_id"] = task.id
+    return row
+
+
+def record_history(rows):
+    """Insert history rows (dicts from `history_row`) in one executemany; caller commits."""
+    if rows:
+        db.session.execute(insert(TaskHistory.__table__), rows)
+    return len(rows)
+
+
+def archive_tasks(user_id, task_ids):
+    """
+    Move the user's tasks in `task_ids` to history and delete them (with their
+    reminders); caller commits. Returns the ids actually archived — ids that
+    don't exist or belong to another user are ignored.
+    """
+    owned = select(Task.id).where(Task.user_id == user_id, Task.id.in_(task_ids))
+    archived = db.session.execute(owned).scalars().all()
+    if not archived:
+        return []
+
+    snapshot = select(
+        Task.user_id,
+        Task.id,
+        *(getattr(Task, column) for column in SNAPSHOT_COLUMNS),
+        literal(datetime.utcnow(), TaskHistory.completed_at.type),
+    ).where(Task.id.in_(archived))
+    db.session.execute(
+        insert(TaskHistory).from_select(
+            ["user_id", "task_id", *SNAPSHOT_COLUMNS, "completed_at"], snapshot
+        )
+    )
+    # Set-based deletes skip the ORM cascade, so clear reminders explicitly
+    db.session.execute(delete(Reminder).where(Reminder.task_id.in_(archived)))
+    db.session.execute(delete(Task).where(Task.id.in_(archived)))
+    return archived
@@ -0,0 +1,98 @@
+"""
+One-round-trip history queries.
+
+History is the union of completed tasks still in `tasks` (their created_at
+stands in for a completion time, which that table doesn't record) and
+archived `task_history` rows. `history_select` combines both in a single
+UNION ALL ordered newest first by (completed_at, source, id), with optional
+category/date filters and keyset pagination; each branch is pre-limited on
+its own index so a page never scans the whole history.
+"""
+from sqlalchemy import and_, literal, or_, select, union_all
+
+from voicenudge.models import Task, TaskHistory
+
+
+def _branches(uid):
+    tasks = select(
+        Task.id.label("id"),
+        Task.title.label("title"),
+        Task.due_at.label("due_at"),
+        Task.category.label("category"),
+        Task.priority.label("priority"),
+        literal("completed").label("status"),
+        Task.created_at.label("completed_at"),
+        literal("tasks").label("source"),
+    ).where(Task.user_id == uid, Task.status == "completed")
+
+    archived = select(
+        TaskHistory.id.label("id"),
+        TaskHistory.title.label("title"),
+        TaskHistory.due_at.label("due_at"),
+        TaskHistory.category.label("category"),
+        TaskHistory.priority.label("priority"),
+        literal("archived").label("status"),
+        TaskHistory.completed_at.label("completed_at"),
+        literal("history").label("source"),
+    ).where(TaskHistory.user_id == uid)
+
+    return (
+        ("tasks", tasks, Task.created_at, Task.id, Task.category),
+        ("history", archived, TaskHistory.completed_at, TaskHistory.id, TaskHistory.category),
+    )
+
+
+def _after(source, completed_at, row_id, cursor):
+    """Rows of `source` that sort after `cursor` in (completed_at, source, id) DESC order."""
+    c_at, c_source, c_id = cursor
+    if source < c_source:
+        return completed_at <= c_at
+    if source > c_source:
+        return completed_at < c_at
+    return or_(completed_at < c_at, and_(completed_at == c_at, row_id < c_id))
+
+
+def history_select(uid, category=None, since=None, until=None, after=None, limit=None):
+    """
+    SELECT for the user's history, newest first. `since`/`until` bound
+    completed_at (inclusive/exclusive); `after` is a decoded cursor
+    (completed_at, source, id) and `limit` the page size.
+    """
+    parts = []
+    for source, stmt, completed_at, row_id, category_col in _branches(uid):
+        if category:
+            stmt = stmt.where(category_col == category)
+        if since:
+            stmt = stmt.where(completed_at >= since)
+        if until:
+            stmt = stmt.where(completed_at < until)
+        if after:
+            stmt = stmt.where(_after(source, completed_at, row_id, after))
+        if limit is not None:
+            # Each branch can contribute at most `limit` rows to the page
+            stmt = select(stmt.order_by(completed_at.desc(), row_id.desc()).limit(limit).subquery())
+        parts.append(stmt)
+
+    combined = union_all(*parts).subquery()
+    query = select(combined).order_by(
+        combined.c.completed_at.desc(), combined.c.source.desc(), combined.c.id.desc()
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def history_entry(row):
+    """JSON shape of one history entry (completed_at only for archived rows)."""
+    item = {
+        "id": row.id,
+        "title": row.title,
+        "due_at": str(row.due_at),
+        "category": row.category,
+        "priority": row.priority,
+        "status": row.status,
+        "source": row.source,
+    }
+    if row.source == "history":
+        item["completed_at"] = str(row.completed_at)
+    return item
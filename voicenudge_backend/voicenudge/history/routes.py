@@ -1,10 +1,82 @@
-from flask import Blueprint, jsonify
+import csv
+import io
+import json
+from datetime import datetime
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from voicenudge.extensions import db
-from voicenudge.models import Task, TaskHistory
+from voicenudge.history.queries import history_entry, history_select
+from voicenudge.models import TaskHistory
+from voicenudge.pagination import decode_cursor, encode_cursor, parse_limit
 
 history_bp = Blueprint("history", __name__)
 
+# Rows fetched per round trip when streaming (server-side cursor on Postgres)
+STREAM_BATCH = 500
+EXPORT_COLUMNS = ("id", "title", "due_at", "category", "priority", "status", "completed_at", "source")
+
+
+def _filters(args):
+    """category/from/to query params → history_select kwargs (ValueError on bad dates)."""
+    return {
+        "category": args.get("category") or None,
+        "since": datetime.fromisoformat(args["from"]) if args.get("from") else None,
+        "until": datetime.fromisoformat(args["to"]) if args.get("to") else None,
+    }
+
+
+def iter_history(uid, **filters):
+    """
+    Yield the user's history entries one dict at a time, newest first, from
+    a single UNION ALL query. Rows are fetched STREAM_BATCH at a time
+    (server-side cursor on Postgres), so memory stays flat however long
+    the history is.
+    """
+    result = db.session.execute(
+        history_select(uid, **filters), execution_options={"stream_results": True}
+    ).yield_per(STREAM_BATCH)
+    for row in result:
+        yield history_entry(row)
+
+
+def _json_array(rows):
+    """Chunked JSON array: same document as jsonify(list(rows)), built row by row."""
+    yield "["
+    for i, row in enumerate(rows):
+        yield ("," if i else "") + json.dumps(row)
+    yield "]"
+
+
+def _ndjson(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def _csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+STREAM_FORMATS = {
+    "json": (_json_array, "application/json"),
+    "ndjson": (_ndjson, "application/x-ndjson"),
+    "csv": (_csv, "text/csv"),
+}
+
+
+def _stream(uid, fmt, filters, filename=None):
+    encode, mimetype = STREAM_FORMATS[fmt]
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return Response(stream_with_context(encode(iter_history(uid, **filters))), mimetype=mimetype, headers=headers)
+
 
 # -------------------------
 # List history (completed + archived)
@@ -12,40 +84,59 @@ history_bp = Blueprint("history", __name__)
 @history_bp.route("/", methods=["GET"])
 @jwt_required()
 def list_history():
+    """
+    Newest first, filtered by category and from/to (ISO dates, `to`
+    exclusive). ?limit=&cursor= returns one page as
+    {"history": [...], "next_cursor": "..."|null}; ?stream=json|ndjson
+    streams every entry; otherwise the full list as a JSON array.
+    """
+    uid = int(get_jwt_identity())
+    args = request.args
+
+    try:
+        filters = _filters(args)
+        if "limit" in args or "cursor" in args:
+            limit = parse_limit(args.get("limit"))
+            after = decode_cursor(args["cursor"], datetime, str, int) if args.get("cursor") else None
+        else:
+            limit = after = None
+    except ValueError as e:  # includes PaginationError
+        return jsonify({"error": str(e)}), 400
+
+    fmt = args.get("stream")
+    if fmt:
+        if fmt not in ("json", "ndjson"):
+            return jsonify({"error": "stream must be json or ndjson"}), 400
+        return _stream(uid, fmt, filters)
+
+    if limit is None:
+        return jsonify(list(iter_history(uid, **filters)))
+
+    # One extra row tells us whether there's a next page
+    rows = db.session.execute(history_select(uid, after=after, limit=limit + 1, **filters)).all()
+    last = rows[limit - 1] if len(rows) > limit else None
+    return jsonify({
+        "history": [history_entry(row) for row in rows[:limit]],
+        "next_cursor": encode_cursor(last.completed_at, last.source, last.id) if last else None,
+    })
+
+
+# -------------------------
+# Export history (streamed file)
+# -------------------------
+@history_bp.route("/export", methods=["GET"])
+@jwt_required()
+def export_history():
     uid = int(get_jwt_identity())
 
-    # 1. Completed tasks still in tasks table
-    completed_tasks = Task.query.filter_by(user_id=uid, status="completed").all()
-
-    # 2. Archived history entries
-    archived = TaskHistory.query.filter_by(user_id=uid).all()
-
-    results = []
-
-    for t in completed_tasks:
-        results.append({
-            "id": t.id,
-            "title": t.title,
-            "due_at": str(t.due_at),
-            "category": t.category,
-            "priority": t.priority,
-            "status": "completed",
-            "source": "tasks"
-        })
-
-    for h in archived:
-        results.append({
-            "id": h.id,
-            "title": h.title,
-            "due_at": str(h.due_at),
-            "category": h.category,
-            "priority": h.priority,
-            "status": "archived",
-            "completed_at": str(h.completed_at),
-            "source": "history"
-        })
-
-    return jsonify(results)
+    fmt = request.args.get("format", "csv")
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    try:
+        filters = _filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return _stream(uid, fmt, filters, filename=f"voicenudge_history.{fmt}")
 
 
 # -------------------------
@@ -0,0 +1,72 @@
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import verify_jwt_in_request
+from voicenudge.auth.embedding_cache import embedding_cache
+from voicenudge.ml.prediction_cache import prediction_cache, title_cache
+from voicenudge.model_loader import model_status
+from voicenudge.reminders.dispatcher import reminder_dispatcher
+from voicenudge.reminders.mailer import mail_pool
+from voicenudge.speech.stt_pool import stt_pool
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.before_request
+def require_login():
+    """Metrics expose queue state, cache sizes and SMTP failures: logged-in users only,
+    unless METRICS_PUBLIC is set (e.g. a scraper on a private network)."""
+    if not current_app.config.get("METRICS_PUBLIC", False):
+        verify_jwt_in_request()
+
+
+# -------------------------
+# Speech-to-text worker pool
+# -------------------------
+@metrics_bp.route("/stt", methods=["GET"])
+def stt_metrics():
+    """Queue depth, batch sizes and per-stage timings of the STT pool."""
+    return jsonify(stt_pool.stats())
+
+
+# -------------------------
+# Lazily loaded models
+# -------------------------
+@metrics_bp.route("/models", methods=["GET"])
+def model_metrics():
+    """Which models are loaded in this worker and how long each took."""
+    return jsonify(model_status())
+
+
+# -------------------------
+# Voice embedding cache
+# -------------------------
+@metrics_bp.route("/embeddings", methods=["GET"])
+def embedding_metrics():
+    """Hit rate and occupancy of the voice embedding cache."""
+    return jsonify(embedding_cache.stats())
+
+
+# -------------------------
+# Prediction / title cache
+# -------------------------
+@metrics_bp.route("/predictions", methods=["GET"])
+def prediction_metrics():
+    """Hit rate and occupancy of the classifier and title caches."""
+    return jsonify({"predictions": prediction_cache.stats(), "titles": title_cache.stats()})
+
+
+# -------------------------
+# Reminder dispatcher
+# -------------------------
+@metrics_bp.route("/reminders", methods=["GET"])
+def reminder_metrics():
+    """Heap occupancy, time to next reminder and dispatch lag."""
+    return jsonify(reminder_dispatcher.stats())
+
+
+# -------------------------
+# SMTP delivery pool
+# -------------------------
+@metrics_bp.route("/mail", methods=["GET"])
+def mail_metrics():
+    """Sent/retried/failed counts, open connections and retry queue depth."""
+    return jsonify(mail_pool.stats())
@@ -1,21 +1,130 @@
 import os, joblib
+import threading
+from voicenudge.ml.multihead import predict_with_confidence
+from voicenudge.ml.prediction_cache import prediction_cache
+from voicenudge.model_loader import lazy_model
+from voicenudge.nlp.utils import clean_text
 
-# Load pretrained models
+# Pretrained models, loaded on first prediction
 CATEGORY_MODEL_PATH = "models/category_svm.joblib"
+# Filename kept for existing deployments; the classifier inside is whichever
+# train/select_priority_model.py picked (no longer necessarily a RandomForest)
 PRIORITY_MODEL_PATH = "models/priority_rf.joblib"
+# Shared-vectorizer format (train/train_models.py); preferred by predict_all
+MULTIHEAD_MODEL_PATH = "models/task_multihead.joblib"
 
-try:
-    category_model = joblib.load(CATEGORY_MODEL_PATH)
-except:
-    category_model = None
+# Sentinel: "not loaded yet" (None means "no model → fallback label")
+_NOT_LOADED = object()
+category_model = _NOT_LOADED
+priority_model = _NOT_LOADED
+multihead_model = _NOT_LOADED
+
+
+def _load(path):
+    try:
+        return joblib.load(path)
+    except:
+        return None
+
+
+_category = lazy_model("category-model", lambda: _load(CATEGORY_MODEL_PATH))
+_priority = lazy_model("priority-model", lambda: _load(PRIORITY_MODEL_PATH))
+_multihead = lazy_model("multihead-model", lambda: _load(MULTIHEAD_MODEL_PATH))
+
+
+def _resolve(model, lazy):
+    return lazy.get() if model is _NOT_LOADED else model
+
+
+_version = None
+_version_lock = threading.Lock()
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def model_version():
+    """
+    mtimes of the joblib files. When a retrain replaces one, the loaded
+    models are dropped (the next prediction reloads them) and so are the
+    cached predictions.
+    """
+    global _version
+    version = tuple(_mtime(p) for p in (CATEGORY_MODEL_PATH, PRIORITY_MODEL_PATH, MULTIHEAD_MODEL_PATH))
+    if version != _version:
+        with _version_lock:
+            if version != _version:
+                if _version is not None:
+                    print("🔄 Model files changed on disk; reloading classifiers")
+                    for lazy in (_category, _priority, _multihead):
+                        lazy.reset()
+                    prediction_cache.invalidate()
+                _version = version
+    return version
+
+
+def _cached(head, texts, predict):
+    """Per-text cache in front of `predict(texts)`, keyed by normalized text + model version."""
+    texts = list(texts)
+    version = model_version()
+    keys = [(head, clean_text(t), version) for t in texts]
+    return prediction_cache.get_many(keys, texts, predict)
+
+
+def _category_labels(texts):
+    model = _resolve(category_model, _category)
+    return list(model.predict(texts)) if model else ["Personal"] * len(texts)
+
+
+def _priority_labels(texts):
+    model = _resolve(priority_model, _priority)
+    return list(model.predict(texts)) if model else ["Medium"] * len(texts)
 
-try:
-    priority_model = joblib.load(PRIORITY_MODEL_PATH)
-except:
-    priority_model = None
 
 def predict_category(text: str):
-    return category_model.predict([text])[0] if category_model else "Personal"
+    return predict_categories([text])[0]
 
 def predict_priority(text: str):
-    return priority_model.predict([text])[0] if priority_model else "Medium"
+    return predict_priorities([text])[0]
+
+
+def predict_categories(texts):
+    """One model.predict over the uncached texts (vectorized once per batch)."""
+    return _cached("category", texts, _category_labels)
+
+
+def predict_priorities(texts):
+    return _cached("priority", texts, _priority_labels)
+
+
+def _head(model, fallback, texts):
+    if not model:
+        return [fallback] * len(texts), [None] * len(texts)
+    return predict_with_confidence(model, texts)
+
+
+def _predict_all(texts):
+    model = _resolve(multihead_model, _multihead)
+    if model:
+        return model.predict_all(texts)
+
+    categories, category_conf = _head(_resolve(category_model, _category), "Personal", texts)
+    priorities, priority_conf = _head(_resolve(priority_model, _priority), "Medium", texts)
+    return [
+        {"category": str(c), "category_confidence": cc, "priority": str(p), "priority_confidence": pc}
+        for c, cc, p, pc in zip(categories, category_conf, priorities, priority_conf)
+    ]
+
+
+def predict_all(texts):
+    """
+    Category, priority and their confidences for every text, as
+    [{"category", "category_confidence", "priority", "priority_confidence"}].
+    With the multi-head model the texts are vectorized once for both heads;
+    otherwise the two legacy pipelines run side by side.
+    """
+    return [dict(row) for row in _cached("all", texts, _predict_all)]  # copies: cache stays intact
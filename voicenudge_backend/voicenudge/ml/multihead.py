@@ -0,0 +1,70 @@
+"""
+Multi-head task classifier.
+
+The legacy format is two independent sklearn Pipelines, each with its own
+TfidfVectorizer, so every prediction tokenizes and vectorizes the text
+twice. A MultiHeadModel holds one vectorizer and several classifier heads:
+the sparse TF-IDF matrix is built once per batch and every head reads it.
+
+Kept free of sklearn imports so joblib can unpickle it wherever the
+heads' own dependencies are installed.
+"""
+import numpy as np
+
+
+def predict_with_confidence(clf, X):
+    """
+    (labels, confidences) for a fitted classifier or Pipeline. Confidence is
+    the top class probability, a softmax over decision scores for margin
+    models (LinearSVC), or None if the model exposes neither.
+    """
+    if hasattr(clf, "predict_proba"):
+        scores = np.asarray(clf.predict_proba(X))
+    elif hasattr(clf, "decision_function"):
+        scores = np.asarray(clf.decision_function(X), dtype=float)
+        if scores.ndim == 1:  # binary: one margin per row
+            scores = np.column_stack([-scores, scores])
+        scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        scores /= scores.sum(axis=1, keepdims=True)
+    else:
+        labels = list(clf.predict(X))
+        return labels, [None] * len(labels)
+
+    best = scores.argmax(axis=1)
+    labels = np.asarray(clf.classes_)[best]
+    return list(labels), [round(float(p), 4) for p in scores[np.arange(len(best)), best]]
+
+
+class MultiHeadModel:
+    """One shared vectorizer feeding named classifier heads (e.g. category, priority)."""
+
+    def __init__(self, vectorizer, heads):
+        self.vectorizer = vectorizer
+        self.heads = dict(heads)
+
+    def fit(self, texts, targets):
+        """`targets` maps head name → labels; the vectorizer is fitted once for all heads."""
+        X = self.vectorizer.fit_transform(texts)
+        for name, clf in self.heads.items():
+            clf.fit(X, targets[name])
+        return self
+
+    def transform(self, texts):
+        return self.vectorizer.transform(list(texts))
+
+    def predict(self, texts, head):
+        return list(self.heads[head].predict(self.transform(texts)))
+
+    def predict_all(self, texts):
+        """
+        One dict per text: {head: label, f"{head}_confidence": float|None}
+        for every head, from a single vectorization pass.
+        """
+        X = self.transform(texts)
+        rows = [{} for _ in range(X.shape[0])]
+        for name, clf in self.heads.items():
+            labels, confidences = predict_with_confidence(clf, X)
+            for row, label, confidence in zip(rows, labels, confidences):
+                row[name] = str(label)
+                row[f"{name}_confidence"] = confidence
+        return rows
@@ -0,0 +1,100 @@
+"""
+In-memory caches for per-text NLP results.
+
+Users repeat the same tasks ("pay rent", "gym at 6"), so classifier
+predictions and spaCy titles are cached keyed by (clean_text(text), model
+version). The version is part of the key, so a retrained model can never
+be served a stale entry; callers also `invalidate()` eagerly when they see
+the model change. Entries expire after a TTL and the LRU is bounded.
+
+Date resolution is never cached: it depends on "now".
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Bounded LRU with per-entry TTL; capacity 0 disables caching."""
+
+    def __init__(self, name, capacity=4096, ttl_seconds=3600):
+        self.name = name
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key → (expires monotonic time, value)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def init_app(self, app):
+        self.capacity = app.config.get("PREDICTION_CACHE_SIZE", 4096)
+        self.ttl_seconds = app.config.get("PREDICTION_CACHE_TTL_SECONDS", 3600)
+
+    def get(self, key):
+        """Cached value or None (values themselves are never None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_many(self, keys, inputs, compute):
+        """
+        Values for `keys` (parallel to `inputs`). Misses are computed with one
+        `compute(list_of_inputs)` call over the distinct missing keys, so a
+        batch with repeated texts runs the model once per distinct text.
+        """
+        values = [self.get(key) for key in keys]
+        missing = {}  # key → first input with that key
+        for key, value, item in zip(keys, values, inputs):
+            if value is None:
+                missing.setdefault(key, item)
+        if not missing:
+            return values
+
+        computed = dict(zip(missing, compute(list(missing.values()))))
+        for key, value in computed.items():
+            self.put(key, value)
+        return [computed[key] if value is None else value for key, value in zip(keys, values)]
+
+    def invalidate(self):
+        """Drop everything (e.g. the model behind the cached values changed)."""
+        with self._lock:
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else None,
+            }
+
+
+# Classifier outputs (category / priority / predict_all rows)
+prediction_cache = PredictionCache("predictions")
+# spaCy title extraction in parse_task
+title_cache = PredictionCache("titles")
@@ -0,0 +1,101 @@
+"""
+Lazy, thread-safe model singletons.
+
+Heavy models (Whisper, spaCy, the joblib classifiers, SpeechBrain ECAPA)
+are loaded on first use instead of at import, so a worker only pays for
+the models its requests actually touch. `preload_models()` loads them all
+up front, e.g. in the gunicorn master before forking so workers share the
+weights copy-on-write.
+"""
+import threading
+import time
+
+_registry = {}
+
+
+class LazyModel:
+    """Load-once holder: `get()` runs `loader` on first call, then caches."""
+
+    def __init__(self, name, loader, warmup=None):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.load_seconds = None
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:  # another thread may have won the race
+                    t0 = time.perf_counter()
+                    self._value = self.loader()
+                    self.load_seconds = time.perf_counter() - t0
+                    self._loaded = True
+                    print(f"✅ Loaded {self.name} in {self.load_seconds:.2f}s")
+        return self._value
+
+    def reset(self):
+        """Forget the loaded value; the next `get()` loads it again (e.g. the file changed)."""
+        with self._lock:
+            self._value = None
+            self._loaded = False
+            self.load_seconds = None
+
+    def run_warmup(self):
+        """Run the optional warm-up hook (e.g. one dummy inference)."""
+        model = self.get()
+        if self.warmup and model is not None:
+            t0 = time.perf_counter()
+            self.warmup(model)
+            print(f"🔥 Warmed up {self.name} in {time.perf_counter() - t0:.2f}s")
+
+
+def lazy_model(name, loader, warmup=None):
+    """Create and register a LazyModel (re-registering replaces the old one)."""
+    model = LazyModel(name, loader, warmup)
+    _registry[name] = model
+    return model
+
+
+def _import_model_modules(include_stt):
+    # Models register themselves when their module is imported
+    from voicenudge.auth import routes  # noqa: F401
+    from voicenudge.ml import model_service  # noqa: F401
+    from voicenudge.nlp import utils  # noqa: F401
+
+    if include_stt:
+        from voicenudge.speech.backends import get_backend
+
+        get_backend()
+
+
+def preload_models(warmup=False, include_stt=True):
+    """
+    Load every registered model now; returns {name: load_seconds}.
+    Pass include_stt=False when a separate STT pool owns the Whisper model.
+    """
+    _import_model_modules(include_stt)
+    t0 = time.perf_counter()
+    for model in list(_registry.values()):
+        try:
+            model.run_warmup() if warmup else model.get()
+        except Exception as e:
+            print(f"⚠️ Could not preload {model.name}: {e}")
+    print(f"✅ Preloaded {len(_registry)} model(s) in {time.perf_counter() - t0:.2f}s")
+    return {name: model.load_seconds for name, model in _registry.items()}
+
+
+def model_status():
+    return {
+        name: {
+            "loaded": model.loaded,
+            "load_seconds": round(model.load_seconds, 3) if model.load_seconds is not None else None,
+        }
+        for name, model in _registry.items()
+    }
@@ -1,4 +1,6 @@
 from datetime import datetime
+import numpy as np
+from sqlalchemy.orm import deferred
 from voicenudge.extensions import db
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -12,7 +14,12 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # 🆕 Voice Authentication Fields
-    voice_embedding = db.Column(db.PickleType, nullable=True)  # stores extracted voice embedding vector
+    # Raw little-endian float32 vector (192 × 4 bytes for ECAPA). Deferred:
+    # only fetched on an embedding-cache miss, not with every User load.
+    voice_embedding_blob = deferred(db.Column(db.LargeBinary, nullable=True))
+    voice_embedding_dim = db.Column(db.Integer, nullable=True)
+    voice_embedding_model = db.Column(db.String(64), nullable=True)  # speaker model that produced it
+    voice_embedding_version = db.Column(db.Integer, default=0)  # bumped on every (re-)enrollment; 0 = none
     voice_locked = db.Column(db.Boolean, default=False)        # lock flag for unauthorized access
 
     # Relationships
@@ -26,6 +33,26 @@ class User(db.Model):
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
+
+    # Voice embedding methods
+    @property
+    def has_voice_embedding(self):
+        return bool(self.voice_embedding_version)
+
+    @property
+    def voice_embedding(self):
+        """Zero-copy float32 view over the stored bytes (None if not enrolled)."""
+        if self.voice_embedding_blob is None:
+            return None
+        return np.frombuffer(self.voice_embedding_blob, dtype="<f4", count=self.voice_embedding_dim)
+
+    def set_voice_embedding(self, embedding, model_version=None):
+        """Store a new enrollment vector and bump its version (invalidates caches)."""
+        vector = np.ascontiguousarray(embedding, dtype="<f4").reshape(-1)
+        self.voice_embedding_blob = vector.tobytes()
+        self.voice_embedding_dim = vector.size
+        self.voice_embedding_model = model_version
+        self.voice_embedding_version = (self.voice_embedding_version or 0) + 1
     # 🧠 Security Question (fallback for voice mismatch)
     security_question = db.Column(db.String(255), nullable=True)
     security_answer_hash = db.Column(db.String(255), nullable=True)
@@ -62,6 +89,12 @@ class Task(db.Model):
     # Relationships
     reminders = db.relationship("Reminder", backref="task", lazy=True, cascade="all,delete")
 
+    # Keyset pages of GET /api/tasks/, with and without a status filter
+    __table_args__ = (
+        db.Index("ix_tasks_user_status_due", "user_id", "status", "due_at", "id"),
+        db.Index("ix_tasks_user_due", "user_id", "due_at", "id"),
+    )
+
 
 class TaskHistory(db.Model):
     __tablename__ = "task_history"
@@ -77,6 +110,11 @@ class TaskHistory(db.Model):
     priority = db.Column(db.String(20))
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Newest-first history pages per user
+    __table_args__ = (
+        db.Index("ix_task_history_user_completed", "user_id", "completed_at"),
+    )
+
 
 class Reminder(db.Model):
     __tablename__ = "reminders"
@@ -85,7 +123,37 @@ class Reminder(db.Model):
     task_id = db.Column(db.Integer, db.ForeignKey("tasks.id"), nullable=False)
 
     # Reminder details
-    remind_at = db.Column(db.DateTime, nullable=False, index=True)
+    remind_at = db.Column(db.DateTime, nullable=False)
     channel = db.Column(db.String(16), default="email")
     sent = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Delivery lease: which worker is sending it and since when (UTC)
+    claimed_by = db.Column(db.String(128), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+
+    # Partial index: only the pending rows the dispatcher scans are indexed,
+    # so it stays small however many sent reminders accumulate
+    __table_args__ = (
+        db.Index(
+            "ix_reminders_unsent_remind_at",
+            "remind_at",
+            postgresql_where=db.text("sent = false"),
+            sqlite_where=db.text("sent = 0"),
+        ),
+    )
+
+
+class IngestJob(db.Model):
+    __tablename__ = "ingest_jobs"
+    id = db.Column(db.String(32), primary_key=True)      # uuid4 hex, returned to the client
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+
+    # Progress: queued → transcribing → parsing → classifying → saving → done
+    status = db.Column(db.String(20), default="queued")  # queued / running / completed / failed
+    stage = db.Column(db.String(20), default="queued")
+    result = db.Column(db.JSON, nullable=True)           # final Task payload
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
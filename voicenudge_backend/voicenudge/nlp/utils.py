@@ -2,25 +2,30 @@ import re, os
 import dateparser
 from datetime import datetime, timedelta
 import pytz
-import spacy
+from voicenudge.ml.prediction_cache import title_cache
+from voicenudge.model_loader import lazy_model
 
-# Load spaCy model once
-nlp = spacy.load("en_core_web_sm")
+SPACY_MODEL = "en_core_web_sm"
+
+
+def _load_spacy():
+    import spacy
+    return spacy.load(SPACY_MODEL)
+
+
+# spaCy model, loaded once on first use
+_nlp = lazy_model(f"spacy-{SPACY_MODEL}", _load_spacy)
+
+
+def get_nlp():
+    return _nlp.get()
 
 def clean_text(text: str) -> str:
     """Normalize text by trimming, lowering, removing extra spaces."""
     return re.sub(r"\s+", " ", (text or "").strip().lower())
 
-def parse_task(text: str):
-    """
-    Parse a task string into a title and due datetime.
-    Example: "Buy milk tomorrow at 6pm"
-    Returns: {"title": "buy milk", "due_at": datetime or None}
-    """
-    tzname = os.getenv("TIMEZONE", "Asia/Kolkata")
-    tz = pytz.timezone(tzname)
-    now = datetime.now(tz)
-
+def _due_at(text: str, now):
+    """Resolve the due datetime mentioned in `text` relative to `now` (or None)."""
     # --- Try parsing with dateparser first ---
     due_at = dateparser.parse(
         text,
@@ -54,14 +59,57 @@ def parse_task(text: str):
             due_at = (now + timedelta(days=1)).replace(
                 hour=9, minute=0, second=0, microsecond=0
             )
+    return due_at
 
-    # --- Title extraction ---
-    doc = nlp(text)
+
+def _title(doc, text: str) -> str:
+    """Title = lemmas of the non-stopword alphabetic tokens."""
     tokens = [t.lemma_.lower() for t in doc if not t.is_stop and t.is_alpha]
     title = " ".join(tokens) if tokens else text
+    return title.strip()
+
+
+def _titles(texts, batch_size=64):
+    """
+    Titles for `texts`, cached by normalized text. Misses go through spaCy in
+    one `nlp.pipe` pass (parser/NER skipped — titles only need lemmas).
+    """
+    def extract(misses):
+        nlp = get_nlp()
+        skip = [name for name in ("parser", "ner") if name in nlp.pipe_names]
+        docs = nlp.pipe(misses, batch_size=batch_size, disable=skip)
+        return [_title(doc, text) for doc, text in zip(docs, misses)]
+
+    keys = [(clean_text(t), SPACY_MODEL) for t in texts]
+    return title_cache.get_many(keys, texts, extract)
+
+
+def _now():
+    tz = pytz.timezone(os.getenv("TIMEZONE", "Asia/Kolkata"))
+    return datetime.now(tz)
+
+
+def parse_task(text: str):
+    """
+    Parse a task string into a title and due datetime.
+    Example: "Buy milk tomorrow at 6pm"
+    Returns: {"title": "buy milk", "due_at": datetime or None}
+    """
+    # Dates depend on "now", so only the title is cached
+    due_at = _due_at(text, _now())
 
     # ✅ Return datetime directly
     return {
-        "title": title.strip(),
+        "title": _titles([text])[0],
         "due_at": due_at  # timezone-aware datetime or None
     }
+
+
+def parse_tasks(texts, batch_size=64):
+    """
+    Batch version of `parse_task`: uncached titles come from one spaCy
+    `nlp.pipe` pass, and every due date is resolved against the same "now".
+    """
+    now = _now()
+    titles = _titles(texts, batch_size)
+    return [{"title": title, "due_at": _due_at(text, now)} for title, text in zip(titles, texts)]
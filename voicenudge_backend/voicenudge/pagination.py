@@ -0,0 +1,45 @@
+"""
+Opaque keyset cursors for paginated list endpoints.
+
+A cursor is the sort key of the last row on a page, JSON-encoded and
+base64url'd; the next page starts strictly after it.
+"""
+import base64
+import json
+from datetime import datetime
+
+
+class PaginationError(ValueError):
+    """Malformed cursor or limit in a request; routes answer 400 with the message."""
+
+
+def encode_cursor(*key):
+    """Encode a sort key (datetimes, ints, strings or None) as a URL-safe token."""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in key]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, *types):
+    """Decode a token from `encode_cursor`; `types` gives each value's type (datetime → parsed)."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong arity")
+        return tuple(
+            None if v is None else datetime.fromisoformat(v) if t is datetime else t(v)
+            for v, t in zip(values, types)
+        )
+    except (ValueError, TypeError) as e:
+        raise PaginationError(f"Invalid cursor: {e}") from e
+
+
+def parse_limit(value, default=50, maximum=200):
+    """Page size from a query-string value, clamped to [1, maximum]."""
+    if value is None:
+        return default
+    try:
+        return min(max(int(value), 1), maximum)
+    except ValueError:
+        raise PaginationError("limit must be an integer")
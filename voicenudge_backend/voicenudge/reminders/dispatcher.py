@@ -0,0 +1,313 @@
+"""
+Event-driven reminder dispatcher.
+
+Instead of scanning the reminders table every minute, one background
+thread per process keeps the next REMINDER_HEAP_SIZE unsent reminders in
+an in-memory min-heap ordered by `remind_at` (loaded with one range query
+on the remind_at index) and sleeps exactly until the earliest one is due.
+Routes call `reminder_dispatcher.notify(reminder)` after creating or
+rescheduling a reminder, which pushes it onto the heap and wakes the
+thread, so dispatch latency is sub-second and an idle system does no DB
+work beyond a periodic resync (REMINDER_RESYNC_SECONDS) that picks up rows
+written by other processes.
+
+When the dispatcher runs in the standalone worker instead
+(REMINDER_WEB_DISPATCH=false), `notify()` in the web processes sends a
+Postgres NOTIFY on NOTIFY_CHANNEL that the worker LISTENs on, so new
+reminders still reach its heap within a second. Without Postgres the
+worker falls back to resyncing every REMINDER_WORKER_RESYNC_SECONDS (60 s,
+the old polling interval), which bounds the delay well inside the 5-minute
+lead reminders have before the task is due.
+
+Every web worker runs its own dispatcher over the same rows; due reminders
+are leased with SKIP LOCKED (see `claim_due_reminders`), so each is sent by
+exactly one worker. Rows another worker holds a live lease on (it's
+mid-send, or its send failed) are left out of the heap; the thread instead
+schedules its next resync for the earliest lease expiry, when they become
+claimable again.
+"""
+import heapq
+import select
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, text
+
+from voicenudge.extensions import db
+from voicenudge.models import Reminder
+from voicenudge.reminders.scheduler import UNSENT, claim_due_reminders, deliver_reminders
+
+
+# Postgres channel carrying "<reminder id>:<remind_at timestamp>" payloads
+NOTIFY_CHANNEL = "voicenudge_reminders"
+
+
+def _timestamp(dt):
+    """Reminder times are stored as UTC; naive values (SQLite) are treated as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class ReminderDispatcher:
+    """Min-heap of upcoming reminders served by a single sleeping thread."""
+
+    def __init__(self, capacity=256, resync_seconds=300, lease_seconds=300):
+        self.capacity = capacity
+        self.resync_seconds = resync_seconds
+        self.lease_seconds = lease_seconds
+        self.fallback_resync_seconds = 60
+        self.app = None
+
+        self._heap = []          # (remind_at timestamp, reminder id)
+        self._horizon = None     # unsent rows later than this aren't loaded; None → all are
+        self._cond = threading.Condition()
+        self._woken = False
+        self._stop = False
+        self._thread = None
+        self._listener = None
+        self._next_resync = 0.0
+        self._stats = {"dispatched": 0, "failed": 0, "skipped": 0, "refills": 0, "wakeups": 0,
+                       "published": 0, "received": 0, "last_lag_ms": None}
+
+    def init_app(self, app):
+        self.capacity = app.config.get("REMINDER_HEAP_SIZE", 256)
+        self.resync_seconds = app.config.get("REMINDER_RESYNC_SECONDS", 300)
+        self.lease_seconds = app.config.get("REMINDER_LEASE_SECONDS", 300)
+        self.fallback_resync_seconds = app.config.get("REMINDER_WORKER_RESYNC_SECONDS", 60)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, app, listen=False):
+        """
+        Start the dispatcher thread. `listen=True` (the standalone worker)
+        also LISTENs for reminders created by web processes; on databases
+        without LISTEN/NOTIFY the resync interval is shortened instead.
+        """
+        with self._cond:
+            if self.running:
+                return
+            self.app = app
+            self._stop = False
+            self._next_resync = 0.0  # load the heap immediately
+            self._thread = threading.Thread(target=self._run, name="reminder-dispatcher", daemon=True)
+            self._thread.start()
+        print("✅ Reminder dispatcher started")
+
+        if not listen:
+            return
+        with app.app_context():
+            dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            self._listener = threading.Thread(target=self._listen, name="reminder-listener", daemon=True)
+            self._listener.start()
+        else:
+            self.resync_seconds = min(self.resync_seconds, self.fallback_resync_seconds)
+            print(f"ℹ️ No LISTEN/NOTIFY on {dialect}: resyncing reminders every {self.resync_seconds}s")
+
+    def stop(self, timeout=5):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        for thread in (self._thread, self._listener):
+            if thread:
+                thread.join(timeout)
+        self._thread = None
+        self._listener = None
+
+    # ---------------------- 🔹 Called by routes ----------------------
+    def notify(self, reminder):
+        """Queue a just-committed new or rescheduled reminder and wake the thread."""
+        self.notify_many([reminder])
+
+    def notify_many(self, reminders):
+        """
+        Hand just-committed reminders to this process's dispatcher, or, when it
+        isn't running here (REMINDER_WEB_DISPATCH=false), to the standalone
+        worker through a Postgres NOTIFY (one commit for the whole batch).
+        """
+        entries = [(_timestamp(r.remind_at), r.id) for r in reminders]
+        if not entries:
+            return
+        if self.running:
+            self._push(entries)
+        elif db.engine.dialect.name == "postgresql":
+            for ts, rid in entries:
+                db.session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                                   {"channel": NOTIFY_CHANNEL, "payload": f"{rid}:{ts}"})
+            db.session.commit()  # NOTIFY is delivered on commit
+            self._stats["published"] += len(entries)
+
+    def _push(self, entries):
+        with self._cond:
+            for entry in entries:
+                if self._horizon is None or entry[0] <= self._horizon:
+                    heapq.heappush(self._heap, entry)
+            if len(self._heap) > self.capacity:
+                # Keep the earliest `capacity`; the rest come back on a refill
+                self._heap = heapq.nsmallest(self.capacity, self._heap)
+                self._horizon = self._heap[-1][0]
+            self._woken = True
+            self._cond.notify()
+
+    # ---------------------- 🔹 Cross-process wakeups ----------------------
+    def _listen(self):
+        """LISTEN on NOTIFY_CHANNEL on a dedicated connection and push what arrives."""
+        while not self._stop:
+            conn = None
+            try:
+                with self.app.app_context():
+                    conn = db.engine.raw_connection()
+                conn.detach()  # never handed back to the pool
+                pg = conn.driver_connection
+                pg.autocommit = True
+                pg.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+                # Anything NOTIFYed while we weren't listening is only in the table
+                self._next_resync = 0.0
+                with self._cond:
+                    self._woken = True
+                    self._cond.notify()
+
+                while not self._stop:
+                    if not select.select([pg], [], [], 5.0)[0]:
+                        continue
+                    pg.poll()
+                    entries = []
+                    while pg.notifies:
+                        rid, ts = pg.notifies.pop(0).payload.split(":")
+                        entries.append((float(ts), int(rid)))
+                    if entries:
+                        self._stats["received"] += len(entries)
+                        self._push(entries)
+            except Exception as e:
+                print(f"❌ Reminder LISTEN failed, reconnecting: {e}")
+                time.sleep(5)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    # ---------------------- 🔹 Dispatcher thread ----------------------
+    def _lease_cutoff(self):
+        # claimed_at is written with datetime.utcnow() (naive UTC)
+        return datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+
+    def _refill(self):
+        """Reload the earliest unsent, unleased reminders (index range scan + LIMIT)."""
+        rows = (
+            db.session.query(Reminder.id, Reminder.remind_at)
+            .filter(UNSENT, or_(Reminder.claimed_at.is_(None), Reminder.claimed_at < self._lease_cutoff()))
+            .order_by(Reminder.remind_at, Reminder.id)
+            .limit(self.capacity)
+            .all()
+        )
+        heap = [(_timestamp(remind_at), rid) for rid, remind_at in rows]
+        heapq.heapify(heap)
+        with self._cond:
+            self._heap = heap
+            self._horizon = max(ts for ts, _ in heap) if len(heap) >= self.capacity else None
+        self._next_resync = time.monotonic() + self.resync_seconds
+        self._stats["refills"] += 1
+        self._watch_leases()
+
+    def _watch_leases(self):
+        """
+        Bring the next resync forward to the earliest live lease expiry, so
+        reminders whose send failed (or that another worker is sending) are
+        retried then instead of being spun on while they're unclaimable.
+        """
+        oldest = (
+            db.session.query(func.min(Reminder.claimed_at))
+            .filter(UNSENT, Reminder.claimed_at >= self._lease_cutoff())
+            .scalar()
+        )
+        if oldest is None:
+            return
+        expires_in = _timestamp(oldest) + self.lease_seconds - time.time()
+        self._next_resync = min(self._next_resync, time.monotonic() + max(expires_in, 0.0) + 1.0)
+
+    def _pop_due(self, now):
+        due = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+            exhausted = not self._heap and self._horizon is not None
+        return due, exhausted
+
+    def _deliver(self, ids, now):
+        # Other workers hold the same ids in their heaps; the claim hands each
+        # reminder to exactly one of them. Ids that aren't claimed or aren't
+        # sent are dropped from the heap, not re-pushed: they're still leased,
+        # and come back on the resync at their lease expiry
+        now_dt = datetime.fromtimestamp(now, timezone.utc)
+        due = claim_due_reminders(now_dt, len(ids), self.lease_seconds, ids=ids)
+        skipped = len(ids) - len(due)
+        self._stats["skipped"] += skipped  # rescheduled later, or another worker's
+
+        failed = 0
+        for r, ok in zip(due, deliver_reminders(self.app, due, now_dt)):
+            if ok:
+                self._stats["dispatched"] += 1
+                self._stats["last_lag_ms"] = round((time.time() - _timestamp(r.remind_at)) * 1000, 1)
+            else:
+                failed += 1
+        self._stats["failed"] += failed
+        db.session.commit()
+        if skipped or failed:
+            self._watch_leases()
+
+    def run_pending(self):
+        """Send everything due now; returns seconds until the next reminder (or None)."""
+        if time.monotonic() >= self._next_resync:
+            self._refill()
+
+        now = time.time()
+        due, exhausted = self._pop_due(now)
+        if due:
+            self._deliver(due, now)
+        if exhausted:
+            self._refill()  # heap drained but more rows exist past the horizon
+
+        with self._cond:
+            return self._heap[0][0] - time.time() if self._heap else None
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    wait = self.run_pending()
+            except Exception as e:
+                print(f"❌ Reminder dispatch failed: {e}")
+                self._next_resync = 0.0  # rebuild from the DB after errors
+                wait = 5.0
+
+            until_resync = max(self._next_resync - time.monotonic(), 0.0)
+            timeout = until_resync if wait is None else max(min(wait, until_resync), 0.0)
+            with self._cond:
+                if self._stop:
+                    return
+                if not self._woken:
+                    self._cond.wait(timeout)
+                if self._woken:
+                    self._stats["wakeups"] += 1
+                self._woken = False
+                if self._stop:
+                    return
+
+    def stats(self):
+        with self._cond:
+            next_due = self._heap[0][0] - time.time() if self._heap else None
+            queued = len(self._heap)
+        return {
+            **self._stats,
+            "running": self.running,
+            "queued": queued,
+            "capacity": self.capacity,
+            "next_due_in_s": round(next_due, 3) if next_due is not None else None,
+            "next_resync_in_s": round(max(self._next_resync - time.monotonic(), 0.0), 3),
+        }
+
+
+reminder_dispatcher = ReminderDispatcher()
@@ -0,0 +1,269 @@
+"""
+Pooled SMTP delivery.
+
+Flask-Mail's `mail.send` opens a new SMTP connection for every message. Here a
+fixed set of sender threads each keep one persistent connection (recycled
+after MAIL_MAX_EMAILS messages) and drain up to MAIL_BATCH_SIZE queued
+messages per wake-up over it, so a burst of reminders is sent MAIL_POOL_WORKERS
+at a time without a TCP + TLS + AUTH handshake per email.
+
+Transient failures (dropped connections, 4xx replies) go to a retry queue and
+are re-sent with exponential backoff; 5xx replies are permanent. A message's
+future resolves to SENT or FAILED only once that is final. `send_many` waits
+up to a deadline and then withdraws whatever hasn't gone out, so the caller
+can retry it later (reminders: when their lease expires) without the pool
+sending it a second time.
+"""
+import heapq
+import itertools
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import Future, wait
+
+from flask_mail import BadHeaderError, Connection
+
+SENT = "sent"
+FAILED = "failed"
+
+
+# Per-message rejections after which the SMTP session can carry on
+_CONNECTION_STILL_USABLE = (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)
+
+
+class _Job:
+    __slots__ = ("message", "attempts", "future", "sending", "withdrawn")
+
+    def __init__(self, message):
+        self.message = message
+        self.attempts = 0
+        self.future = Future()
+        self.sending = False    # on the wire right now (guarded by MailPool._lock)
+        self.withdrawn = False  # caller gave up; never send it
+
+
+def _is_permanent(error):
+    """5xx SMTP replies won't succeed on retry; everything else might."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return isinstance(error, (AssertionError, BadHeaderError))  # malformed message
+
+
+class MailPool:
+    """Sender threads with persistent SMTP connections and a backoff retry queue."""
+
+    def __init__(self):
+        self.app = None
+        self.workers = 4
+        self.batch_size = 20
+        self.idle_seconds = 30
+        self.max_attempts = 5
+        self.retry_base = 5.0
+        self.retry_max = 300.0
+        self.timeout = 60
+
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._retry = []            # (due monotonic time, seq, job)
+        self._retry_cond = threading.Condition()
+        self._seq = itertools.count()
+        self._threads = []
+        self._stop = False
+        self._stats = {"sent": 0, "failed": 0, "retried": 0, "withdrawn": 0, "batches": 0,
+                       "connections": 0, "last_batch_size": 0}
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = max(app.config.get("MAIL_POOL_WORKERS", 4), 1)
+        self.batch_size = app.config.get("MAIL_BATCH_SIZE", 20)
+        self.idle_seconds = app.config.get("MAIL_POOL_IDLE_SECONDS", 30)
+        self.max_attempts = app.config.get("MAIL_RETRY_ATTEMPTS", 5)
+        self.retry_base = app.config.get("MAIL_RETRY_BASE_SECONDS", 5.0)
+        self.retry_max = app.config.get("MAIL_RETRY_MAX_SECONDS", 300.0)
+        self.timeout = app.config.get("MAIL_SEND_TIMEOUT_SECONDS", 60)
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self):
+        """Spawn the sender and retry threads (lazily, so forking servers start them per worker)."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop = False
+            for i in range(self.workers):
+                t = threading.Thread(target=self._sender, name=f"mail-sender-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            t = threading.Thread(target=self._retrier, name="mail-retry", daemon=True)
+            t.start()
+            self._threads.append(t)
+            print(f"✅ Mail pool started ({self.workers} connection(s))")
+
+    def shutdown(self, timeout=5):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        with self._retry_cond:
+            self._stop = True
+            self._retry_cond.notify()
+        for _ in range(self.workers):
+            self._jobs.put(None)
+        for t in threads:
+            t.join(timeout)
+
+    # ---------------------- 🔹 Public API ----------------------
+    def _submit(self, message):
+        self.start()
+        job = _Job(message)
+        self._jobs.put(job)
+        return job
+
+    def submit(self, message) -> Future:
+        """Queue a flask_mail.Message; resolves to SENT or FAILED once retries are settled."""
+        return self._submit(message).future
+
+    def send_many(self, messages, timeout=None):
+        """
+        Send concurrently and wait up to `timeout` (MAIL_SEND_TIMEOUT_SECONDS)
+        in total. True per message that was sent. Messages still queued or
+        waiting for a retry at the deadline are withdrawn and reported False,
+        so the pool won't deliver them behind the caller's back.
+        """
+        jobs = [self._submit(m) for m in messages]
+        wait([job.future for job in jobs], timeout=timeout or self.timeout)
+        results = []
+        for job in jobs:
+            while not job.future.done() and not self._withdraw(job):
+                time.sleep(0.05)  # mid-send: wait for this attempt's outcome
+            results.append(job.future.done() and job.future.result() == SENT)
+        return results
+
+    def _withdraw(self, job):
+        """Take back a job that isn't on the wire; False if it's being sent right now."""
+        with self._lock:
+            if job.sending:
+                return False
+            if not job.withdrawn:
+                job.withdrawn = True
+                self._stats["withdrawn"] += 1
+            return True
+
+    # ---------------------- 🔹 Sender threads ----------------------
+    def _take_batch(self, first):
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self._jobs.put(None)  # leave the sentinel for after this batch
+                break
+            batch.append(job)
+        return batch
+
+    def _open(self):
+        conn = Connection(self.app.extensions["mail"]).__enter__()
+        with self._lock:
+            self._stats["connections"] += 1
+        return conn
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.__exit__(None, None, None)
+        except Exception:
+            pass  # already dropped by the server
+
+    def _sender(self):
+        with self.app.app_context():
+            conn = None
+            while True:
+                try:
+                    job = self._jobs.get(timeout=self.idle_seconds if conn else None)
+                except queue.Empty:
+                    self._close(conn)  # idle: don't hold a connection the server will drop
+                    conn = None
+                    continue
+                if job is None:
+                    break
+
+                batch = self._take_batch(job)
+                with self._lock:
+                    self._stats["batches"] += 1
+                    self._stats["last_batch_size"] = len(batch)
+                for job in batch:
+                    with self._lock:
+                        if job.withdrawn:
+                            continue
+                        job.sending = True
+                    try:
+                        conn = conn or self._open()
+                        try:
+                            conn.send(job.message)
+                        except smtplib.SMTPServerDisconnected:
+                            # Server dropped the idle connection: reconnect once
+                            self._close(conn)
+                            conn = None
+                            conn = self._open()
+                            conn.send(job.message)
+                        self._finish(job, SENT)
+                    except Exception as e:
+                        if conn is not None and not isinstance(e, _CONNECTION_STILL_USABLE):
+                            self._close(conn)
+                            conn = None
+                        self._failed(job, e)
+            if conn is not None:
+                self._close(conn)
+
+    def _finish(self, job, outcome):
+        with self._lock:
+            job.sending = False
+            self._stats["sent" if outcome == SENT else "failed"] += 1
+        job.future.set_result(outcome)
+
+    def _failed(self, job, error):
+        job.attempts += 1
+        to = ", ".join(job.message.send_to or [])
+        if _is_permanent(error) or job.attempts >= self.max_attempts:
+            print(f"❌ Email send failed to {to} after {job.attempts} attempt(s): {error}")
+            self._finish(job, FAILED)
+            return
+
+        delay = min(self.retry_base * 2 ** (job.attempts - 1), self.retry_max)
+        print(f"⚠️ Email to {to} failed ({error}); retrying in {delay:.0f}s")
+        with self._lock:
+            job.sending = False  # before it's queued again: now it can be withdrawn
+            self._stats["retried"] += 1
+        with self._retry_cond:
+            heapq.heappush(self._retry, (time.monotonic() + delay, next(self._seq), job))
+            self._retry_cond.notify()
+
+    # ---------------------- 🔹 Retry thread ----------------------
+    def _retrier(self):
+        with self._retry_cond:
+            while not self._stop:
+                now = time.monotonic()
+                while self._retry and self._retry[0][0] <= now:
+                    self._jobs.put(heapq.heappop(self._retry)[2])
+                timeout = self._retry[0][0] - now if self._retry else None
+                self._retry_cond.wait(timeout)
+
+    def stats(self):
+        with self._retry_cond:
+            retry_depth = len(self._retry)
+        with self._lock:
+            return {
+                **self._stats,
+                "running": self.running,
+                "workers": self.workers,
+                "queue_depth": self._jobs.qsize(),
+                "retry_depth": retry_depth,
+            }
+
+
+mail_pool = MailPool()
@@ -0,0 +1,78 @@
+"""
+Reminder email rendering.
+
+The plain-text and HTML bodies are Jinja templates under
+templates/email/, compiled once per process and reused for every
+reminder (the HTML one autoescapes task titles). `render_reminders` is a
+lazy stage: the mail pool starts sending the first messages of a batch
+while later ones are still being rendered.
+"""
+import os
+from datetime import timedelta, timezone
+from functools import lru_cache
+from urllib.parse import quote_plus
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "email")
+GCAL_URL = "https://www.google.com/calendar/render?action=TEMPLATE"
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    auto_reload=False,  # compiled once; templates don't change while running
+)
+
+
+@lru_cache(maxsize=None)
+def get_template(name):
+    """Compiled template, cached for the life of the process."""
+    return _env.get_template(name)
+
+
+def _format_gcal_datetime(dt):
+    """Convert timezone-aware datetime to Google Calendar UTC format."""
+    dt_utc = dt.astimezone(timezone.utc)
+    return dt_utc.strftime("%Y%m%dT%H%M%SZ")
+
+
+def build_calendar_link(task):
+    """Generate 'Add to Google Calendar' link for the given task."""
+    if not task.due_at:
+        return None
+
+    start = task.due_at
+    end = task.due_at + timedelta(minutes=30)  # assume 30-minute event
+
+    # Same encoding as urlencode(), without rebuilding the constant prefix
+    dates = f"{_format_gcal_datetime(start)}/{_format_gcal_datetime(end)}"
+    details = f"Task: {task.title or ''}\n\n{task.text or ''}"
+    return (
+        f"{GCAL_URL}&text={quote_plus(task.title or 'Task Reminder')}"
+        f"&dates={quote_plus(dates)}&details={quote_plus(details)}"
+    )
+
+
+def render_reminder(task, user):
+    """Build the (to, subject, body, html) email for one reminder."""
+    gcal_link = build_calendar_link(task)
+    context = {"task": task, "user": user, "gcal_link": gcal_link}
+    body = get_template("reminder.txt").render(context)
+    html = get_template("reminder.html").render(context) if gcal_link else None
+    return user.email, f"[VoiceNudge] Reminder: {task.title or task.text}", body, html
+
+
+def render_digest(user, tasks):
+    """Build one (to, subject, body, html) email covering several of a user's reminders."""
+    items = [{"task": task, "gcal_link": build_calendar_link(task)} for task in tasks]
+    context = {"user": user, "items": items}
+    body = get_template("digest.txt").render(context)
+    html = get_template("digest.html").render(context)
+    return user.email, f"[VoiceNudge] {len(tasks)} reminders coming up", body, html
+
+
+def render_reminders(pairs):
+    """Lazily render (task, user) pairs; consumed message by message by the mail pool."""
+    for task, user in pairs:
+        yield render_reminder(task, user)
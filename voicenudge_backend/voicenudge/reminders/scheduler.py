@@ -1,162 +1,271 @@
-import logging
+import os
+import socket
 from datetime import datetime, timezone, timedelta
-from urllib.parse import urlencode
 
-from flask_apscheduler import APScheduler
 from flask_mail import Message
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import joinedload
 
-from voicenudge.extensions import db, mail
-from voicenudge.models import Reminder, Task, TaskHistory, User
+from voicenudge.extensions import db
+from voicenudge.history.archive import history_row, record_history
+from voicenudge.models import Reminder
+from voicenudge.reminders.mailer import mail_pool
+from voicenudge.reminders.render import render_digest, render_reminder
 
-# Silence chatty APScheduler INFO messages in dev
-logging.getLogger("apscheduler").setLevel(logging.WARNING)
+# Matches the predicate of ix_reminders_unsent_remind_at so the planner can use it
+UNSENT = Reminder.sent == db.false()
 
-scheduler = APScheduler()
 
+def _message(app, to, subject, body, html=None):
+    sender = app.config.get("MAIL_DEFAULT_SENDER")  # use your .env default
+    msg = Message(subject=subject, sender=sender, recipients=[to], body=body)
+    if html:
+        msg.html = html
+    return msg
+
+
+def send_emails(app, emails):
+    """
+    Send (to, subject, body, html) tuples concurrently through the SMTP pool.
+    `emails` may be a lazy iterable: each one is queued as soon as it's
+    produced, so rendering overlaps sending. Returns one bool per email:
+    True only if it was sent. Emails still failing at the deadline are
+    withdrawn from the pool and reported False.
+    """
+    recipients = []
+
+    def messages():
+        for to, subject, body, html in emails:
+            recipients.append((to, subject))
+            yield _message(app, to, subject, body, html)
 
-def send_email(app, to, subject, body, html=None):
-    """Send email via Flask-Mail, with robust logging."""
     try:
-        sender = app.config.get("MAIL_DEFAULT_SENDER")  # use your .env default
-        msg = Message(subject=subject, sender=sender, recipients=[to], body=body)
-        if html:
-            msg.html = html
-        mail.send(msg)
-        print(f"✅ Sent email to {to} • subject='{subject}'")
-        return True
+        results = mail_pool.send_many(messages())
     except Exception as e:
-        print(f"❌ Email send failed to {to}: {e}")
-        return False
+        print(f"❌ Email send failed for {len(recipients)} message(s): {e}")
+        return [False] * len(recipients)
+    for (to, subject), ok in zip(recipients, results):
+        if ok:
+            print(f"✅ Sent email to {to} • subject='{subject}'")
+    return results
 
 
-def _format_gcal_datetime(dt):
-    """Convert timezone-aware datetime to Google Calendar UTC format."""
-    dt_utc = dt.astimezone(timezone.utc)
-    return dt_utc.strftime("%Y%m%dT%H%M%SZ")
+def send_email(app, to, subject, body, html=None):
+    """Send one email through the SMTP pool, with robust logging."""
+    return send_emails(app, [(to, subject, body, html)])[0]
 
 
-def build_calendar_link(task):
-    """Generate 'Add to Google Calendar' link for the given task."""
-    if not task.due_at:
-        return None
+def _digest_groups(app, reminders, now):
+    """
+    Group reminders by user, pulling in each user's other reminders due
+    within REMINDER_DIGEST_WINDOW_SECONDS so they go out in the same email.
+    The extra rows are leased like any claim, so no other worker sends them;
+    the lease is committed with their `sent` flags by the caller (no commit
+    here, so the already loaded batch isn't expired and reloaded row by row).
+    """
+    window = app.config.get("REMINDER_DIGEST_WINDOW_SECONDS", 900)
+    max_items = app.config.get("REMINDER_DIGEST_MAX_ITEMS", 50)
 
-    start = task.due_at
-    end = task.due_at + timedelta(minutes=30)  # assume 30-minute event
+    by_user = {}
+    for r in reminders:
+        by_user.setdefault(r.user_id, []).append(r)
 
-    params = {
-        "action": "TEMPLATE",
-        "text": task.title or "Task Reminder",
-        "dates": f"{_format_gcal_datetime(start)}/{_format_gcal_datetime(end)}",
-        "details": f"Task: {task.title or ''}\n\n{task.text or ''}",
-    }
+    open_users = [uid for uid, group in by_user.items() if len(group) < max_items]
+    if window > 0 and open_users:
+        upcoming = claim_due_reminders(
+            now + timedelta(seconds=window),
+            limit=len(open_users) * max_items,
+            lease_seconds=app.config.get("REMINDER_LEASE_SECONDS", 300),
+            user_ids=open_users,
+            per_user=max_items,  # one user's backlog can't crowd out the others
+            commit=False,
+        )
+        dropped = []
+        for r in upcoming:
+            group = by_user[r.user_id]
+            if len(group) < max_items:
+                group.append(r)
+            else:
+                dropped.append(r.id)
+        release_reminders(dropped)  # claimed but not in this email: free them now
 
-    return "https://www.google.com/calendar/render?" + urlencode(params)
+    return list(by_user.values())
 
 
-def check_reminders(app):
-    """Check for due reminders and send emails."""
-    with app.app_context():
-        # Use timezone-aware UTC for consistency
-        now = datetime.now(timezone.utc)
-        print(f"⏰ Checking reminders at {now.isoformat()}")
-
-        due_reminders = Reminder.query.filter(
-            Reminder.remind_at <= now,
-            Reminder.sent.is_(False),
-        ).all()
+def _render_group(group):
+    if len(group) == 1:
+        return render_reminder(group[0].task, group[0].user)
+    return render_digest(group[0].user, [r.task for r in group])
 
-        print(f"📋 Found {len(due_reminders)} due reminder(s)")
 
-        for r in due_reminders:
-            task = Task.query.get(r.task_id)
-            user = User.query.get(r.user_id)
+def deliver_reminders(app, reminders, now=None):
+    """
+    Email a batch of reminders concurrently and mark the handled ones sent
+    (caller commits). With REMINDER_DIGEST_ENABLED, each user gets one email
+    covering all their reminders in the batch and window, and every row in
+    it is marked sent in the same commit. Returns one bool per reminder in
+    `reminders`: True if handled.
+    """
+    if app.config.get("REMINDER_DIGEST_ENABLED", False):
+        groups = _digest_groups(app, reminders, now or datetime.now(timezone.utc))
+    else:
+        groups = [[r] for r in reminders]
 
-            if not task or not user or not user.email:
+    handled = {}
+    outgoing = []
+    for group in groups:
+        valid = []
+        for r in group:
+            if not r.task or not r.user or not r.user.email:
                 # Mark as sent to avoid reprocessing broken rows
                 r.sent = True
-                continue
-
-            subject = f"[VoiceNudge] Reminder: {task.title or task.text}"
-
-            gcal_link = build_calendar_link(task)
-
-            # Plain-text fallback body
-            body_lines = [
-                f"Hi {user.name or ''},",
-                "",
-                "This is your reminder for:",
-                f"- {task.title or task.text}",
-                f"Due at (UTC): {task.due_at}",
-            ]
-            if gcal_link:
-                body_lines += [
-                    "",
-                    "Add to your Google Calendar:",
-                    gcal_link,
-                ]
-            body_lines.append("")
-            body_lines.append("— VoiceNudge")
-            body = "\n".join(body_lines)
-
-            # Simple HTML version with a button-like link
-            html = None
-            if gcal_link:
-                html = f"""
-                <p>Hi {user.name or ''},</p>
-                <p>This is your reminder for:</p>
-                <ul>
-                    <li><strong>Task:</strong> {task.title or task.text}</li>
-                    <li><strong>Due (UTC):</strong> {task.due_at}</li>
-                </ul>
-                <p>You can add this to your Google Calendar:</p>
-                <p>
-                    <a href="{gcal_link}"
-                       style="display:inline-block;padding:10px 18px;
-                              background-color:#4285F4;color:#ffffff;
-                              text-decoration:none;border-radius:4px;">
-                        Add to Google Calendar
-                    </a>
-                </p>
-                <p>— VoiceNudge</p>
-                """
-
-            ok = send_email(app, user.email, subject, body, html=html)
-            if ok:
-                r.sent = True
-                # Optional history audit
-                try:
-                    db.session.add(
-                        TaskHistory(
-                            user_id=user.id,
-                            task_id=task.id,
-                            text=getattr(task, "text", None),
-                            title=getattr(task, "title", None),
-                            due_at=getattr(task, "due_at", None),
-                            category=getattr(task, "category", None),
-                            priority=getattr(task, "priority", None),
-                        )
-                    )
-                except Exception as hist_err:
-                    print(f"⚠️ Could not write TaskHistory: {hist_err}")
+                handled[r.id] = True
+            else:
+                valid.append(r)
+        if valid:
+            outgoing.append(valid)
+
+    results = send_emails(app, (_render_group(group) for group in outgoing))
+    history = []
+    for group, ok in zip(outgoing, results):
+        for r in group:
+            handled[r.id] = ok
+            if not ok:
+                continue  # not sent (yet): keeps its lease; retried once that expires
+            r.sent = True
+            history.append(history_row(r.task, r.user.id))
+
+    # History audit for the whole batch in one INSERT; a savepoint keeps a
+    # failure here from rolling back the sent flags
+    try:
+        with db.session.begin_nested():
+            record_history(history)
+    except Exception as hist_err:
+        print(f"⚠️ Could not write TaskHistory: {hist_err}")
+    return [handled.get(r.id, False) for r in reminders]
+
+
+def worker_id():
+    """Identifies this process in reminders.claimed_by (read per call: safe across fork)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
 
+def claim_due_reminders(now, limit, lease_seconds=300, ids=None, user_ids=None,
+                        per_user=None, commit=True):
+    """
+    Lease up to `limit` unsent reminders due by `now` to this worker and
+    return them with their task and user joined in.
+
+    One UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING
+    claims the rows, so concurrent workers (gunicorn processes, containers)
+    take disjoint batches without blocking on each other. Rows whose lease is
+    older than `lease_seconds` (a worker died mid-send) can be claimed again.
+    `per_user` caps the rows taken for any one user. The claim is committed
+    before sending (with `commit=False` it rides in the caller's transaction
+    instead); the caller commits `sent`.
+    """
+    claimed_at = datetime.utcnow()
+    conditions = [
+        UNSENT,
+        Reminder.remind_at <= now,
+        or_(
+            Reminder.claimed_at.is_(None),
+            Reminder.claimed_at < claimed_at - timedelta(seconds=lease_seconds),
+        ),
+    ]
+    if ids is not None:
+        conditions.append(Reminder.id.in_(ids))
+    if user_ids is not None:
+        conditions.append(Reminder.user_id.in_(user_ids))
+    claimable = select(Reminder.id).where(*conditions)
+    if per_user is not None:
+        # Ranked in a subquery: Postgres rejects FOR UPDATE alongside window functions
+        ranked = select(
+            Reminder.id,
+            func.row_number().over(
+                partition_by=Reminder.user_id, order_by=(Reminder.remind_at, Reminder.id)
+            ).label("rank"),
+        ).where(*conditions).subquery()
+        claimable = claimable.where(Reminder.id.in_(select(ranked.c.id).where(ranked.c.rank <= per_user)))
+    claimable = (
+        claimable.order_by(Reminder.remind_at, Reminder.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+    claimed = db.session.execute(
+        update(Reminder)
+        .where(Reminder.id.in_(claimable))
+        .values(claimed_by=worker_id(), claimed_at=claimed_at)
+        .returning(Reminder.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    if commit:
         db.session.commit()
+    if not claimed:
+        return []
+
+    return (
+        Reminder.query
+        .options(joinedload(Reminder.task), joinedload(Reminder.user))
+        .filter(Reminder.id.in_(claimed))
+        .order_by(Reminder.remind_at, Reminder.id)
+        .all()
+    )
+
+
+def release_reminders(ids):
+    """Give back leases this worker took but won't send (caller commits)."""
+    if not ids:
+        return
+    db.session.execute(
+        update(Reminder)
+        .where(Reminder.id.in_(ids), Reminder.claimed_by == worker_id())
+        .values(claimed_by=None, claimed_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def iter_due_reminders(now, chunk_size=500, lease_seconds=300):
+    """
+    Claim and yield unsent reminders due by `now` in lists of at most
+    `chunk_size` until none are left for this worker, so a large backlog is
+    walked in bounded memory. Commit between chunks. Reminders whose send
+    failed keep their lease, so they're retried once it expires.
+    """
+    while True:
+        chunk = claim_due_reminders(now, chunk_size, lease_seconds)
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+
+
+def check_reminders(app):
+    """One-shot scan: send every due reminder (the dispatcher handles this continuously)."""
+    with app.app_context():
+        # Use timezone-aware UTC for consistency
+        now = datetime.now(timezone.utc)
+        print(f"⏰ Checking reminders at {now.isoformat()}")
+
+        total = 0
+        chunk_size = app.config.get("REMINDER_FETCH_CHUNK", 500)
+        lease_seconds = app.config.get("REMINDER_LEASE_SECONDS", 300)
+        for chunk in iter_due_reminders(now, chunk_size, lease_seconds):
+            deliver_reminders(app, chunk, now)
+            db.session.commit()  # expires the chunk; the weak identity map lets it go
+            total += len(chunk)
+
+        print(f"📋 Processed {total} due reminder(s)")
 
 
 def init_scheduler(app):
-    """Initialize and start APScheduler with a resilient interval job."""
-    if not scheduler.running:
-        scheduler.init_app(app)
-        scheduler.add_job(
-            id="reminder_job",
-            func=lambda: check_reminders(app),
-            trigger="interval",
-            minutes=1,
-            # ✔ prevent small delays from skipping the run
-            misfire_grace_time=60,
-            # ✔ if multiple runs pile up, merge them into one run
-            coalesce=True,
-            # ✔ ensure only one instance runs at a time
-            max_instances=1,
-        )
-        scheduler.start()
-        print("✅ Reminder scheduler started")
+    """Start the reminder dispatcher for this process (no-op if disabled)."""
+    from voicenudge.reminders.dispatcher import reminder_dispatcher
+
+    if not app.config.get("REMINDER_DISPATCH_ENABLED", True):
+        print("ℹ️ Reminder dispatcher disabled (REMINDER_DISPATCH_ENABLED=false)")
+        return
+    reminder_dispatcher.init_app(app)
+    reminder_dispatcher.start(app)
@@ -0,0 +1,57 @@
+"""
+Standalone reminder worker: `python -m voicenudge.reminders.worker`.
+
+Runs the reminder dispatcher and SMTP pool in their own process, on a
+minimal Flask app with only the database and mail configured. Nothing here
+imports the speech/ML stack (Whisper, spaCy, SpeechBrain), so the process
+stays small and can be scaled independently of the web workers; several
+copies can run side by side since due reminders are leased with SKIP
+LOCKED. Set REMINDER_WEB_DISPATCH=false so web workers leave reminders to it.
+
+Web processes announce new and rescheduled reminders with a Postgres
+NOTIFY that the worker LISTENs for, so they're picked up within a second.
+On a database without LISTEN/NOTIFY the worker resyncs every
+REMINDER_WORKER_RESYNC_SECONDS instead, which is the worst-case delay.
+"""
+import signal
+import threading
+
+from dotenv import load_dotenv
+from flask import Flask
+
+from voicenudge.extensions import db, mail
+
+
+def create_worker_app():
+    """Flask app with just the config, SQLAlchemy and mail (no blueprints)."""
+    from voicenudge.reminders.mailer import mail_pool
+
+    app = Flask(__name__)
+    app.config.from_object("voicenudge.config.Config")
+    db.init_app(app)
+    mail.init_app(app)
+    mail_pool.init_app(app)
+    return app
+
+
+def main():
+    load_dotenv()  # before the config class reads the environment
+    from voicenudge.reminders.dispatcher import reminder_dispatcher
+    from voicenudge.reminders.mailer import mail_pool
+
+    app = create_worker_app()
+    reminder_dispatcher.init_app(app)
+    reminder_dispatcher.start(app, listen=True)
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    stop.wait()
+
+    print("👋 Reminder worker shutting down")
+    reminder_dispatcher.stop()
+    mail_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
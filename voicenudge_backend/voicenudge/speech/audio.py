@@ -0,0 +1,125 @@
+"""
+In-process audio decoding shared by voice auth and speech-to-text.
+
+Uploads are decoded straight from memory into the one format every model
+here consumes — 16 kHz mono float32 in [-1, 1] — with no temp files and no
+ffmpeg subprocesses. PCM WAV (the web recorder and samples/) is parsed with
+the stdlib `wave` module; anything else (webm/ogg/mp3/m4a from mobile
+recorders, float WAV) goes through PyAV, which runs the ffmpeg libraries
+in-process.
+"""
+import io
+import os
+import wave
+from math import gcd
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class AudioDecodeError(ValueError):
+    """The input isn't audio we can decode."""
+
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    return source.read()  # file-like, e.g. request.files[...].stream
+
+
+def _pcm_to_float(frames, width):
+    if width == 1:  # unsigned 8-bit
+        return (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if width == 2:
+        return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if width == 3:  # packed 24-bit → sign-extended int32
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = (raw[:, 0] << 8 | raw[:, 1] << 16 | raw[:, 2] << 24) >> 8
+        return ints.astype(np.float32) / 8388608.0
+    if width == 4:
+        return np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    raise AudioDecodeError(f"Unsupported WAV sample width: {width} bytes")
+
+
+def _decode_wav(data):
+    with wave.open(io.BytesIO(data), "rb") as w:
+        channels = w.getnchannels()
+        width = w.getsampwidth()
+        rate = w.getframerate()
+        frames = w.readframes(w.getnframes())
+    samples = _pcm_to_float(frames, width)
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels]
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return resample(samples, rate)
+
+
+def _decode_av(data):
+    try:
+        import av
+    except ImportError:
+        raise AudioDecodeError("Decoding non-WAV audio requires PyAV (pip install av)")
+
+    # PyAV resamples + downmixes while decoding, so no second pass is needed
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+    chunks = []
+    try:
+        with av.open(io.BytesIO(data)) as container:
+            if not container.streams.audio:
+                raise AudioDecodeError("No audio stream found")
+            for frame in container.decode(container.streams.audio[0]):
+                chunks.extend(f.to_ndarray().reshape(-1) for f in resampler.resample(frame))
+            chunks.extend(f.to_ndarray().reshape(-1) for f in resampler.resample(None))
+    except av.error.FFmpegError as e:
+        raise AudioDecodeError(f"Could not decode audio: {e}")
+
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(chunks).astype(np.float32, copy=False)
+
+
+def resample(audio, orig_sr, target_sr=SAMPLE_RATE):
+    """Polyphase resampling (scipy) — cheap for the usual 48k/44.1k → 16k."""
+    if orig_sr == target_sr:
+        return audio.astype(np.float32, copy=False)
+    from scipy.signal import resample_poly
+
+    g = gcd(int(orig_sr), int(target_sr))
+    return resample_poly(audio, target_sr // g, orig_sr // g).astype(np.float32)
+
+
+def decode_audio(source):
+    """
+    Decode bytes, a file-like object or a path into 16 kHz mono float32.
+    Raises AudioDecodeError if the data isn't decodable audio.
+    """
+    data = _read_bytes(source)
+    if not data:
+        raise AudioDecodeError("Empty audio upload")
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            return _decode_wav(data)
+        except (wave.Error, EOFError):
+            pass  # e.g. IEEE-float or compressed WAV → let ffmpeg handle it
+    return _decode_av(data)
+
+
+def encode_wav(audio):
+    """16 kHz mono float32 → 16-bit PCM WAV bytes (e.g. to keep an enrollment sample)."""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def duration_seconds(audio):
+    return audio.shape[-1] / SAMPLE_RATE
@@ -0,0 +1,78 @@
+"""
+Speech-to-text backend registry.
+
+Every engine implements `STTBackend` and registers itself under a name.
+The active one is chosen with `WHISPER_BACKEND`; engine modules are only
+imported when selected, so optional dependencies stay optional.
+"""
+import importlib
+import os
+import threading
+
+from voicenudge.speech.audio import decode_audio
+
+DEFAULT_BACKEND = "openai-whisper"
+
+# name → module that registers it (imported on first use)
+BACKEND_MODULES = {
+    "openai-whisper": "voicenudge.speech.whisper_stt",
+    "faster-whisper": "voicenudge.speech.faster_whisper_stt",
+    "google": "voicenudge.speech.google_stt",
+}
+
+_registry = {}
+_instances = {}
+_lock = threading.Lock()
+
+
+class STTBackend:
+    """Common interface for speech-to-text engines."""
+
+    name = None
+
+    def load(self):
+        """Load model weights now instead of on first use."""
+
+    def load_audio(self, path):
+        """Decode a file into 16 kHz mono float32, which every `transcribe*` accepts."""
+        return decode_audio(path)
+
+    def transcribe(self, audio, translate: bool = True) -> str:
+        raise NotImplementedError
+
+    def transcribe_dual(self, audio):
+        """Return (native_text, english_text)."""
+        native = self.transcribe(audio, translate=False)
+        return native, self.transcribe(audio, translate=True)
+
+    def transcribe_dual_batch(self, audios):
+        """Engines without batched decoding just loop."""
+        return [self.transcribe_dual(audio) for audio in audios]
+
+
+def register_backend(name):
+    """Class decorator: make an STTBackend selectable via WHISPER_BACKEND=name."""
+    def decorator(cls):
+        cls.name = name
+        _registry[name] = cls
+        return cls
+    return decorator
+
+
+def available_backends():
+    return sorted(set(BACKEND_MODULES) | set(_registry))
+
+
+def get_backend(name=None) -> STTBackend:
+    """Return the shared instance of the named (or configured) backend."""
+    name = name or os.getenv("WHISPER_BACKEND", DEFAULT_BACKEND)
+    with _lock:
+        if name not in _instances:
+            if name not in _registry and name in BACKEND_MODULES:
+                importlib.import_module(BACKEND_MODULES[name])
+            if name not in _registry:
+                raise ValueError(
+                    f"Unknown STT backend '{name}' (available: {', '.join(available_backends())})"
+                )
+            _instances[name] = _registry[name]()
+        return _instances[name]
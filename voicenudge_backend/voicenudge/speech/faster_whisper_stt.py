@@ -0,0 +1,45 @@
+import os
+
+from voicenudge.model_loader import lazy_model
+from voicenudge.speech.backends import STTBackend, register_backend
+
+
+@register_backend("faster-whisper")
+class FasterWhisperBackend(STTBackend):
+    """
+    CTranslate2 Whisper (faster-whisper), int8-quantized on CPU by default.
+    Install with `pip install faster-whisper`; select with WHISPER_BACKEND=faster-whisper.
+    """
+
+    def __init__(self):
+        self.model_size = os.getenv("WHISPER_MODEL", "small")
+        self.device = os.getenv("WHISPER_DEVICE", "cpu")
+        self.compute_type = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+        self._model = lazy_model(
+            f"faster-whisper-{self.model_size}-{self.compute_type}", self._load_model
+        )
+
+    def _load_model(self):
+        from faster_whisper import WhisperModel
+
+        return WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
+
+    def load(self):
+        return self._model.get()
+
+    def _run(self, audio, task, language=None):
+        segments, info = self.load().transcribe(
+            audio, task=task, language=language, beam_size=5
+        )
+        # segments is a lazy generator: decoding happens while joining
+        return "".join(segment.text for segment in segments).strip(), info.language
+
+    def transcribe(self, audio, translate: bool = True) -> str:
+        return self._run(audio, "translate" if translate else "transcribe")[0]
+
+    def transcribe_dual(self, audio):
+        """Translate pass reuses the detected language and is skipped for English."""
+        native, language = self._run(audio, "transcribe")
+        if language == "en":
+            return native, native
+        return native, self._run(audio, "translate", language=language)[0]
@@ -1,13 +1,46 @@
 import io
+import os
+import threading
+
+import numpy as np
 from google.cloud import speech
 
-client = speech.SpeechClient()
+from voicenudge.speech.backends import STTBackend, register_backend
+
+_client = None
+_translate_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client():
+    # Created on first use: SpeechClient() needs credentials, imports shouldn't
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = speech.SpeechClient()
+    return _client
+
+
+def _get_translate_client():
+    global _translate_client
+    with _client_lock:
+        if _translate_client is None:
+            from google.cloud import translate_v2
+
+            _translate_client = translate_v2.Client()
+    return _translate_client
+
 
-def transcribe_audio_google(audio_file_path: str, language_code="en-US") -> str:
-    with io.open(audio_file_path, "rb") as f:
-        content = f.read()
+def _to_linear16(audio) -> bytes:
+    """File path → raw bytes; 16 kHz float32 array → 16-bit PCM."""
+    if isinstance(audio, str):
+        with io.open(audio, "rb") as f:
+            return f.read()
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
 
-    audio = speech.RecognitionAudio(content=content)
+
+def transcribe_audio_google(audio_file_path, language_code="en-US") -> str:
+    audio = speech.RecognitionAudio(content=_to_linear16(audio_file_path))
     config = speech.RecognitionConfig(
         encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
         sample_rate_hertz=16000,
@@ -15,7 +48,33 @@ def transcribe_audio_google(audio_file_path: str, language_code="en-US") -> str:
         enable_automatic_punctuation=True,
     )
 
-    response = client.recognize(config=config, audio=audio)
+    response = _get_client().recognize(config=config, audio=audio)
 
     results = [r.alternatives[0].transcript for r in response.results]
     return " ".join(results)
+
+
+@register_backend("google")
+class GoogleSTTBackend(STTBackend):
+    """
+    Google Cloud Speech-to-Text in SPEECH_LANGUAGE_CODE. Speech-to-Text
+    can't translate, so non-English transcripts go through Cloud Translate.
+    """
+
+    def __init__(self):
+        self.language_code = os.getenv("SPEECH_LANGUAGE_CODE", "en-US")
+
+    def transcribe(self, audio, translate: bool = True) -> str:
+        text = transcribe_audio_google(audio, language_code=self.language_code)
+        return self._to_english(text) if translate else text
+
+    def transcribe_dual(self, audio):
+        native = transcribe_audio_google(audio, language_code=self.language_code)
+        return native, self._to_english(native)
+
+    def _to_english(self, text):
+        if not text or self.language_code.lower().startswith("en"):
+            return text
+        # format_="text": the default ("html") would HTML-escape the result (&#39; etc.)
+        result = _get_translate_client().translate(text, target_language="en", format_="text")
+        return result["translatedText"]
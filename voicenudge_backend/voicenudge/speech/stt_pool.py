@@ -0,0 +1,296 @@
+"""
+Dedicated Whisper worker pool.
+
+The STT model (see speech/backends.py) lives in a fixed set of worker processes that pull jobs
+from a bounded queue, so voice uploads no longer run inference inside the
+request thread. Short utterances that arrive within a few milliseconds of
+each other are decoded together as one padded batch.
+
+Each web worker process starts its own pool, so batches only form across
+requests served concurrently by one process: run gunicorn with threaded
+workers (gunicorn.conf.py: gthread, GUNICORN_THREADS) and few processes.
+Under sync workers every pool sees one request at a time, and the host
+loads WEB_CONCURRENCY × STT_POOL_WORKERS copies of the model.
+"""
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Whisper decodes 30s windows; only clips that fit one window can be batched
+BATCHABLE_SAMPLES = 16000 * 30
+
+
+class STTQueueFull(RuntimeError):
+    """Raised when the pool's job queue is at capacity."""
+
+
+def _is_batchable(audio):
+    return not isinstance(audio, str) and audio.shape[-1] <= BATCHABLE_SAMPLES
+
+
+def _collect_batch(jobs, first, max_batch, window):
+    """
+    Gather jobs that arrive within `window` seconds of `first` into one batch.
+    Returns (batch, leftover, stop): `leftover` is a job that can't join the
+    batch (long clip), `stop` is True if the shutdown sentinel was seen.
+    """
+    batch = [first]
+    if not _is_batchable(first[1]):
+        return batch, None, False
+
+    deadline = time.monotonic() + window
+    while len(batch) < max_batch:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            job = jobs.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if job is None:
+            return batch, None, True
+        if not _is_batchable(job[1]):
+            return batch, job, False
+        batch.append(job)
+    return batch, None, False
+
+
+def _run_batch(batch, results, backend):
+    """Decode audio, run inference and report per-stage timings for the batch."""
+    # Tell the parent which jobs this process holds, so they can be failed if it dies
+    results.put(("started", os.getpid(), [job_id for job_id, _, _ in batch]))
+    started = time.time()
+    load_ms = infer_ms = 0.0
+    try:
+        t0 = time.perf_counter()
+        audios = [backend.load_audio(a) if isinstance(a, str) else a for _, a, _ in batch]
+        load_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        if len(audios) == 1:
+            outputs = [backend.transcribe_dual(audios[0])]
+        else:
+            outputs = backend.transcribe_dual_batch(audios)
+        infer_ms = (time.perf_counter() - t0) * 1000
+        error = None
+    except Exception as e:
+        outputs, error = [None] * len(batch), str(e)
+
+    jobs = [(job_id, output) for (job_id, _, _), output in zip(batch, outputs)]
+    timings = {
+        "queue_wait_ms": sum(started - enqueued_at for _, _, enqueued_at in batch) * 1000 / len(batch),
+        "load_audio_ms": load_ms,
+        "inference_ms": infer_ms,
+    }
+    results.put(("done", os.getpid(), jobs, error, timings))
+
+
+def _worker_main(jobs, results, max_batch, window, backend_name):
+    """Worker process loop: owns one STT model, serves batches until stopped."""
+    from voicenudge.speech.backends import get_backend
+
+    backend = get_backend(backend_name)
+    backend.load()
+
+    stop = False
+    pending = None
+    while not stop:
+        job = pending if pending is not None else jobs.get()
+        pending = None
+        if job is None:
+            break
+        batch, pending, stop = _collect_batch(jobs, job, max_batch, window)
+        _run_batch(batch, results, backend)
+    if pending is not None:
+        _run_batch([pending], results, backend)
+
+
+class STTPool:
+    """Bounded job queue in front of a fixed set of Whisper worker processes."""
+
+    def __init__(self):
+        self.workers = 0
+        self.backend = None
+        self.queue_size = 32
+        self.max_batch = 8
+        self.batch_window = 0.01
+        self.timeout = 60
+        self.liveness_interval = 1.0
+
+        self._lock = threading.Lock()        # process lifecycle
+        self._state_lock = threading.Lock()  # _futures / _stats: request threads + collector
+        self._ids = itertools.count()
+        self._futures = {}
+        self._procs = []
+        self._stopping = False
+        self._jobs = None
+        self._results = None
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0, "batches": 0, "last_batch_size": 0,
+                       "orphaned": 0, "worker_restarts": 0}
+        self._stage_totals = {"queue_wait_ms": 0.0, "load_audio_ms": 0.0, "inference_ms": 0.0}
+
+    def init_app(self, app):
+        self.workers = app.config.get("STT_POOL_WORKERS", 0)
+        self.backend = app.config.get("WHISPER_BACKEND")
+        self.queue_size = app.config.get("STT_QUEUE_SIZE", 32)
+        self.max_batch = app.config.get("STT_MAX_BATCH", 8)
+        self.batch_window = app.config.get("STT_BATCH_WINDOW_MS", 10) / 1000
+        self.timeout = app.config.get("STT_TIMEOUT_SECONDS", 60)
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def _spawn(self, name):
+        p = mp.get_context("spawn").Process(
+            target=_worker_main,
+            args=(self._jobs, self._results, self.max_batch, self.batch_window, self.backend),
+            name=name,
+            daemon=True,
+        )
+        p.start()
+        return p
+
+    def start(self):
+        """Spawn worker processes (called lazily so forking servers spawn per worker)."""
+        with self._lock:
+            if self._procs:
+                return
+            ctx = mp.get_context("spawn")
+            self._stopping = False
+            self._jobs = ctx.Queue(maxsize=self.queue_size)
+            self._results = ctx.Queue()
+            self._procs = [self._spawn(f"stt-worker-{i}") for i in range(self.workers)]
+            threading.Thread(target=self._collect, name="stt-results", daemon=True).start()
+            print(f"✅ STT pool started ({self.workers} worker(s))")
+
+    def shutdown(self):
+        with self._lock:
+            self._stopping = True
+            for _ in self._procs:
+                self._jobs.put(None)
+            for p in self._procs:
+                p.join(timeout=5)
+            self._procs = []
+
+    def submit(self, audio) -> Future:
+        """Queue a file path or 16 kHz float32 array; resolves to (native, english)."""
+        self.start()
+        job_id = next(self._ids)
+        future = Future()
+        with self._state_lock:
+            self._futures[job_id] = future
+        try:
+            self._jobs.put((job_id, audio, time.time()), block=False)
+        except queue.Full:
+            with self._state_lock:
+                self._futures.pop(job_id, None)
+                self._stats["rejected"] += 1
+            raise STTQueueFull("STT queue is full")
+        return future
+
+    def transcribe_dual(self, audio, timeout=None):
+        """Submit and wait; raises concurrent.futures.TimeoutError on timeout."""
+        future = self.submit(audio)
+        return future.result(timeout=timeout or self.timeout)
+
+    def _collect(self):
+        running = {}  # worker pid → job ids it is decoding
+        next_check = time.monotonic() + self.liveness_interval
+        while True:
+            try:
+                message = self._results.get(timeout=self.liveness_interval)
+            except queue.Empty:
+                message = None
+            if message is not None:
+                if message[0] == "started":
+                    _, pid, job_ids = message
+                    running[pid] = job_ids
+                else:
+                    _, pid, jobs, error, timings = message
+                    running.pop(pid, None)
+                    self._resolve(jobs, error, timings)
+            if time.monotonic() >= next_check:
+                self._reap_workers(running)
+                next_check = time.monotonic() + self.liveness_interval
+
+    def _resolve(self, jobs, error, timings):
+        with self._state_lock:
+            self._stats["batches"] += 1
+            self._stats["last_batch_size"] = len(jobs)
+            self._stats["completed" if error is None else "failed"] += len(jobs)
+            for stage in self._stage_totals:
+                self._stage_totals[stage] += timings[stage]
+            futures = [(self._futures.pop(job_id, None), output) for job_id, output in jobs]
+
+        for future, output in futures:
+            if future is None:
+                continue  # caller already gave up
+            if error is None:
+                future.set_result(output)
+            else:
+                future.set_exception(RuntimeError(error))
+
+    def _reap_workers(self, running):
+        """Fail the jobs of workers that died mid-batch and start replacements."""
+        with self._lock:
+            if self._stopping:
+                return
+            dead = [(i, p) for i, p in enumerate(self._procs) if p.exitcode is not None]
+            for i, p in dead:
+                self._procs[i] = self._spawn(p.name)
+
+        for _, p in dead:
+            job_ids = running.pop(p.pid, [])
+            print(f"⚠️ {p.name} exited with code {p.exitcode}; failing {len(job_ids)} job(s) and restarting it")
+            with self._state_lock:
+                self._stats["worker_restarts"] += 1
+                self._stats["orphaned"] += len(job_ids)
+                futures = [self._futures.pop(job_id, None) for job_id in job_ids]
+            for future in futures:
+                if future is not None:
+                    future.set_exception(RuntimeError(f"STT worker {p.name} died (exit code {p.exitcode})"))
+
+    def _queue_depth(self):
+        if self._jobs is None:
+            return 0
+        try:
+            return self._jobs.qsize()
+        except NotImplementedError:  # macOS has no sem_getvalue
+            return None
+
+    def stats(self):
+        with self._state_lock:
+            stats = dict(self._stats)
+            stage_totals = dict(self._stage_totals)
+            in_flight = len(self._futures)
+        done = stats["completed"] + stats["failed"]
+        batches = stats["batches"]
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend,
+            "workers": self.workers,
+            "workers_alive": sum(p.is_alive() for p in self._procs),
+            "worker_restarts": stats["worker_restarts"],
+            "orphaned": stats["orphaned"],       # jobs lost with a dead worker
+            "queue_depth": self._queue_depth(),  # jobs waiting for a worker
+            "queue_capacity": self.queue_size,
+            "in_flight": in_flight,              # queued + being decoded
+            "completed": stats["completed"],
+            "failed": stats["failed"],
+            "rejected": stats["rejected"],
+            "batches": batches,
+            "last_batch_size": stats["last_batch_size"],
+            "avg_batch_size": round(done / batches, 2) if batches else 0,
+            "avg_stage_ms": {
+                stage: round(total / batches, 2) if batches else 0
+                for stage, total in stage_totals.items()
+            },
+        }
+
+
+stt_pool = STTPool()
@@ -1,9 +1,24 @@
 import os
+import numpy as np
+import torch
 import whisper
+from voicenudge.model_loader import lazy_model
+from voicenudge.speech.audio import decode_audio
+from voicenudge.speech.backends import STTBackend, register_backend
 
-# Load Whisper model (tiny, base, small, medium, large)
+# Whisper model (tiny, base, small, medium, large), loaded on first use
 model_size = os.getenv("WHISPER_MODEL", "small")
-model = whisper.load_model(model_size)
+_model = lazy_model(
+    f"whisper-{model_size}",
+    lambda: whisper.load_model(model_size),
+    # one second of silence exercises the full mel → encoder → decoder path
+    warmup=lambda m: m.transcribe(np.zeros(16000, dtype=np.float32)),
+)
+
+
+def get_model():
+    return _model.get()
+
 
 def transcribe_audio(audio_file_path: str, translate: bool = True) -> str:
     """
@@ -12,5 +27,92 @@ def transcribe_audio(audio_file_path: str, translate: bool = True) -> str:
     If translate=False → keeps original language transcription.
     """
     task_type = "translate" if translate else "transcribe"
-    result = model.transcribe(audio_file_path, task=task_type)
+    result = get_model().transcribe(audio_file_path, task=task_type)
     return result["text"]
+
+
+def _encode(audios):
+    """Run the mel front-end + encoder once for a batch of ≤30s clips."""
+    model = get_model()
+    fp16 = model.device.type != "cpu"
+    mels = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+        for audio in audios
+    ])
+    return model.embed_audio(
+        mels.to(model.device, torch.float16 if fp16 else torch.float32)
+    )
+
+
+def _decode(features, task: str):
+    """Decode encoded clips; returns [(text, detected_language)] per clip."""
+    model = get_model()
+    options = whisper.DecodingOptions(
+        task=task,
+        # English-only checkpoints have no language tokens to detect
+        language=None if model.is_multilingual else "en",
+        fp16=model.device.type != "cpu",
+    )
+    return [(r.text.strip(), r.language) for r in whisper.decode(model, features, options)]
+
+
+def transcribe_dual_batch(audios):
+    """
+    Native transcript + English translation for a batch of ≤30s clips,
+    sharing one padded encoder pass. Returns [(native_text, english_text)];
+    the translate decode only runs for clips not already in English.
+    """
+    features = _encode(audios)
+    native = _decode(features, "transcribe")
+    results = [(text, text) for text, _ in native]
+
+    foreign = [i for i, (_, language) in enumerate(native) if language != "en"]
+    if foreign:
+        translated = _decode(features[foreign], "translate")
+        for i, (english, _) in zip(foreign, translated):
+            results[i] = (native[i][0], english)
+    return results
+
+
+def transcribe_dual(audio):
+    """
+    Native transcript + English translation from a single encoder pass.
+    Accepts a file path or a 16 kHz mono float32 array.
+    Returns (native_text, english_text); the translate decode is skipped
+    when the detected language is already English.
+    """
+    if isinstance(audio, str):
+        audio = decode_audio(audio)
+
+    # Long recordings need Whisper's sliding window → fall back to two passes
+    if audio.shape[-1] > whisper.audio.N_SAMPLES:
+        model = get_model()
+        native = model.transcribe(audio, task="transcribe")
+        if native.get("language") == "en":
+            return native["text"], native["text"]
+        english = model.transcribe(audio, task="translate", language=native.get("language"))
+        return native["text"], english["text"]
+
+    return transcribe_dual_batch([audio])[0]
+
+
+@register_backend("openai-whisper")
+class OpenAIWhisperBackend(STTBackend):
+    """Reference PyTorch Whisper (fp32 on CPU)."""
+
+    def load(self):
+        return get_model()
+
+    def load_audio(self, path):
+        return decode_audio(path)
+
+    def transcribe(self, audio, translate: bool = True) -> str:
+        if isinstance(audio, str):
+            audio = decode_audio(audio)  # in-process, instead of Whisper's ffmpeg subprocess
+        return transcribe_audio(audio, translate=translate)
+
+    def transcribe_dual(self, audio):
+        return transcribe_dual(audio)
+
+    def transcribe_dual_batch(self, audios):
+        return transcribe_dual_batch(audios)
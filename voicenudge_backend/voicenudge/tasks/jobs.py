@@ -0,0 +1,94 @@
+"""
+Background execution for slow ingest pipelines.
+
+Jobs are persisted in `ingest_jobs` so any web worker can answer a status
+poll, while the work itself runs on a small thread pool in the worker that
+accepted the upload. If that worker restarts, its queued and running jobs
+are lost; `fail_stale_job` marks them failed once they've gone
+INGEST_JOB_STALE_SECONDS without progress.
+"""
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from voicenudge.extensions import db
+from voicenudge.models import IngestJob
+
+_executor = None
+
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config.get("INGEST_JOB_WORKERS", 4),
+            thread_name_prefix="ingest-job",
+        )
+    return _executor
+
+
+def _update(job_id, **fields):
+    IngestJob.query.filter_by(id=job_id).update(fields)
+    db.session.commit()
+
+
+def _run(app, job_id, fn, args):
+    with app.app_context():
+        _update(job_id, status="running")
+        try:
+            result = fn(*args, progress=lambda stage: _update(job_id, stage=stage))
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Ingest job {job_id} failed: {e}")
+            _update(job_id, status="failed", error=str(e))
+        else:
+            _update(job_id, status="completed", stage="done", result=result)
+
+
+def submit_job(app, uid, fn, *args):
+    """
+    Record a queued job and run `fn(*args, progress=...)` in the background.
+    `fn` reports stages through `progress(stage)` and returns the JSON result.
+    """
+    job = IngestJob(id=uuid.uuid4().hex, user_id=uid, status="queued", stage="queued")
+    db.session.add(job)
+    db.session.commit()
+
+    _get_executor(app).submit(_run, app, job.id, fn, args)
+    return job
+
+
+def fail_stale_job(job, stale_seconds):
+    """
+    Mark `job` failed if it's still queued/running but hasn't been updated
+    for `stale_seconds` (its worker died). Returns True if it was.
+    """
+    if job.status not in ("queued", "running") or job.updated_at is None:
+        return False
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+    if job.updated_at >= cutoff:
+        return False
+    # Conditional on updated_at, so a job that just progressed is left alone
+    updated = IngestJob.query.filter(
+        IngestJob.id == job.id,
+        IngestJob.status.in_(("queued", "running")),
+        IngestJob.updated_at < cutoff,
+    ).update({"status": "failed", "error": "Job was interrupted (server restarted); please retry"},
+             synchronize_session=False)
+    db.session.commit()
+    if updated:
+        print(f"⚠️ Ingest job {job.id} was orphaned; marked failed")
+    db.session.refresh(job)
+    return bool(updated)
+
+
+def job_payload(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "result": job.result,
+        "error": job.error,
+        "created_at": str(job.created_at),
+        "updated_at": str(job.updated_at),
+    }
@@ -1,11 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from voicenudge.extensions import db
-from voicenudge.models import Task, TaskHistory, Reminder
-from voicenudge.nlp.utils import parse_task
-from voicenudge.ml.model_service import predict_category, predict_priority
-from voicenudge.speech.whisper_stt import transcribe_audio
+from voicenudge.models import Task, Reminder, IngestJob
+from voicenudge.history.archive import archive_tasks
+from voicenudge.pagination import PaginationError, decode_cursor, encode_cursor, parse_limit
+from voicenudge.nlp.utils import parse_task, parse_tasks
+from voicenudge.reminders.dispatcher import reminder_dispatcher
+from voicenudge.ml.model_service import predict_all
+from voicenudge.speech.audio import AudioDecodeError, decode_audio
+from voicenudge.speech.backends import get_backend
+from voicenudge.speech.stt_pool import stt_pool, STTQueueFull
+from voicenudge.tasks.jobs import fail_stale_job, submit_job, job_payload
+from concurrent.futures import TimeoutError as FutureTimeout
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timedelta, timezone
+import json
+import time
 
 
 tasks_bp = Blueprint("tasks", __name__)
@@ -25,6 +36,21 @@ def convert_ist_to_utc(ist_datetime_str):
 
 
 REMINDER_OFFSET_MINUTES = 5  # send reminder 5 minutes before due_at
+MAX_BATCH_COMPLETE = 500  # task ids per PATCH /complete
+MAX_BATCH_INGEST = 500  # texts per POST /ingest_batch
+
+
+def _ingest_payload(task):
+    response = {
+        "id": task.id,
+        "title": task.title,
+        "due_at": str(task.due_at) if task.due_at else None,
+        "category": task.category,
+        "priority": task.priority,
+    }
+    if not task.due_at:
+        response["note"] = "No due date detected. Please set one."
+    return response
 
 
 # -------------------------
@@ -44,16 +70,15 @@ def ingest_text():
 
     # NLP pipeline extracts title + due_at (may be None)
     parsed = parse_task(text)
-    category = predict_category(text)
-    priority = predict_priority(text)
+    prediction = predict_all([text])[0]
 
     task = Task(
         user_id=uid,
         text=text,
         title=parsed["title"],
         due_at=parsed["due_at"],  # may be None
-        category=category,
-        priority=priority,
+        category=prediction["category"],
+        priority=prediction["priority"],
         original_text=None,
     )
     db.session.add(task)
@@ -65,19 +90,66 @@ def ingest_text():
         reminder = Reminder(task_id=task.id, user_id=uid, remind_at=remind_at)
         db.session.add(reminder)
         db.session.commit()
+        reminder_dispatcher.notify(reminder)
 
-    response = {
-        "id": task.id,
-        "title": task.title,
-        "due_at": str(task.due_at) if task.due_at else None,
-        "category": task.category,
-        "priority": task.priority,
-    }
+    return jsonify(_ingest_payload(task)), 201
 
-    if not task.due_at:
-        response["note"] = "No due date detected. Please set one."
 
-    return jsonify(response), 201
+# -------------------------
+# Ingest many tasks via text
+# -------------------------
+@tasks_bp.route("/ingest_batch", methods=["POST"])
+@jwt_required()
+def ingest_batch():
+    """
+    {"texts": [...]} → one task per text. spaCy runs once over the list
+    (nlp.pipe), each classifier predicts once for the whole batch, and all
+    tasks and reminders go in with bulk inserts in a single transaction.
+    """
+    uid = int(get_jwt_identity())
+    texts = (request.get_json(silent=True) or {}).get("texts")
+
+    if not isinstance(texts, list) or not texts:
+        return jsonify({"error": "texts must be a non-empty list"}), 400
+    if len(texts) > MAX_BATCH_INGEST:
+        return jsonify({"error": f"At most {MAX_BATCH_INGEST} texts per request"}), 400
+    if not all(isinstance(t, str) and t.strip() for t in texts):
+        return jsonify({"error": "texts must be non-empty strings"}), 400
+
+    parsed = parse_tasks(texts)
+    predictions = predict_all(texts)  # one vectorization for both heads
+
+    tasks = [
+        Task(
+            user_id=uid,
+            text=text,
+            title=p["title"],
+            due_at=p["due_at"],  # may be None
+            category=prediction["category"],
+            priority=prediction["priority"],
+            original_text=None,
+        )
+        for text, p, prediction in zip(texts, parsed, predictions)
+    ]
+    try:
+        db.session.add_all(tasks)
+        db.session.flush()  # one multi-row INSERT ... RETURNING for the ids
+
+        reminders = [
+            Reminder(task_id=t.id, user_id=uid,
+                     remind_at=t.due_at - timedelta(minutes=REMINDER_OFFSET_MINUTES))
+            for t in tasks if t.due_at
+        ]
+        db.session.add_all(reminders)
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()  # leave the session usable for the rest of the request
+        current_app.logger.exception("Batch ingest failed for %d text(s)", len(texts))
+        return jsonify({"error": "Could not save tasks"}), 500
+
+    reminder_dispatcher.notify_many(reminders)
+
+    return jsonify([_ingest_payload(t) for t in tasks]), 201
 
 
 # -------------------------
@@ -85,34 +157,33 @@ def ingest_text():
 # -------------------------
 
 
-@tasks_bp.route("/voice_ingest", methods=["POST"])
-@jwt_required()
-def voice_ingest():
-    uid = int(get_jwt_identity())
-
-    if "file" not in request.files:
-        return jsonify({"error": "No file provided"}), 400
+def _transcribe(audio):
+    """Native + English transcripts from a single Whisper encoder pass."""
+    if stt_pool.enabled:
+        return stt_pool.transcribe_dual(audio)
+    return get_backend(current_app.config["WHISPER_BACKEND"]).transcribe_dual(audio)
 
-    file = request.files["file"]
-    path = f"/tmp/{file.filename}"
-    file.save(path)
 
-    # Native + translated transcripts
-    raw_text = transcribe_audio(path, translate=False)  # native language
-    translated_text = transcribe_audio(path, translate=True)  # English for NLP/ML
+def _ingest_voice(uid, audio, progress=lambda stage: None):
+    """Transcribe → parse → classify → insert. Returns the Task payload."""
+    progress("transcribing")
+    raw_text, translated_text = _transcribe(audio)
 
+    progress("parsing")
     parsed = parse_task(translated_text)
-    category = predict_category(translated_text)
-    priority = predict_priority(translated_text)
 
+    progress("classifying")
+    prediction = predict_all([translated_text])[0]
+
+    progress("saving")
     task = Task(
         user_id=uid,
         text=translated_text,
         original_text=raw_text,
         title=parsed["title"],
         due_at=parsed["due_at"],  # may be None
-        category=category,
-        priority=priority,
+        category=prediction["category"],
+        priority=prediction["priority"],
     )
     db.session.add(task)
     db.session.commit()
@@ -123,6 +194,7 @@ def voice_ingest():
         reminder = Reminder(task_id=task.id, user_id=uid, remind_at=remind_at)
         db.session.add(reminder)
         db.session.commit()
+        reminder_dispatcher.notify(reminder)
 
     response = {
         "id": task.id,
@@ -137,9 +209,105 @@ def voice_ingest():
     if not task.due_at:
         response["note"] = "No due date detected. Please set one."
 
+    return response
+
+
+@tasks_bp.route("/voice_ingest", methods=["POST"])
+@jwt_required()
+def voice_ingest():
+    uid = int(get_jwt_identity())
+
+    if "file" not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+
+    # Decoded in memory to 16 kHz mono float32 — no temp file, no ffmpeg process
+    try:
+        audio = decode_audio(request.files["file"].stream)
+    except AudioDecodeError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # ?async=1 → 202 + job id; the pipeline runs in the background
+    if request.args.get("async", "").lower() in ("1", "true"):
+        job = submit_job(current_app._get_current_object(), uid, _ingest_voice, uid, audio)
+        resp = jsonify({
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": url_for("tasks.get_job", job_id=job.id),
+            "events_url": url_for("tasks.job_events", job_id=job.id),
+        })
+        resp.headers["Location"] = url_for("tasks.get_job", job_id=job.id)
+        return resp, 202
+
+    try:
+        response = _ingest_voice(uid, audio)
+    except STTQueueFull:
+        return jsonify({"error": "Speech service busy, please retry"}), 503
+    except FutureTimeout:
+        return jsonify({"error": "Transcription timed out"}), 504
+
     return jsonify(response), 201
 
 
+# -------------------------
+# Async ingest jobs (status + progress stream)
+# -------------------------
+
+
+@tasks_bp.route("/jobs/<job_id>", methods=["GET"])
+@jwt_required()
+def get_job(job_id):
+    uid = int(get_jwt_identity())
+    job = IngestJob.query.filter_by(id=job_id, user_id=uid).first_or_404()
+    fail_stale_job(job, current_app.config.get("INGEST_JOB_STALE_SECONDS", 600))
+    return jsonify(job_payload(job))
+
+
+@tasks_bp.route("/jobs/<job_id>/events", methods=["GET"])
+@jwt_required()
+def job_events(job_id):
+    """
+    Server-sent events: one `progress` event per stage change, then `done`.
+    The stream closes after INGEST_SSE_MAX_SECONDS (EventSource reconnects)
+    and sends `: keep-alive` comments while idle.
+    """
+    uid = int(get_jwt_identity())
+    IngestJob.query.filter_by(id=job_id, user_id=uid).first_or_404()
+    poll = current_app.config.get("INGEST_SSE_POLL_SECONDS", 0.5)
+    max_seconds = current_app.config.get("INGEST_SSE_MAX_SECONDS", 120)
+    keepalive = current_app.config.get("INGEST_SSE_KEEPALIVE_SECONDS", 15)
+    stale_seconds = current_app.config.get("INGEST_JOB_STALE_SECONDS", 600)
+
+    def stream():
+        last = None
+        started = last_sent = time.monotonic()
+        while True:
+            db.session.expire_all()  # see the worker thread's commits
+            job = db.session.get(IngestJob, job_id)
+            if job is None:
+                return
+            fail_stale_job(job, stale_seconds)
+            payload = job_payload(job)
+            if (payload["status"], payload["stage"]) != last:
+                last = (payload["status"], payload["stage"])
+                event = "done" if payload["status"] in ("completed", "failed") else "progress"
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+                last_sent = time.monotonic()
+                if event == "done":
+                    return
+            elif time.monotonic() - last_sent >= keepalive:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            if time.monotonic() - started >= max_seconds:
+                return
+            time.sleep(poll)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @tasks_bp.route("/<int:task_id>/set_due", methods=["PATCH"])
 @jwt_required()
 def set_due(task_id):
@@ -172,6 +340,7 @@ def set_due(task_id):
     reminder = Reminder(task_id=task.id, user_id=uid, remind_at=remind_time_utc)
     db.session.add(reminder)
     db.session.commit()
+    reminder_dispatcher.notify(reminder)  # wake the dispatcher if this is now the earliest
 
     # ✅ Convert back to IST just for displaying in response
     due_time_ist_display = due_time_utc.astimezone(ist_tz)
@@ -193,26 +362,68 @@ def set_due(task_id):
 # -------------------------
 
 
+# Columns `fields=` may select; id and due_at are always returned (they form the cursor)
+TASK_FIELDS = ("id", "title", "due_at", "category", "priority", "status", "text", "original_text", "created_at")
+DEFAULT_PAGE_FIELDS = ("id", "title", "due_at", "category", "priority", "status")
+LEGACY_FIELDS = DEFAULT_PAGE_FIELDS + ("text", "original_text")
+
+
+def _task_row(row, fields):
+    return {
+        f: str(getattr(row, f)) if f in ("due_at", "created_at") else getattr(row, f)
+        for f in fields
+    }
+
+
 @tasks_bp.route("/", methods=["GET"])
 @jwt_required()
 def list_tasks():
+    """
+    Without `limit`/`cursor`: every task as a JSON array (legacy shape).
+    With them: one page ordered by (due_at, id), undated tasks last:
+    {"tasks": [...], "next_cursor": "..."|null}. Optional filters
+    status/category/priority, and fields=title,text,... to pick columns.
+    """
     uid = int(get_jwt_identity())
-    tasks = Task.query.filter_by(user_id=uid).all()
-    return jsonify(
-        [
-            {
-                "id": t.id,
-                "title": t.title,
-                "due_at": str(t.due_at),
-                "category": t.category,
-                "priority": t.priority,
-                "status": t.status,
-                "text": t.text,
-                "original_text": t.original_text,
-            }
-            for t in tasks
-        ]
-    )
+    args = request.args
+
+    paginated = "limit" in args or "cursor" in args
+    if "fields" in args:
+        requested = [f.strip() for f in args["fields"].split(",") if f.strip()]
+        unknown = sorted(set(requested) - set(TASK_FIELDS))
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+        fields = tuple(dict.fromkeys(["id", "due_at", *requested]))
+    else:
+        fields = DEFAULT_PAGE_FIELDS if paginated else LEGACY_FIELDS
+
+    query = Task.query.with_entities(*(getattr(Task, f) for f in fields)).filter(Task.user_id == uid)
+    for name in ("status", "category", "priority"):
+        if args.get(name):
+            query = query.filter(getattr(Task, name) == args[name])
+
+    if not paginated:
+        return jsonify([_task_row(row, fields) for row in query.all()])
+
+    try:
+        limit = parse_limit(args.get("limit"))
+        if args.get("cursor"):
+            due_at, last_id = decode_cursor(args["cursor"], datetime, int)
+            if due_at is None:
+                query = query.filter(Task.due_at.is_(None), Task.id > last_id)
+            else:
+                query = query.filter(or_(
+                    Task.due_at > due_at,
+                    and_(Task.due_at == due_at, Task.id > last_id),
+                    Task.due_at.is_(None),
+                ))
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # One extra row tells us whether there's a next page
+    rows = query.order_by(Task.due_at.asc().nulls_last(), Task.id).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].due_at, rows[limit - 1].id) if len(rows) > limit else None
+    return jsonify({"tasks": [_task_row(row, fields) for row in rows[:limit]], "next_cursor": next_cursor})
 
 
 # -------------------------
@@ -224,20 +435,29 @@ def list_tasks():
 @jwt_required()
 def complete_task(task_id):
     uid = int(get_jwt_identity())
-    task = Task.query.filter_by(id=task_id, user_id=uid).first_or_404()
+    Task.query.with_entities(Task.id).filter_by(id=task_id, user_id=uid).first_or_404()
 
-    history = TaskHistory(
-        user_id=uid,
-        task_id=task.id,
-        text=task.text,
-        title=task.title,
-        due_at=task.due_at,
-        category=task.category,
-        priority=task.priority,
-    )
-
-    db.session.add(history)
-    db.session.delete(task)
+    archive_tasks(uid, [task_id])
     db.session.commit()
 
     return jsonify({"message": f"Task {task_id} completed and moved to history"})
+
+
+@tasks_bp.route("/complete", methods=["PATCH"])
+@jwt_required()
+def complete_tasks():
+    """Complete many tasks in one transaction: {"task_ids": [1, 2, 3]}."""
+    uid = int(get_jwt_identity())
+    task_ids = (request.get_json(silent=True) or {}).get("task_ids")
+    if not isinstance(task_ids, list) or not all(type(i) is int for i in task_ids):
+        return jsonify({"error": "task_ids must be a list of integers"}), 400
+    if len(task_ids) > MAX_BATCH_COMPLETE:
+        return jsonify({"error": f"At most {MAX_BATCH_COMPLETE} task_ids per request"}), 400
+
+    completed = archive_tasks(uid, task_ids)
+    db.session.commit()
+
+    return jsonify({
+        "completed": completed,
+        "not_found": sorted(set(task_ids) - set(completed)),
+    })
@@ -7,8 +7,10 @@ if not hasattr(torchaudio, "list_audio_backends"):
 # ------------------------------------------------------------------------------
 
 # ✅ Ensure symlink issues on Windows/Docker are handled safely
+import sys
 import patch_speechbrain_symlinks
 from voicenudge import create_app
+from voicenudge.model_loader import preload_models
 from dotenv import load_dotenv
 
 # ✅ Automatically load environment variables from .env
@@ -17,6 +19,15 @@ load_dotenv()
 # ✅ Create the Flask app
 app = create_app()
 
+# ✅ Optional: load all models now instead of on first request.
+# Under `gunicorn` (see gunicorn.conf.py) this runs in the master before
+# forking, so workers share the weights copy-on-write.
+if "--preload-models" in sys.argv or app.config["PRELOAD_MODELS"]:
+    preload_models(
+        warmup=app.config["WARMUP_MODELS"],
+        include_stt=not app.config["STT_POOL_WORKERS"],  # the pool loads its own
+    )
+
 # ✅ Run the Flask app (for local or Docker dev)
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8888, debug=True)